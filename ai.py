@@ -0,0 +1,336 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import CAPTURES, CELL_XY, CENTER_BIT, FULL_MASK, NEIGHBORS, _bits, mobile
+
+
+"""
+Jogador computador para o Seega.
+
+A busca é um alpha-beta (negamax) com aprofundamento iterativo sobre
+estados compactos (a, b, turn, placed_a, placed_b, hash): os bitboards
+de cada jogador, o jogador da vez, as peças já colocadas e a chave
+Zobrist, atualizada incrementalmente a cada jogada.
+
+- Tabela de transposição limitada (TranspositionTable): LRU, mas uma
+  entrada mais profunda não é substituída por outra mais rasa da mesma
+  posição.
+- Ordenação: melhor jogada da tabela primeiro, depois as capturas.
+- Orçamento de tempo por jogada: a busca é interrompida no prazo e devolve
+  a melhor jogada da última iteração completa.
+
+choose_move() é uma função de módulo (serializável), pensada para rodar
+em um ProcessPoolExecutor; AIPool faz isso sem bloquear o event loop do
+servidor, e várias partidas contra o computador se espalham pelos núcleos.
+
+Com uma tablebase (tablebase.py), os finais cobertos por ela são jogados
+direto pela tabela, sem busca.
+"""
+
+WIN = 10000
+TT_SIZE = 200000
+TIME_BUDGET = 0.5
+MAX_DEPTH = 64
+
+_rng = random.Random(0x5EE6A)
+ZOBRIST = [[_rng.getrandbits(64) for _ in range(25)] for _ in range(2)]
+Z_SIDE = _rng.getrandbits(64)
+Z_PLACEMENT = _rng.getrandbits(64)
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def zobrist(a, b, turn, placement):
+    h = 0
+    for i in _bits(a):
+        h ^= ZOBRIST[0][i]
+    for i in _bits(b):
+        h ^= ZOBRIST[1][i]
+    if turn:
+        h ^= Z_SIDE
+    if placement:
+        h ^= Z_PLACEMENT
+    return h
+
+
+def state_from_game(game):
+    """Estado compacto de um SeegaGame ou BitboardSeegaGame."""
+    if hasattr(game, "bits"):
+        a, b = game.bits
+    else:
+        a = b = 0
+        for y, row in enumerate(game.board):
+            for x, cell in enumerate(row):
+                if cell == 'A':
+                    a |= 1 << (y * 5 + x)
+                elif cell == 'B':
+                    b |= 1 << (y * 5 + x)
+    pa, pb = game.placement_count
+    return (a, b, game.turn, pa, pb, zobrist(a, b, game.turn, pa + pb < 24))
+
+
+def generate(state):
+    """Jogadas do lado da vez: (-1, célula) para colocação, (origem, destino) para movimento."""
+    a, b, turn, pa, pb, _ = state
+    occupied = a | b
+    if pa + pb < 24:
+        if (pa, pb)[turn] >= 12:
+            return []
+        return [(-1, i) for i in _bits(FULL_MASK & ~occupied & ~CENTER_BIT)]
+    if not (a and b):
+        return []
+    empty = FULL_MASK & ~occupied
+    moves = []
+    for i in _bits(mobile(b if turn else a, empty)):
+        for j in _bits(NEIGHBORS[i] & empty):
+            moves.append((i, j))
+    return moves
+
+
+def captures_of(state, move):
+    """Quantas peças a jogada captura (usado na ordenação)."""
+    src, dst = move
+    if src < 0:
+        return 0
+    a, b, turn = state[0], state[1], state[2]
+    mine, theirs = (b, a) if turn else (a, b)
+    mine ^= (1 << src) | (1 << dst)
+    return sum(1 for adj, far in CAPTURES[dst] if theirs & adj and mine & far)
+
+
+def apply(state, move):
+    """Aplica a jogada e devolve o novo estado, com as mesmas regras de SeegaGame."""
+    a, b, turn, pa, pb, h = state
+    src, dst = move
+    dst_bit = 1 << dst
+    zmine = ZOBRIST[turn]
+    mine, theirs = (b, a) if turn else (a, b)
+
+    if src < 0:
+        mine |= dst_bit
+        h ^= zmine[dst]
+        if turn:
+            pb += 1
+        else:
+            pa += 1
+        if pa + pb == 24:
+            h ^= Z_PLACEMENT
+    else:
+        mine ^= (1 << src) | dst_bit
+        h ^= zmine[src] ^ zmine[dst]
+        ztheirs = ZOBRIST[1 - turn]
+        for adj, far in CAPTURES[dst]:
+            if theirs & adj and mine & far:
+                theirs ^= adj
+                h ^= ztheirs[adj.bit_length() - 1]
+
+    a, b = (theirs, mine) if turn else (mine, theirs)
+    nxt = 1 - turn
+    # jogador bloqueado na movimentação passa a vez
+    if pa + pb == 24 and not mobile(b if nxt else a, FULL_MASK & ~(a | b)):
+        nxt = turn
+    if nxt != turn:
+        h ^= Z_SIDE
+    return (a, b, nxt, pa, pb, h)
+
+
+def evaluate(state):
+    """Avaliação do ponto de vista do jogador da vez: material e mobilidade."""
+    a, b, turn = state[0], state[1], state[2]
+    material = bin(a).count("1") - bin(b).count("1")
+    empty = FULL_MASK & ~(a | b)
+    mobility = 0
+    if state[3] + state[4] == 24:
+        mobility = (sum(bin(NEIGHBORS[i] & empty).count("1") for i in _bits(a))
+                    - sum(bin(NEIGHBORS[i] & empty).count("1") for i in _bits(b)))
+    score = 100 * material + mobility
+    return -score if turn else score
+
+
+class TranspositionTable:
+    """
+    Tabela limitada: hash → (depth, value, flag, best_move).
+
+    Ao encher, descarta a entrada usada há mais tempo (LRU). Uma entrada da
+    mesma posição só é sobrescrita por uma busca de profundidade maior ou
+    igual (preferência por profundidade).
+    """
+
+    def __init__(self, capacity=TT_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, depth, value, flag, best):
+        entries = self.entries
+        old = entries.get(key)
+        if old is not None:
+            if old[0] > depth:
+                return
+            entries.move_to_end(key)
+        elif len(entries) >= self.capacity:
+            entries.popitem(last=False)
+        entries[key] = (depth, value, flag, best)
+
+
+class Searcher:
+    def __init__(self, tt=None):
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.nodes = 0
+        self.deadline = 0.0
+
+    def order(self, state, moves, best):
+        scored = sorted(moves, key=lambda m: -captures_of(state, m))
+        if best in scored:
+            scored.remove(best)
+            scored.insert(0, best)
+        return scored
+
+    def search(self, state, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        a, b = state[0], state[1]
+        if state[3] + state[4] == 24 and not (a and b):
+            # quem está sem peças perdeu; vitórias mais rápidas valem mais
+            lost = not (b if state[2] else a)
+            return -(WIN - ply) if lost else WIN - ply
+
+        moves = generate(state)
+        if depth == 0 or not moves:
+            return evaluate(state)
+
+        key = state[5]
+        entry = self.tt.get(key)
+        best_move = None
+        if entry is not None:
+            e_depth, value, flag, best_move = entry
+            if e_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+
+        original_alpha = alpha
+        best = -WIN * 2
+        turn = state[2]
+        for move in self.order(state, moves, best_move):
+            child = apply(state, move)
+            if child[2] == turn:
+                score = self.search(child, depth - 1, alpha, beta, ply + 1)
+            else:
+                score = -self.search(child, depth - 1, -beta, -alpha, ply + 1)
+            if score > best:
+                best, best_move = score, move
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.put(key, depth, best, flag, best_move)
+        return best
+
+    def best_move(self, state, budget=TIME_BUDGET, max_depth=MAX_DEPTH):
+        """Aprofundamento iterativo até o prazo; retorna (jogada, profundidade, valor)."""
+        moves = generate(state)
+        if not moves:
+            return None, 0, evaluate(state)
+        self.deadline = time.perf_counter() + budget
+        self.nodes = 0
+        best, best_depth, best_value = moves[0], 0, 0
+        for depth in range(1, max_depth + 1):
+            try:
+                value = self.search(state, depth, -WIN * 2, WIN * 2, 0)
+            except SearchTimeout:
+                break
+            entry = self.tt.get(state[5])
+            if entry is not None and entry[3] is not None:
+                best = entry[3]
+            best_depth, best_value = depth, value
+            if abs(value) >= WIN - MAX_DEPTH:
+                break                       # resultado forçado encontrado
+        return best, best_depth, best_value
+
+
+def to_game_move(move):
+    """(-1, c) → (x, y); (s, d) → (x1, y1, x2, y2), o formato de SeegaGame.play()."""
+    src, dst = move
+    if src < 0:
+        return CELL_XY[dst]
+    return CELL_XY[src] + CELL_XY[dst]
+
+
+# tabela reaproveitada entre as chamadas de um mesmo processo do pool
+_searcher = None
+_tablebases = {}                        # caminho → Tablebase aberta neste processo
+
+
+def tablebase_move(state, path):
+    """Jogada da tablebase em path para o estado, ou None se ela não cobre a posição."""
+    if state[3] + state[4] < 24:
+        return None
+    tb = _tablebases.get(path)
+    if tb is None:
+        from tablebase import Tablebase
+        tb = _tablebases[path] = Tablebase(path)
+    a, b, turn = state[0], state[1], state[2]
+    hit = tb.best(b, a) if turn else tb.best(a, b)
+    return None if hit is None else hit[0]
+
+
+def choose_move(state, budget=TIME_BUDGET, max_depth=MAX_DEPTH, tablebase=None):
+    """
+    Escolhe uma jogada para o estado compacto (ver state_from_game).
+    Retorna (jogada no formato de SeegaGame.play() ou None, profundidade, nós).
+    tablebase: caminho de uma tablebase consultada antes da busca.
+    """
+    global _searcher
+    if tablebase is not None:
+        move = tablebase_move(state, tablebase)
+        if move is not None:
+            return to_game_move(move), 0, 0
+    if _searcher is None:
+        _searcher = Searcher()
+    move, depth, _ = _searcher.best_move(state, budget, max_depth)
+    if move is None:
+        return None, depth, _searcher.nodes
+    return to_game_move(move), depth, _searcher.nodes
+
+
+class AIPool:
+    """Roda choose_move em processos separados sem bloquear o event loop."""
+
+    def __init__(self, workers=None, budget=TIME_BUDGET, tablebase=None):
+        self.budget = budget
+        self.tablebase = tablebase
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    async def best_move(self, game):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, choose_move, state_from_game(game), self.budget, MAX_DEPTH,
+            self.tablebase)
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,452 @@
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import pyarrow as pa
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+
+"""
+Estatísticas das partidas terminadas, em arquivos colunares.
+
+Cada sala com um GameRecorder anota as colocações, os lances e as capturas
+da partida em andamento; quando ela termina (vitória ou desistência, ver
+Room.finish) o registro vai para o AnalyticsSink, que acumula colunas em
+memória e grava um bloco (chunk) novo a cada CHUNK_GAMES partidas ou a cada
+FLUSH_INTERVAL segundos, em uma thread. Os blocos nunca são reescritos:
+acrescentar é só criar o próximo arquivo.
+
+Cada bloco tem três tabelas:
+    games     uma linha por partida: sala, início, duração, vencedor (0 A,
+              1 B, -1 empate), motivo (REASONS), lances, as máscaras das
+              peças de A e de B ao fim da colocação (bit y * 5 + x) e a
+              ordem das colocações (24 casas, 255 onde faltou);
+    moves     um lance por linha: partida, ply, origem, destino, jogador;
+    captures  uma captura por linha: partida, ply, casa, quem capturou.
+
+A coluna "game" de moves/captures é a linha da partida dentro do bloco;
+load() junta os blocos e a converte para o índice global.
+
+Formato: Parquet ou Arrow IPC (feather) quando o pyarrow está instalado,
+senão .npz do NumPy. As consultas (python analytics.py DIR) carregam as
+colunas em arrays do NumPy e agregam com bincount/unpackbits, sem laço por
+partida.
+
+Uso:
+    python async_server.py --analytics stats/
+    python simulate.py --games 1000000 --analytics stats/
+    python analytics.py stats/ --report opening layout captures
+"""
+
+CHUNK_GAMES = 65536
+FLUSH_INTERVAL = 60.0
+PLACEMENTS = 24
+NO_CELL = 255
+
+REASONS = ("pieces", "surrender", "blocked", "limit")
+FORMATS = ("parquet", "arrow", "npz")
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+CHUNK_PATTERN = re.compile(r"chunk-(\d+)\.games\.(parquet|arrow)$|chunk-(\d+)\.npz$")
+
+TABLES = {
+    "games": (("room", "i", "int32"), ("started", "d", "float64"),
+              ("duration", "f", "float32"), ("winner", "b", "int8"),
+              ("reason", "b", "int8"), ("plies", "i", "int32"),
+              ("layout_a", "I", "uint32"), ("layout_b", "I", "uint32"),
+              ("placements", "B", "uint8")),
+    "moves": (("game", "i", "int32"), ("ply", "i", "int32"), ("src", "B", "uint8"),
+              ("dst", "B", "uint8"), ("player", "B", "uint8")),
+    "captures": (("game", "i", "int32"), ("ply", "i", "int32"), ("cell", "B", "uint8"),
+                 ("player", "B", "uint8")),
+}
+
+
+def default_format():
+    return "parquet" if pa is not None else "npz"
+
+
+class GameRecorder:
+    """Partida em andamento de uma sala; finish() entrega o registro ao sink."""
+
+    def __init__(self, sink=None, room_id=-1):
+        self.sink = sink
+        self.room_id = room_id
+        self.restart()
+
+    def restart(self):
+        """Descarta a partida em andamento (RESTART) e começa outra."""
+        self.started = time.time()
+        self.placements = bytearray()
+        self.layout = [0, 0]
+        self.src = bytearray()
+        self.dst = bytearray()
+        self.player = bytearray()
+        self.capture_ply = array("i")
+        self.capture_cell = bytearray()
+        self.capture_player = bytearray()
+
+    def place(self, x, y, pid):
+        cell = y * 5 + x
+        self.placements.append(cell)
+        self.layout[pid] |= 1 << cell
+
+    def move(self, x1, y1, x2, y2, pid, captures):
+        ply = len(self.src)
+        self.src.append(y1 * 5 + x1)
+        self.dst.append(y2 * 5 + x2)
+        self.player.append(pid)
+        for x, y in captures:
+            self.capture_ply.append(ply)
+            self.capture_cell.append(y * 5 + x)
+            self.capture_player.append(pid)
+
+    def take(self, winner, reason):
+        """Registro da partida (tupla serializável) e começa a próxima."""
+        placements = bytes(self.placements[:PLACEMENTS]).ljust(PLACEMENTS, bytes((NO_CELL,)))
+        record = (self.room_id, self.started, time.time() - self.started,
+                  -1 if winner is None else winner, REASONS.index(reason), len(self.src),
+                  self.layout[0], self.layout[1], placements,
+                  bytes(self.src), bytes(self.dst), bytes(self.player),
+                  self.capture_ply.tobytes(), bytes(self.capture_cell),
+                  bytes(self.capture_player))
+        self.restart()
+        return record
+
+    def finish(self, winner, reason):
+        """
+        Entrega a partida ao sink. Antes do primeiro movimento aceito a partida
+        só pode acabar por desistência (ainda na colocação); com outro motivo
+        o registro seria inválido e é descartado.
+        """
+        if not self.src and reason != "surrender":
+            self.restart()
+            return
+        self.sink.add(self.take(winner, reason))
+
+
+class AnalyticsSink:
+    """Acumula as partidas em colunas e grava um bloco novo por lote, em uma thread."""
+
+    def __init__(self, directory, fmt=None, chunk_games=CHUNK_GAMES, interval=FLUSH_INTERVAL):
+        if np is None:
+            raise RuntimeError("analytics.py precisa do NumPy (pip install numpy)")
+        fmt = fmt or default_format()
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato inválido: {fmt}")
+        if fmt != "npz" and pa is None:
+            raise RuntimeError(f"o formato {fmt} precisa do pyarrow (pip install pyarrow)")
+        self.directory = directory
+        self.fmt = fmt
+        self.chunk_games = chunk_games
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        ids = chunk_ids(directory)
+        self.next_chunk = ids[-1] + 1 if ids else 0
+        self.lock = threading.Lock()      # protege as colunas e a troca delas no flush
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.columns = self.empty()
+
+    @staticmethod
+    def empty():
+        return {table: {name: array(code) for name, code, _ in columns}
+                for table, columns in TABLES.items()}
+
+    def add(self, record):
+        (room, started, duration, winner, reason, plies, layout_a, layout_b, placements,
+         src, dst, player, capture_ply, capture_cell, capture_player) = record
+        with self.lock:
+            games = self.columns["games"]
+            game = len(games["room"])
+            games["room"].append(room)
+            games["started"].append(started)
+            games["duration"].append(duration)
+            games["winner"].append(winner)
+            games["reason"].append(reason)
+            games["plies"].append(plies)
+            games["layout_a"].append(layout_a)
+            games["layout_b"].append(layout_b)
+            games["placements"].frombytes(placements)
+            moves = self.columns["moves"]
+            moves["game"].extend([game] * len(src))
+            moves["ply"].extend(range(len(src)))
+            moves["src"].frombytes(src)
+            moves["dst"].frombytes(dst)
+            moves["player"].frombytes(player)
+            captures = self.columns["captures"]
+            captures["game"].extend([game] * len(capture_cell))
+            captures["ply"].frombytes(capture_ply)
+            captures["cell"].frombytes(capture_cell)
+            captures["player"].frombytes(capture_player)
+            full = game + 1 >= self.chunk_games
+        if full:
+            self.wake.set()
+
+    def write(self, records):
+        """Acrescenta vários registros (GameRecorder.take) de uma vez."""
+        for record in records:
+            self.add(record)
+
+    def flush(self):
+        """Grava as partidas acumuladas em um bloco novo; retorna quantas."""
+        with self.lock:
+            columns = self.columns
+            count = len(columns["games"]["room"])
+            if not count:
+                return 0
+            self.columns = self.empty()
+            chunk = self.next_chunk
+            self.next_chunk += 1
+        tables = {}
+        for table, specs in TABLES.items():
+            tables[table] = {name: np.frombuffer(columns[table][name], dtype)
+                             for name, _, dtype in specs}
+        tables["games"]["placements"] = tables["games"]["placements"].reshape(-1, PLACEMENTS)
+        write_chunk(self.directory, chunk, tables, self.fmt)
+        return count
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.flush()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Para a thread e grava o pendente."""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+
+# ---------------------------------------------------------------- arquivos
+
+
+def chunk_ids(directory):
+    ids = set()
+    for name in os.listdir(directory):
+        match = CHUNK_PATTERN.match(name)
+        if match:
+            ids.add(int(match.group(1) or match.group(3)))
+    return sorted(ids)
+
+
+def _arrow_table(columns):
+    arrays = {}
+    for name, values in columns.items():
+        if values.ndim == 2:
+            arrays[name] = pa.FixedSizeListArray.from_arrays(values.reshape(-1), values.shape[1])
+        else:
+            arrays[name] = pa.array(values)
+    return pa.table(arrays)
+
+
+def write_chunk(directory, chunk, tables, fmt):
+    """
+    Grava um bloco. Cada arquivo é escrito com .tmp e renomeado; o arquivo
+    de games (ou o .npz único) é o último, então um bloco só aparece para
+    load() depois de completo.
+    """
+    base = os.path.join(directory, "chunk-%06d" % chunk)
+    if fmt == "npz":
+        tmp = base + ".tmp.npz"
+        np.savez_compressed(tmp, **{f"{table}__{name}": values
+                         for table, columns in tables.items()
+                         for name, values in columns.items()})
+        os.replace(tmp, base + ".npz")
+        return
+    ext = EXTENSIONS[fmt]
+    for table in ("moves", "captures", "games"):
+        path = f"{base}.{table}{ext}"
+        data = _arrow_table(tables[table])
+        if fmt == "parquet":
+            pyarrow.parquet.write_table(data, path + ".tmp")
+        else:
+            pyarrow.feather.write_feather(data, path + ".tmp", compression="uncompressed")
+        os.replace(path + ".tmp", path)
+
+
+def _from_arrow(table):
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if pa.types.is_fixed_size_list(column.type):
+            size = column.type.list_size
+            columns[name] = column.flatten().to_numpy().reshape(-1, size)
+        else:
+            columns[name] = column.to_numpy()
+    return columns
+
+
+def read_chunk(directory, chunk):
+    base = os.path.join(directory, "chunk-%06d" % chunk)
+    if os.path.exists(base + ".npz"):
+        tables = {table: {} for table in TABLES}
+        with np.load(base + ".npz") as data:
+            for key in data.files:
+                table, name = key.split("__", 1)
+                tables[table][name] = data[key]
+        return tables
+    for fmt, reader in (("parquet", lambda p: pyarrow.parquet.read_table(p)),
+                        ("arrow", lambda p: pyarrow.feather.read_table(p, memory_map=True))):
+        ext = EXTENSIONS[fmt]
+        if os.path.exists(f"{base}.games{ext}"):
+            if pa is None:
+                raise RuntimeError(f"{base}: blocos {fmt} precisam do pyarrow")
+            return {table: _from_arrow(reader(f"{base}.{table}{ext}")) for table in TABLES}
+    raise FileNotFoundError(base)
+
+
+def load(directory):
+    """Junta todos os blocos: {tabela: {coluna: ndarray}}, com "game" global."""
+    if np is None:
+        raise RuntimeError("analytics.py precisa do NumPy (pip install numpy)")
+    parts = {table: [] for table in TABLES}
+    offset = 0
+    for chunk in chunk_ids(directory):
+        tables = read_chunk(directory, chunk)
+        for table in ("moves", "captures"):
+            tables[table]["game"] = tables[table]["game"].astype(np.int64) + offset
+        offset += len(tables["games"]["room"])
+        for table in TABLES:
+            parts[table].append(tables[table])
+    result = {}
+    for table, specs in TABLES.items():
+        columns = {}
+        for name, _, dtype in specs:
+            values = [p[name] for p in parts[table]]
+            if values:
+                columns[name] = np.concatenate(values)
+            else:
+                shape = (0, PLACEMENTS) if name == "placements" else (0,)
+                columns[name] = np.zeros(shape, "int64" if name == "game" else dtype)
+        result[table] = columns
+    return result
+
+
+# ---------------------------------------------------------------- consultas
+
+
+def cell_bits(masks):
+    """(N, 25) uint8: bit y * 5 + x de cada máscara."""
+    as_bytes = np.ascontiguousarray(masks, dtype="<u4").view(np.uint8).reshape(-1, 4)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :25]
+
+
+def grid(values, fmt):
+    values = np.asarray(values).reshape(5, 5)
+    return ["  " + " ".join(fmt(v) for v in row) for row in values]
+
+
+def _rate(v):
+    return "   -  " if np.isnan(v) else f"{v:6.1%}"
+
+
+def summary(data):
+    games = data["games"]
+    n = len(games["winner"])
+    lines = [f"partidas: {n}"]
+    if not n:
+        return lines
+    winners = np.bincount(games["winner"].astype(np.int64) + 1, minlength=3)
+    lines.append(f"  vitórias A {winners[1]} ({winners[1] / n:.1%})  "
+                 f"B {winners[2]} ({winners[2] / n:.1%})  empates {winners[0]}")
+    reasons = np.bincount(games["reason"].astype(np.int64), minlength=len(REASONS))
+    lines.append("  motivo: " + "  ".join(f"{r} {c}" for r, c in zip(REASONS, reasons) if c))
+    lines.append(f"  lances: média {games['plies'].mean():.1f}  "
+                 f"p50 {np.median(games['plies']):.0f}  máx {games['plies'].max()}")
+    lines.append(f"  duração: média {games['duration'].mean():.3f}s  "
+                 f"p50 {np.median(games['duration']):.3f}s")
+    lines.append(f"  capturas por partida: {len(data['captures']['cell']) / n:.2f}")
+    return lines
+
+
+def opening(data):
+    """Vitórias de A pela casa da primeira colocação."""
+    games = data["games"]
+    decisive = games["winner"] >= 0
+    first = games["placements"][decisive, 0].astype(np.int64)
+    valid = first < 25
+    first = first[valid]
+    won = (games["winner"][decisive] == 0)[valid]
+    played = np.bincount(first, minlength=25)
+    wins = np.bincount(first, weights=won, minlength=25)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = wins / played
+    return (["vitórias de A pela primeira colocação (partidas decididas)"]
+            + grid(rate, _rate) + ["partidas por casa:"]
+            + grid(played, lambda v: f"{v:6d}"))
+
+
+def layout(data):
+    """Vitórias de A pelas casas que A ocupa ao fim da colocação."""
+    games = data["games"]
+    decisive = games["winner"] >= 0
+    bits = cell_bits(games["layout_a"][decisive])
+    won = games["winner"][decisive] == 0
+    occupied = np.count_nonzero(bits, axis=0)
+    wins = np.count_nonzero(bits[won], axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = wins / occupied
+    return ["vitórias de A com uma peça de A na casa ao fim da colocação"] + grid(rate, _rate)
+
+
+def captures(data):
+    """Mapa de calor das capturas: casa da peça capturada, por quem capturou."""
+    caps = data["captures"]
+    counts = np.bincount(caps["cell"].astype(np.int64) + 25 * caps["player"].astype(np.int64),
+                         minlength=50)
+    lines = []
+    for pid, name in enumerate("AB"):
+        lines.append(f"capturas feitas por {name} ({counts[25 * pid:25 * pid + 25].sum()})")
+        lines += grid(counts[25 * pid:25 * pid + 25], lambda v: f"{v:7d}")
+    return lines
+
+
+def moves(data):
+    """Mapa de calor das casas de destino dos lances."""
+    dst = data["moves"]["dst"].astype(np.int64)
+    return (["destinos dos lances ({})".format(len(dst))]
+            + grid(np.bincount(dst, minlength=25), lambda v: f"{v:8d}"))
+
+
+REPORTS = {"summary": summary, "opening": opening, "layout": layout, "captures": captures,
+           "moves": moves}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estatísticas das partidas gravadas")
+    parser.add_argument("directory")
+    parser.add_argument("--report", nargs="+", choices=REPORTS, default=["summary"])
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    data = load(args.directory)
+    loaded = time.perf_counter() - t0
+    for name in args.report:
+        t0 = time.perf_counter()
+        lines = REPORTS[name](data)
+        print("\n".join(lines))
+        print(f"  ({name}: {(time.perf_counter() - t0) * 1000:.1f}ms)", file=sys.stderr)
+    print(f"carregado em {loaded:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
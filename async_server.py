@@ -0,0 +1,744 @@
+import argparse
+import asyncio
+import itertools
+import secrets
+from collections import deque
+
+import binproto
+import metrics
+from ai import AIPool, TIME_BUDGET
+from analytics import AnalyticsSink, FORMATS, GameRecorder
+from bitboard import BitboardSeegaGame
+from framing import LineFramer, LineTooLong, RECV_SIZE
+from outbound import AsyncOutboundQueue, DROP, MAX_PENDING, POLICIES
+from game import SeegaGame
+from journal import Journal
+from matchmaking import DEFAULT_RATING, Matchmaker, RatingStore
+from room import Room
+from spectators import Audience
+from tablebase import Tablebase
+
+
+"""
+Servidor Seega baseado em asyncio.
+
+Em vez de uma thread por socket e uma única partida por porta (server.py),
+um único event loop atende milhares de salas simultâneas. Cada sala (Room)
+tem sua própria instância de SeegaGame e seus dois jogadores; o Lobby
+mantém a fila de jogadores aguardando e forma uma sala nova a cada par.
+
+Toda escrita passa pela fila de saída do cliente (AsyncOutboundQueue), com
+a política de cliente lento escolhida em --slow-policy.
+
+Um cliente pode enviar "PROTO BIN" para trocar a conexão para o protocolo
+binário compacto (binproto.py); o restante continua em texto.
+
+Enquanto espera no lobby, um jogador pode enviar "VS AI" para jogar contra
+o computador (ai.py): ele ocupa o lugar do Jogador B e suas buscas rodam
+em um pool de processos (--ai-workers, --ai-time), fora do event loop.
+
+Ao ocupar um lugar, o jogador recebe "SESSION token". Se a conexão cair,
+ele pode reconectar e enviar "RESUME token seq" (seq: último "SEQ n"
+recebido) para voltar ao mesmo lugar; o servidor envia só os eventos
+posteriores a seq, ou o tabuleiro completo se eles já saíram do histórico
+da sala. Uma sala sem jogadores espera --session-ttl segundos.
+
+Qualquer conexão que ainda não está em uma sala pode assistir a uma
+partida: "ROOMS" lista as salas e "WATCH id" passa a receber os eventos da
+sala id (spectators.py), sem atrasar as respostas aos jogadores.
+
+Com --ratings ARQUIVO o lobby deixa de parear por ordem de chegada: cada
+jogador espera no Matchmaker (matchmaking.py) até aparecer um adversário de
+rating próximo, em uma faixa que se alarga com a espera. "NAME nome"
+enviado enquanto espera identifica o jogador (responde "RATING nome
+valor"); quem não se identifica é pareado nas varreduras periódicas, com o
+rating inicial; as partidas entre dois jogadores identificados atualizam o rating
+Elo deles, gravado no SQLite ARQUIVO, quando alguém vence ou envia
+"SURRENDER".
+
+Com --analytics DIR, cada partida terminada (lances, capturas, colocação,
+duração e vencedor) vai para os arquivos colunares de DIR (analytics.py),
+consultados depois com "python analytics.py DIR".
+
+Com --tablebase ARQUIVO (tablebase.py) o computador joga os finais
+cobertos pela tabela sem buscar, e "HINT" responde ao jogador o melhor
+lance da posição: "HINT x1 y1 x2 y2 v" (v > 0: vence em v lances; v < 0:
+perde em -v; 0: empate).
+
+Com --metrics-port PORTA o servidor expõe GET /metrics (formato do
+Prometheus, metrics.py): latência por comando, tempo do motor, bytes,
+filas de saída, salas e conexões. --metrics-file ARQUIVO grava o mesmo
+texto periodicamente.
+
+Com --journal DIR, cada sala grava suas jogadas em um diário (journal.py).
+Ao subir, o servidor reconstrói as partidas que estavam em andamento; os
+próximos pares formados pelo lobby continuam essas partidas antes de
+ganharem salas novas.
+
+Uso:
+    python async_server.py [--host HOST] [--port PORT]
+"""
+
+HOST = 'localhost'
+PORT = 12345
+SESSION_TTL = 120.0      # segundos que uma sala vazia espera alguém retomar a sessão
+SWEEP_INTERVAL = 0.25    # segundos entre as varreduras do Matchmaker
+MAX_ROOM_LIST = 100      # salas listadas por ROOMS
+
+# latência dos quadros binários, nos mesmos histogramas dos comandos de texto
+FRAME_SECONDS = {
+    binproto.OP_PLACE: metrics.COMMAND_SECONDS.labels("PLACE"),
+    binproto.OP_MOVE: metrics.COMMAND_SECONDS.labels("MOVE"),
+    binproto.OP_RESTART: metrics.COMMAND_SECONDS.labels("RESTART"),
+}
+
+
+class Connection:
+    """Um cliente conectado: streams, fila de saída, sala e lugar (pid) na sala."""
+
+    def __init__(self, reader, writer, max_pending=MAX_PENDING, policy=DROP):
+        self.reader = reader
+        self.writer = writer
+        self.room = None
+        self.pid = None
+        self.name = None                  # nome dado com NAME enquanto esperava (rating)
+        self.token = None                 # sessão para retomar o lugar (Lobby.resume)
+        self.watching = None              # Audience, se a conexão é de um espectador
+        self.binary = False
+        self.out = AsyncOutboundQueue(writer, max_pending, policy, self.snapshot)
+
+    def snapshot(self):
+        if self.room is None:
+            return b""
+        return self.encode(self.room.catch_up())
+
+    def encode(self, lines):
+        if self.binary:
+            return binproto.encode_lines(lines)
+        return "".join(line + "\n" for line in lines).encode()
+
+    def send(self, line):
+        self.out.put(self.encode([line]))
+
+    def send_many(self, lines):
+        if lines:
+            self.out.put(self.encode(lines))
+
+
+class Lobby:
+    """
+    Fila de espera que agrupa jogadores em pares e cria as salas.
+
+    Cada lugar ocupado recebe um token de sessão. Uma sala cujos jogadores
+    saíram continua existindo até expire(), para que eles possam retomar o
+    lugar com resume().
+
+    Com ratings (RatingStore), a fila é um Matchmaker em vez da ordem de
+    chegada, e as vitórias nas salas de dois jogadores identificados
+    atualizam os ratings.
+    """
+
+    def __init__(self, engine=SeegaGame, journal=None, ratings=None, matchmaker=None,
+                 analytics=None):
+        self.engine = engine
+        self.journal = journal
+        self.analytics = analytics
+        self.ratings = ratings
+        if matchmaker is None and ratings is not None:
+            matchmaker = Matchmaker()
+        self.matchmaker = matchmaker
+        self.waiting = deque()
+        self.rooms = {}
+        self.members = {}                 # room_id → [Connection, Connection]
+        self.sessions = {}                # token → (room_id, pid)
+        self.tokens = {}                  # room_id → tokens da sala
+        self.identities = {}              # room_id → (nome A, nome B) das salas com rating
+        self.recovered = deque()          # salas reconstruídas do diário, sem jogadores
+        first = 1
+        if journal is not None:
+            for room_id, game in journal.recover(engine).items():
+                room = Room(room_id, engine, journal.open_room(room_id), game)
+                self.record(room)
+                self.recovered.append(room)
+            first = max(first, journal.next_id())
+        self._ids = itertools.count(first)
+
+    def new_room(self):
+        room_id = next(self._ids)
+        journal = self.journal.open_room(room_id) if self.journal is not None else None
+        return self.record(Room(room_id, self.engine, journal))
+
+    def record(self, room):
+        # uma partida recuperada do diário é gravada sem as jogadas anteriores à queda
+        if self.analytics is not None:
+            room.recorder = GameRecorder(self.analytics, room.room_id)
+        return room
+
+    def seat(self, conn, room, pid):
+        conn.room, conn.pid = room, pid
+        conn.token = secrets.token_urlsafe(12)
+        self.sessions[conn.token] = (room.room_id, pid)
+        self.tokens.setdefault(room.room_id, []).append(conn.token)
+
+    def rating(self, conn):
+        if self.ratings is None or conn.name is None:
+            return DEFAULT_RATING
+        return self.ratings.get(conn.name)
+
+    def join(self, conn):
+        """Coloca conn na fila; retorna a sala criada se formou um par."""
+        if self.matchmaker is None:
+            self.waiting.append(conn)
+            rooms = self.pair()
+            return rooms[0] if rooms else None
+        if conn.name is None:
+            # quem acabou de conectar só é pareado na próxima varredura (pair),
+            # para que um NAME enviado logo em seguida valha para o pareamento
+            self.matchmaker.insert(conn, DEFAULT_RATING)
+            return None
+        other = self.matchmaker.add(conn, self.rating(conn))
+        return None if other is None else self.open_room(other, conn)
+
+    def identify(self, conn, name):
+        """NAME enquanto espera: recoloca conn na fila com o rating de name."""
+        conn.name = name
+        if self.matchmaker is None or not self.matchmaker.remove(conn):
+            return None
+        return self.join(conn)
+
+    def pair(self):
+        """Forma as salas possíveis com quem está na fila; retorna as salas novas."""
+        if self.matchmaker is not None:
+            return [self.open_room(a, b) for a, b in self.matchmaker.sweep()]
+        rooms = []
+        while len(self.waiting) >= 2:
+            rooms.append(self.open_room(self.waiting.popleft(), self.waiting.popleft()))
+        return rooms
+
+    def open_room(self, a, b):
+        room = self.recovered.popleft() if self.recovered else self.new_room()
+        self.rooms[room.room_id] = room
+        self.members[room.room_id] = [a, b]
+        for pid, c in enumerate((a, b)):
+            self.seat(c, room, pid)
+        if self.ratings is not None and a.name is not None and b.name is not None:
+            self.identities[room.room_id] = (a.name, b.name)
+            room.on_result = self.result
+        return room
+
+    def result(self, room, winner):
+        names = self.identities.get(room.room_id)
+        if names is not None and names[0] != names[1]:
+            self.ratings.record(names[winner], names[1 - winner])
+
+    def unqueue(self, conn):
+        if self.matchmaker is not None:
+            self.matchmaker.remove(conn)
+            return
+        try:
+            self.waiting.remove(conn)
+        except ValueError:
+            pass
+
+    def requeue(self, conn):
+        """Devolve conn ao início da fila (ao Matchmaker, sem parear: ver pair)."""
+        if self.matchmaker is not None:
+            self.matchmaker.insert(conn, self.rating(conn))
+        else:
+            self.waiting.appendleft(conn)
+
+    def join_ai(self, conn):
+        """Tira conn da fila e cria uma sala em que o Jogador B é o computador."""
+        self.unqueue(conn)
+        room = self.new_room()
+        self.rooms[room.room_id] = room
+        self.members[room.room_id] = [conn]
+        self.seat(conn, room, 0)
+        return room
+
+    def session(self, token):
+        """(sala, pid) do lugar da sessão token, se a sala existe e o lugar está vago."""
+        entry = self.sessions.get(token)
+        if entry is None:
+            return None
+        room_id, pid = entry
+        room = self.rooms.get(room_id)
+        if room is None or any(c.pid == pid for c in self.members.get(room_id, ())):
+            return None
+        return room, pid
+
+    def resume(self, conn, room, pid, token):
+        """Devolve a conn (já liberada com release) o lugar pid da sala."""
+        conn.room, conn.pid, conn.token = room, pid, token
+        self.members.setdefault(room.room_id, []).append(conn)
+
+    def release(self, conn):
+        """
+        Tira conn da fila, ou da sala em que foi posta ao conectar se nela
+        ainda não houve nenhuma jogada, para que vá para outro lugar
+        (retomar uma sessão, assistir a uma sala). A sala é desfeita e o
+        outro jogador volta para o início da fila.
+
+        Retorna (liberada, conexões devolvidas à fila).
+        """
+        current = conn.room
+        if current is None:
+            self.unqueue(conn)
+            return True, []
+        members = self.members.get(current.room_id, [])
+        if current.seq or len(members) < 2 or conn not in members:
+            return False, []
+        requeued = [c for c in members if c is not conn]
+        self.close(current.room_id)
+        for c in requeued:
+            c.room = c.pid = c.token = None
+            self.requeue(c)
+        conn.room = conn.pid = conn.token = None
+        return True, requeued
+
+    def leave(self, conn):
+        if conn.room is None:
+            self.unqueue(conn)
+            return []
+        members = self.members.get(conn.room.room_id, [])
+        others = [c for c in members if c is not conn]
+        if others:
+            self.members[conn.room.room_id] = others
+        else:
+            # a sala fica à espera de quem retomar a sessão até expire()
+            self.members.pop(conn.room.room_id, None)
+        return others
+
+    def expire(self, room_id):
+        """Fecha a sala se ninguém voltou para ela; retorna True se fechou."""
+        if self.members.get(room_id) or room_id not in self.rooms:
+            return False
+        self.close(room_id)
+        return True
+
+    def close(self, room_id):
+        self.members.pop(room_id, None)
+        self.rooms.pop(room_id, None)
+        self.identities.pop(room_id, None)
+        for token in self.tokens.pop(room_id, ()):
+            self.sessions.pop(token, None)
+        if self.journal is not None:
+            self.journal.close_room(room_id)
+
+
+class SeegaServer:
+    def __init__(self, host=HOST, port=PORT, max_pending=MAX_PENDING, slow_policy=DROP,
+                 engine=SeegaGame, ai_workers=None, ai_time=TIME_BUDGET, journal=None,
+                 session_ttl=SESSION_TTL, tablebase=None, ratings=None, analytics=None):
+        self.host = host
+        self.port = port
+        self.session_ttl = session_ttl
+        self.expiring = {}                # room_id → expiração agendada da sala vazia
+        self.audiences = {}               # room_id → Audience
+        self.connections = set()
+        self.max_pending = max_pending
+        self.slow_policy = slow_policy
+        self.journal = journal
+        self.ratings = ratings
+        self.analytics = analytics
+        self.lobby = Lobby(engine, journal, ratings, analytics=analytics)
+        self.sweeper = None
+        self.server = None
+        self.ai_workers = ai_workers
+        self.ai_time = ai_time
+        self.ai_pool = None
+        self.ai_rooms = {}                # room_id → task da busca em andamento ou None
+        self.tablebase_path = tablebase
+        self.tablebase = Tablebase(tablebase) if tablebase is not None else None
+
+    def broadcast(self, room, lines):
+        if not lines:
+            return
+        # codifica uma vez por protocolo, não uma vez por destinatário
+        data = {}
+        for c in self.lobby.members.get(room.room_id, ()):
+            encoded = data.get(c.binary)
+            if encoded is None:
+                encoded = data[c.binary] = c.encode(lines)
+            c.out.put(encoded)
+        # espectadores depois dos jogadores, em uma task à parte
+        audience = self.audiences.get(room.room_id)
+        if audience is not None:
+            audience.publish(lines)
+
+    def welcome(self, conn):
+        conn.send_many(conn.room.welcome(conn.pid) + [f"SESSION {conn.token}"])
+
+    def open_room(self, room):
+        """Boas-vindas aos dois jogadores de uma sala recém-formada e seus nomes."""
+        members = self.lobby.members[room.room_id]
+        for c in members:
+            self.welcome(c)
+        for c in members:
+            if c.name is not None:
+                _, broadcasts = room.dispatch(c.pid, f"NAME {c.name}")
+                self.broadcast(room, broadcasts)
+
+    def handle_command(self, conn, msg):
+        if msg.startswith("RESUME "):
+            self.resume(conn, msg)
+            return
+        if msg.startswith("WATCH "):
+            self.watch(conn, msg)
+            return
+        if msg == "ROOMS":
+            ids = sorted(self.lobby.rooms)[:MAX_ROOM_LIST]
+            conn.send(" ".join(["ROOMS"] + [str(i) for i in ids]))
+            return
+        if conn.watching is not None:
+            conn.send("Você está assistindo.")
+            return
+        if conn.room is None:
+            if msg == "VS AI":
+                self.start_ai_game(conn)
+            elif msg.startswith("NAME ") and msg[5:].strip():
+                self.identify(conn, msg[5:].strip())
+            else:
+                conn.send("Aguardando oponente...")
+            return
+        if msg == "HINT":
+            self.hint(conn)
+            return
+        replies, broadcasts = conn.room.dispatch(conn.pid, msg)
+        conn.send_many(replies)
+        self.broadcast(conn.room, broadcasts)
+        self.schedule_ai(conn.room)
+
+    def identify(self, conn, name):
+        room = self.lobby.identify(conn, name)
+        if self.ratings is not None:
+            conn.send(f"RATING {name} {self.ratings.get(name):.0f}")
+        elif room is None:
+            conn.send("Aguardando oponente...")
+        if room is not None:
+            self.open_room(room)
+
+    async def sweep(self):
+        """Pareia periodicamente quem espera há tempo bastante para a faixa alargar."""
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            for room in self.lobby.pair():
+                self.open_room(room)
+
+    def hint(self, conn):
+        """HINT: melhor lance da tablebase para quem está na vez."""
+        game = conn.room.game
+        hit = None
+        if self.tablebase is not None and game.turn == conn.pid:
+            hit = self.tablebase.best_move(game)
+        if hit is None:
+            conn.send("Sem dica para esta posição.")
+            return
+        move, value = hit
+        conn.send("HINT %d %d %d %d %d" % (move + (value,)))
+
+    def start_ai_game(self, conn):
+        if self.ai_pool is None:
+            self.ai_pool = AIPool(self.ai_workers, self.ai_time, self.tablebase_path)
+        room = self.lobby.join_ai(conn)
+        self.ai_rooms[room.room_id] = None
+        self.welcome(conn)
+        _, broadcasts = room.dispatch(1, "NAME Computador")
+        self.broadcast(room, broadcasts)
+
+    def resume(self, conn, msg):
+        """RESUME token seq: retoma o lugar da sessão e envia só os eventos após seq."""
+        try:
+            _, token, seq = msg.split()
+            last_seq = int(seq)
+        except ValueError:
+            conn.send("Formato inválido. Use: RESUME token seq")
+            return
+        seat = self.lobby.session(token)
+        # posto em uma sala ao conectar, o cliente já trocou de tabuleiro
+        welcomed = conn.room is not None
+        if seat is None or not self.release(conn):
+            conn.send("Sessão expirada.")
+            return
+        room, pid = seat
+        self.lobby.resume(conn, room, pid, token)
+        handle = self.expiring.pop(room.room_id, None)
+        if handle is not None:
+            handle.cancel()
+        conn.send_many(room.resume(pid, last_seq, full=welcomed) + [f"SESSION {token}"])
+        for c in self.lobby.members[room.room_id]:
+            if c is not conn:
+                c.send(room.comeback(pid))
+        self.schedule_ai(room)
+
+    def release(self, conn):
+        """
+        Lobby.release() e os avisos: quem voltou para a fila recebe
+        "Aguardando oponente..." ou já entra em uma sala nova.
+        """
+        previous = conn.room
+        released, requeued = self.lobby.release(conn)
+        if not released:
+            return False
+        if conn.watching is not None:
+            conn.watching.remove(conn)
+        if previous is not None:
+            self.close_audience(previous.room_id)
+        paired = self.lobby.pair()
+        for c in requeued:
+            if c.room is None:
+                c.send("Aguardando oponente...")
+        for room in paired:
+            self.open_room(room)
+        return True
+
+    def expire_room(self, room_id):
+        self.expiring.pop(room_id, None)
+        if self.lobby.expire(room_id):
+            self.ai_rooms.pop(room_id, None)
+            self.close_audience(room_id)
+
+    def watch(self, conn, msg):
+        """WATCH id: conn deixa a fila do lobby e passa a assistir à sala id."""
+        try:
+            room = self.lobby.rooms.get(int(msg.split()[1]))
+        except ValueError:
+            room = None
+        if room is None or room is conn.room:
+            conn.send("Sala inexistente.")
+            return
+        if not self.release(conn):
+            conn.send("Você já está em uma partida.")
+            return
+        audience = self.audiences.get(room.room_id)
+        if audience is None:
+            audience = self.audiences[room.room_id] = Audience(room)
+        audience.add(conn)
+
+    def close_audience(self, room_id):
+        audience = self.audiences.pop(room_id, None)
+        if audience is not None:
+            for c in audience.close():
+                c.send("CHAT Sala encerrada.")
+
+    def schedule_ai(self, room):
+        """Se for a vez do computador nessa sala, dispara a busca no pool."""
+        if room.room_id not in self.ai_rooms or self.ai_rooms[room.room_id] is not None:
+            return
+        if room.game.turn != 1:
+            return
+        self.ai_rooms[room.room_id] = asyncio.ensure_future(self.ai_turn(room))
+
+    async def ai_turn(self, room):
+        try:
+            move, _, _ = await self.ai_pool.best_move(room.game)
+        finally:
+            if room.room_id in self.ai_rooms:
+                self.ai_rooms[room.room_id] = None
+        if room.room_id not in self.ai_rooms or move is None:
+            return
+        # a sala pode ter mudado durante a busca (RESTART): jogada inválida é ignorada
+        if len(move) == 2:
+            _, broadcasts = room.place(1, *move)
+        else:
+            _, broadcasts = room.move(1, *move)
+        self.broadcast(room, broadcasts)
+        self.schedule_ai(room)
+
+    def handle_frame(self, conn, frame):
+        """Quadro do protocolo binário: PLACE/MOVE vão direto para a sala."""
+        room = conn.room
+        op = frame[0]
+        if op == binproto.OP_TEXT:
+            msg = frame[1].strip()
+            t0 = metrics.clock()
+            self.handle_command(conn, msg)
+            metrics.command_histogram(msg).observe(metrics.clock() - t0)
+            return
+        if room is None:
+            conn.send("Aguardando oponente...")
+            return
+        if op == binproto.OP_PLACE:
+            replies, broadcasts = room.place(conn.pid, frame[1], frame[2])
+        elif op == binproto.OP_MOVE:
+            replies, broadcasts = room.move(conn.pid, *frame[1:5])
+        elif op == binproto.OP_RESTART:
+            replies, broadcasts = room.dispatch(conn.pid, "RESTART")
+        else:
+            replies, broadcasts = ["Comando desconhecido."], []
+        conn.send_many(replies)
+        self.broadcast(room, broadcasts)
+        self.schedule_ai(room)
+
+    def switch_to_binary(self, conn, lines, framer):
+        """
+        Atende "PROTO BIN". Os bytes que chegaram depois dessa linha já são
+        binários: são remontados e passados ao BinaryFramer.
+        """
+        conn.send("PROTO BIN")
+        conn.binary = True
+        rest = b"".join(line + b"\n" for line in lines) + bytes(framer.buffer)
+        framer = binproto.BinaryFramer()
+        for frame in framer.feed(rest):
+            self.handle_frame(conn, frame)
+        return framer
+
+    async def handle_client(self, reader, writer):
+        conn = Connection(reader, writer, self.max_pending, self.slow_policy)
+        self.connections.add(conn)
+        metrics.CONNECTIONS.inc()
+        room = self.lobby.join(conn)
+        if room is None:
+            conn.send("Aguardando oponente...")
+        else:
+            self.open_room(room)
+
+        framer = LineFramer()
+        try:
+            while True:
+                data = await reader.read(RECV_SIZE)
+                if not data:
+                    break
+                metrics.BYTES_IN.inc(len(data))
+                if conn.binary:
+                    for frame in framer.feed(data):
+                        histogram = FRAME_SECONDS.get(frame[0])
+                        t0 = metrics.clock()
+                        self.handle_frame(conn, frame)
+                        if histogram is not None:
+                            histogram.observe(metrics.clock() - t0)
+                    continue
+                lines = framer.feed(data)
+                for i, line in enumerate(lines):
+                    msg = line.decode(errors="replace").strip()
+                    if msg == "PROTO BIN":
+                        framer = self.switch_to_binary(conn, lines[i + 1:], framer)
+                        break
+                    if msg:
+                        t0 = metrics.clock()
+                        self.handle_command(conn, msg)
+                        metrics.command_histogram(msg).observe(metrics.clock() - t0)
+        except LineTooLong:
+            conn.send("Linha muito longa.")
+        except binproto.ProtocolError:
+            conn.send("Quadro inválido.")
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(conn)
+            if conn.watching is not None:
+                conn.watching.remove(conn)
+            others = self.lobby.leave(conn)
+            if not others and conn.room is not None and conn.room.room_id in self.lobby.rooms:
+                room_id = conn.room.room_id
+                old = self.expiring.pop(room_id, None)
+                if old is not None:
+                    old.cancel()
+                self.expiring[room_id] = asyncio.get_running_loop().call_later(
+                    self.session_ttl, self.expire_room, room_id)
+            if conn.room is not None:
+                farewell = conn.room.farewell(conn.pid)
+                for c in others:
+                    c.send(farewell)
+            conn.out.close()
+            await conn.out.task
+            writer.close()
+
+    def register_metrics(self):
+        """Gauges lidas na coleta (de outra thread: só cópias e len())."""
+        def connections():
+            roles = {"player": 0, "spectator": 0, "waiting": 0}
+            for c in list(self.connections):
+                role = ("spectator" if c.watching is not None
+                        else "player" if c.room is not None else "waiting")
+                roles[role] += 1
+            return roles
+
+        metrics.gauge("seega_rooms", "Salas ativas.", lambda: len(self.lobby.rooms))
+        metrics.gauge("seega_connections", "Conexões abertas.", connections, "role")
+        metrics.gauge("seega_outbound_queue", "Mensagens nas filas de saída.",
+                      lambda: metrics.queue_depths([c.out for c in list(self.connections)]),
+                      "stat")
+        metrics.gauge("seega_ai_rooms", "Salas contra o computador.",
+                      lambda: len(self.ai_rooms))
+
+    async def start(self):
+        self.register_metrics()
+        if self.journal is not None:
+            self.journal.start()
+        if self.analytics is not None:
+            self.analytics.start()
+        if self.ratings is not None:
+            self.ratings.start()
+            self.sweeper = asyncio.ensure_future(self.sweep())
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Servidor asyncio rodando em {self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor Seega multi-salas (asyncio)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--queue-size", type=int, default=MAX_PENDING,
+                        help="mensagens pendentes por cliente")
+    parser.add_argument("--slow-policy", choices=POLICIES, default=DROP,
+                        help="o que fazer quando a fila de um cliente enche")
+    parser.add_argument("--bitboard", action="store_true",
+                        help="usa o motor BitboardSeegaGame nas salas")
+    parser.add_argument("--ai-workers", type=int, default=None,
+                        help="processos de busca do computador (padrão: núcleos)")
+    parser.add_argument("--ai-time", type=float, default=TIME_BUDGET,
+                        help="tempo de busca por jogada do computador (s)")
+    parser.add_argument("--journal", metavar="DIR", default=None,
+                        help="grava as partidas em DIR e recupera as que estavam em andamento")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync a cada gravação em grupo do diário")
+    parser.add_argument("--session-ttl", type=float, default=SESSION_TTL,
+                        help="segundos para um jogador desconectado retomar o lugar")
+    parser.add_argument("--analytics", metavar="DIR", default=None,
+                        help="grava as partidas terminadas em arquivos colunares em DIR")
+    parser.add_argument("--analytics-format", choices=FORMATS, default=None,
+                        help="parquet, arrow ou npz (padrão: parquet se houver pyarrow)")
+    parser.add_argument("--ratings", metavar="ARQUIVO", default=None,
+                        help="pareia por rating e grava os ratings nesse SQLite")
+    parser.add_argument("--tablebase", metavar="ARQUIVO", default=None,
+                        help="tablebase de finais (tablebase.py) para o computador e HINT")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="expõe GET /metrics (Prometheus) nessa porta")
+    parser.add_argument("--metrics-file", default=None,
+                        help="grava as métricas nesse arquivo periodicamente")
+    args = parser.parse_args(argv)
+    if args.metrics_port is not None:
+        metrics.serve(args.host, args.metrics_port)
+    if args.metrics_file is not None:
+        metrics.dump(args.metrics_file)
+    engine = BitboardSeegaGame if args.bitboard else SeegaGame
+    journal = Journal(args.journal, sync=args.fsync) if args.journal else None
+    ratings = RatingStore(args.ratings) if args.ratings else None
+    analytics = (AnalyticsSink(args.analytics, args.analytics_format)
+                 if args.analytics else None)
+    server = SeegaServer(args.host, args.port, args.queue_size, args.slow_policy, engine,
+                         args.ai_workers, args.ai_time, journal, args.session_ttl,
+                         args.tablebase, ratings, analytics)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if journal is not None:
+            journal.close()
+        if ratings is not None:
+            ratings.close()
+        if analytics is not None:
+            analytics.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import numpy as np
+
+from bitboard import CELLS, CENTER, CENTER_BIT, COL0, COL4, FULL_MASK, ORTHOGONAL, SIZE
+from game import SeegaGame
+
+
+"""
+Motor em lote: N tabuleiros de Seega de uma vez, com NumPy.
+
+SeegaBatch recebe e devolve os tabuleiros como um array (N, 5, 5) int8
+(EMPTY, A, B e BLOCKED no centro durante a colocação), mas guarda cada
+tabuleiro como em BitboardSeegaGame: dois uint32 de 25 bits, um por
+jogador, em bits (2, N). Fatiar o (N, 5, 5) casa a casa custa um laço do
+NumPy por linha de 5 células; com os bits cada operação é um deslocamento
+ou um & sobre N inteiros, e o lote todo anda em algumas dezenas delas.
+
+Com as mesmas regras de SeegaGame:
+    move_masks()/legal_move_masks()  (N, 4, 5, 5): peças que podem mover em
+                                     cada direção de ORTHOGONAL;
+    place_masks()                    (N, 5, 5): casas livres para colocar;
+    counts(), winners(), blocked()   peças no tabuleiro, check_winner(),
+                                     is_blocked();
+    legal_counts()                   len(legal_moves());
+    place(), move(), play()          place_piece()/move_piece()/play() em
+                                     todos os tabuleiros, com as capturas de
+                                     check_capture() e a troca de vez;
+    random_moves(), play_random()    uma jogada legal sorteada por tabuleiro.
+
+Para uma partida só, BitboardSeegaGame continua mais rápido; o lote
+compensa a partir de algumas centenas de posições (bots, análises).
+tests/test_batch.py confere o lote contra SeegaGame e
+benchmarks/bench_batch.py mede posições por segundo.
+"""
+
+EMPTY, A, B, BLOCKED = 0, 1, 2, 3
+CELL_CODES = {' ': EMPTY, 'A': A, 'B': B, 'X': BLOCKED}
+CELL_CHARS = " ABX"
+
+_U32 = np.uint32
+_FULL = _U32(FULL_MASK)
+_PLACEABLE = _U32(FULL_MASK & ~CENTER_BIT)
+_SHIFTS = np.arange(CELLS, dtype=_U32)
+# deslocamento da célula em cada direção de ORTHOGONAL; o último é a colocação
+_DELTA = np.array([dy * SIZE + dx for dx, dy in ORTHOGONAL] + [0])
+_NOT_COL0 = _U32(FULL_MASK & ~COL0)
+_NOT_COL4 = _U32(FULL_MASK & ~COL4)
+_OPPOSITE = (1, 0, 3, 2)
+
+# destinos de onde cabe uma captura em cada direção (a casa a 2 passos existe)
+_CAPTURE_FROM = tuple(
+    _U32(sum(1 << (y * SIZE + x) for y in range(SIZE) for x in range(SIZE)
+             if 0 <= x + 2 * dx < SIZE and 0 <= y + 2 * dy < SIZE))
+    for dx, dy in ORTHOGONAL
+)
+
+
+def popcount(bits):
+    return np.bitwise_count(bits)
+
+
+def _select(cond, x, y):
+    """
+    np.where(cond, x, y) para uint32 com máscaras em vez de desvios: com cond
+    aleatório (a vez de cada tabuleiro) é umas 5 vezes mais rápido.
+    """
+    return y ^ ((x ^ y) & (cond * _U32(0xFFFFFFFF)))
+
+
+def _step(bits, d):
+    """Desloca cada bit uma casa na direção ORTHOGONAL[d]; o que sai do tabuleiro some."""
+    if d == 0:
+        return (bits & _NOT_COL0) >> 1
+    if d == 1:
+        return (bits & _NOT_COL4) << 1
+    if d == 2:
+        return bits >> SIZE
+    return (bits << SIZE) & _FULL
+
+
+def _mobile(pieces, empty):
+    """(4, N): peças de pieces com a casa vizinha vazia em cada direção de ORTHOGONAL."""
+    return np.stack([pieces & _step(empty, _OPPOSITE[d]) for d in range(4)])
+
+
+# _NTH[m, k]: índice do k-ésimo bit ligado de m, para m de 13 bits
+_NTH = np.argsort(~((np.arange(1 << 13)[:, None] >> np.arange(13)) & 1).astype(bool),
+                  axis=1, kind="stable").astype(np.uint8)
+
+
+def _nth_bit(mask, k):
+    """Índice do k-ésimo bit ligado (a partir de 0) de cada mask, em duas metades."""
+    low = mask & _U32((1 << 13) - 1)
+    below = popcount(low)
+    high = k >= below
+    return _NTH[_select(high, mask >> 13, low), k - below * high] + high * np.uint8(13)
+
+
+def _unpack(bits):
+    """(N,) uint32 → (N, 5, 5) bool."""
+    return ((bits[:, None] >> _SHIFTS) & 1).astype(bool).reshape(-1, SIZE, SIZE)
+
+
+def _pack(cells):
+    """(N, 25) bool → (N,) uint32."""
+    packed = np.packbits(cells, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u4").ravel().astype(_U32)
+
+
+def _coords(n, *values):
+    return (np.broadcast_to(np.asarray(v, np.int64), (n,)) for v in values)
+
+
+class SeegaBatch:
+    def __init__(self, n=0):
+        self.bits = np.zeros((2, n), _U32)    # peças de A e de B
+        self.turn = np.zeros(n, np.int8)
+        self.placement_phase = np.ones(n, bool)
+        self.placement_count = np.zeros((n, 2), np.int16)
+        self.captured_pieces = np.zeros((n, 2), np.int16)
+
+    def __len__(self):
+        return self.bits.shape[1]
+
+    @classmethod
+    def from_boards(cls, boards, turn=0):
+        """
+        Lote a partir de um array (N, 5, 5) de EMPTY/A/B/BLOCKED. Tabuleiros
+        com BLOCKED no centro estão na colocação, com as peças presentes como
+        colocadas; os outros, na movimentação, com 12 - peças capturadas.
+        """
+        boards = np.asarray(boards, np.int8).reshape(-1, CELLS)
+        batch = cls(len(boards))
+        batch.bits[0] = _pack(boards == A)
+        batch.bits[1] = _pack(boards == B)
+        batch.turn[:] = turn
+        batch.placement_phase[:] = boards[:, CENTER] == BLOCKED
+        counts = batch.counts()
+        placing = batch.placement_phase[:, None]
+        batch.placement_count[:] = np.where(placing, counts, 12)
+        batch.captured_pieces[:] = np.where(placing, 0, 12 - counts[:, ::-1])
+        return batch
+
+    @classmethod
+    def from_games(cls, games):
+        """Lote com o estado de cada SeegaGame/BitboardSeegaGame de games."""
+        codes = bytes(CELL_CODES.get(chr(i), EMPTY) for i in range(256))
+        cells = "".join(g.get_board_string().replace("\n", "") for g in games)
+        boards = np.frombuffer(cells.encode("latin-1").translate(codes), np.int8)
+        batch = cls.from_boards(boards.reshape(-1, SIZE, SIZE))
+        batch.turn[:] = [g.turn for g in games]
+        batch.placement_phase[:] = [g.placement_phase for g in games]
+        batch.placement_count[:] = [g.placement_count for g in games]
+        batch.captured_pieces[:] = [g.captured_pieces for g in games]
+        return batch
+
+    @property
+    def boards(self):
+        """(N, 5, 5) int8 com EMPTY/A/B/BLOCKED (uma cópia: alterar não muda o lote)."""
+        boards = _unpack(self.bits[0]).astype(np.int8)
+        boards[_unpack(self.bits[1])] = B
+        boards[self.placement_phase, 2, 2] = BLOCKED
+        return boards
+
+    def game(self, i, engine=SeegaGame):
+        """O tabuleiro i como um SeegaGame (ou BitboardSeegaGame)."""
+        game = engine()
+        a, b = (int(bits) for bits in self.bits[:, i])
+        state = (int(self.turn[i]), bool(self.placement_phase[i]),
+                 tuple(int(c) for c in self.placement_count[i]),
+                 tuple(int(c) for c in self.captured_pieces[i]))
+        if hasattr(game, "bits"):
+            game.restore((a, b, a.bit_count(), b.bit_count()) + state)
+        else:
+            game.restore((self.board_strings([i])[0].replace("\n", ""),) + state)
+        return game
+
+    def board_strings(self, rows=None):
+        """get_board_string() de cada tabuleiro (ou só dos índices em rows)."""
+        boards = self.boards if rows is None else self.boards[rows]
+        chars = np.frombuffer(CELL_CHARS.encode(), np.uint8)[boards]
+        return ["\n".join(r.tobytes().decode() for r in board) for board in chars]
+
+    # ------------------------------------------------------------ consultas
+
+    def _mine(self, turn=None):
+        turn = self.turn if turn is None else np.broadcast_to(turn, (len(self),))
+        return _select(turn == 1, self.bits[1], self.bits[0])
+
+    def _empty(self):
+        return ~(self.bits[0] | self.bits[1]) & _FULL
+
+    def counts(self):
+        """(N, 2): peças de A e de B no tabuleiro."""
+        return popcount(self.bits).T.astype(np.int16)
+
+    def winners(self, counts=None):
+        """
+        (N,) como check_winner(): 0 se A venceu (B sem peças), 1 se B venceu,
+        -1 se ninguém. Como no SeegaGame, vale também na colocação: um
+        tabuleiro sem peças de A conta como vitória de B.
+        """
+        counts = self.counts() if counts is None else counts
+        winners = np.full(len(self), -1, np.int8)
+        winners[counts[:, 1] == 0] = 0
+        winners[counts[:, 0] == 0] = 1
+        return winners
+
+    def _move_bits(self, turn=None):
+        return _mobile(self._mine(turn), self._empty())
+
+    def blocked(self, turn=None):
+        """(N,) como is_blocked(): jogador sem movimento na fase de movimentação."""
+        empty = self._empty()
+        reach = _step(empty, 0) | _step(empty, 1) | _step(empty, 2) | _step(empty, 3)
+        return ~self.placement_phase & (self._mine(turn) & reach == 0)
+
+    def _legal_bits(self):
+        """(5, N): bits das jogadas de legal_moves(); a linha 4 é a colocação."""
+        placing = self.placement_phase
+        moving = ~placing & (self.bits[0] != 0) & (self.bits[1] != 0)
+        count = self.placement_count
+        placed = count[:, 0] + (count[:, 1] - count[:, 0]) * (self.turn == 1)
+        empty = self._empty()
+        legal = np.empty((5, len(self)), _U32)
+        legal[:4] = _mobile(self._mine() * moving, empty)
+        legal[4] = (empty & _PLACEABLE) * (placing & (placed < 12))
+        return legal
+
+    def move_masks(self, turn=None):
+        """(N, 4, 5, 5): peças do jogador (por padrão o da vez) com a casa vizinha livre."""
+        return _unpack(self._move_bits(turn).T.ravel()).reshape(-1, 4, SIZE, SIZE)
+
+    def legal_move_masks(self):
+        """move_masks() só onde legal_moves() tem movimentos (movimentação, sem vencedor)."""
+        return _unpack(self._legal_bits()[:4].T.ravel()).reshape(-1, 4, SIZE, SIZE)
+
+    def place_masks(self):
+        """(N, 5, 5): casas onde o jogador da vez pode colocar (legal_moves na colocação)."""
+        return _unpack(self._legal_bits()[4])
+
+    def legal_counts(self):
+        """(N,): len(legal_moves()) de cada tabuleiro."""
+        return popcount(self._legal_bits()).sum(axis=0, dtype=np.int64)
+
+    # ------------------------------------------------------------ jogadas
+
+    def _placeable(self, x, y):
+        """(bit da casa, ok) de place_piece(x, y) em cada tabuleiro, sem jogar."""
+        inside = (x >= 0) & (x < SIZE) & (y >= 0) & (y < SIZE)
+        bit = (_U32(1) << np.where(inside, y * SIZE + x, CENTER).astype(_U32)) & _PLACEABLE
+        count = self.placement_count
+        placed = np.where(self.turn == 1, count[:, 1], count[:, 0])
+        ok = self.placement_phase & (bit & self._empty() != 0) & (placed < 12)
+        return bit, ok
+
+    def _movable(self, x1, y1, x2, y2):
+        """(bit de origem, bit de destino, ok) de move_piece(...) em cada tabuleiro, sem jogar."""
+        inside = ((x1 >= 0) & (x1 < SIZE) & (y1 >= 0) & (y1 < SIZE)
+                  & (x2 >= 0) & (x2 < SIZE) & (y2 >= 0) & (y2 < SIZE))
+        src = _U32(1) << np.where(inside, y1 * SIZE + x1, 0).astype(_U32)
+        dst = _U32(1) << np.where(inside, y2 * SIZE + x2, 0).astype(_U32)
+        ok = (inside & ~self.placement_phase & (self._mine() & src != 0)
+              & (self._empty() & dst != 0) & (np.abs(x1 - x2) + np.abs(y1 - y2) == 1))
+        return src, dst, ok
+
+    def _make(self, src, dst, ok):
+        """
+        Como BitboardSeegaGame.make_move(), sem validação: joga src → dst nos
+        tabuleiros com ok (na colocação src == dst), com as capturas, a
+        contagem de peças, o fim da colocação e a troca de vez.
+        Retorna as capturas (N, 4) como move().
+        """
+        is_b = self.turn == 1
+        placing = self.placement_phase
+        is_a = ~is_b
+        a, b = self.bits
+        mine = _select(is_b, b, a)
+        theirs = _select(is_b, a, b)
+        mine ^= (src | dst) * ok
+
+        dst = dst * (ok & ~placing)
+        captures = []
+        for d in range(4):
+            near = _step(dst & _CAPTURE_FROM[d], d)
+            captured = (theirs & near != 0) & (mine & _step(near, d) != 0)
+            theirs &= ~(near * captured)
+            captures.append(captured)
+        self.bits[0] = _select(is_b, theirs, mine)
+        self.bits[1] = _select(is_b, mine, theirs)
+
+        taken = captures[0].astype(np.int16) + captures[1] + captures[2] + captures[3]
+        self.captured_pieces[:, 0] += taken * is_a
+        self.captured_pieces[:, 1] += taken * is_b
+        placed = ok & placing
+        count = self.placement_count
+        count[:, 0] += placed & is_a
+        count[:, 1] += placed & is_b
+        self.placement_phase &= count[:, 0] + count[:, 1] < 24
+
+        # o adversário bloqueado passa a vez de volta, como em place/move_piece
+        turn = self.turn ^ ok
+        self.turn = turn ^ (ok & self.blocked(turn))
+        return np.stack(captures, axis=1)
+
+    def place(self, x, y, active=True):
+        """
+        place_piece(x[i], y[i]) em cada tabuleiro i com active[i] (todos, por
+        padrão). Retorna (N,) bool com as colocações aceitas.
+        """
+        bit, ok = self._placeable(*_coords(len(self), x, y))
+        ok &= active
+        self._make(bit, bit, ok)
+        return ok
+
+    def move(self, x1, y1, x2, y2, active=True):
+        """
+        move_piece(x1[i], y1[i], x2[i], y2[i]) em cada tabuleiro i com
+        active[i], com as capturas. Retorna (aceitas (N,) bool, capturas
+        (N, 4) bool na ordem de ORTHOGONAL a partir do destino).
+        """
+        src, dst, ok = self._movable(*_coords(len(self), x1, y1, x2, y2))
+        ok &= active
+        return ok, self._make(src, dst, ok)
+
+    def play(self, x1, y1, x2, y2, active=True):
+        """
+        play() de cada tabuleiro: place(x1, y1) nos que estão na colocação,
+        move(x1, y1, x2, y2) nos outros. Retorna (aceitas, capturas) como move().
+        """
+        x1, y1, x2, y2 = _coords(len(self), x1, y1, x2, y2)
+        bit, placed = self._placeable(x1, y1)
+        src, dst, moved = self._movable(x1, y1, x2, y2)
+        placing = self.placement_phase
+        ok = np.where(placing, placed, moved) & active
+        return ok, self._make(_select(placing, bit, src), _select(placing, bit, dst), ok)
+
+    def _random_cells(self, rng):
+        """(origem, destino, tem jogada): uma jogada legal sorteada por tabuleiro, em células."""
+        n = len(self)
+        legal = self._legal_bits()
+        per_kind = popcount(legal).astype(np.int32)
+        total = per_kind[0] + per_kind[1] + per_kind[2] + per_kind[3] + per_kind[4]
+        k = (rng.random(n) * total).astype(np.int32)
+        kind = np.zeros(n, np.intp)
+        skip = np.ones(n, bool)
+        for d in range(4):                 # na colocação só a linha 4 tem jogadas
+            skip &= k >= per_kind[d]
+            k -= per_kind[d] * skip
+            kind += skip
+        src = _nth_bit(legal.ravel()[kind * n + np.arange(n)], k).astype(np.intp)
+        return src, src + _DELTA[kind], total > 0
+
+    def random_moves(self, rng):
+        """
+        Uma jogada legal sorteada (uniforme) por tabuleiro, com rng um
+        numpy.random.Generator. Retorna (x1, y1, x2, y2, tem jogada); na
+        colocação x2/y2 repetem x1/y1.
+        """
+        src, dst, has = self._random_cells(rng)
+        return src % SIZE, src // SIZE, dst % SIZE, dst // SIZE, has
+
+    def play_random(self, rng):
+        """Aplica random_moves() em todos os tabuleiros; retorna quais jogaram."""
+        src, dst, has = self._random_cells(rng)
+        self._make(_U32(1) << src.astype(_U32), _U32(1) << dst.astype(_U32), has)
+        return has
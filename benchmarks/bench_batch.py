@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# também como script (python benchmarks/bench_batch.py), não só com -m
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import SeegaBatch
+from bitboard import BitboardSeegaGame
+from game import SeegaGame
+
+
+"""
+Motor em lote (batch.py) x SeegaGame: posições/s.
+
+Sorteia --positions posições de partidas aleatórias (colocação e
+movimentação, inclusive partidas já decididas e jogadores bloqueados) e
+mede posições/s em Python (SeegaGame e BitboardSeegaGame) e no lote:
+    avaliação  jogadas legais e vencedor (contando as peças) de cada posição;
+    passo      um passo de self-play: gerar as jogadas legais, sortear uma,
+               aplicá-la com as capturas e a troca de vez, ver o vencedor.
+
+A equivalência do lote com SeegaGame é conferida em tests/test_batch.py.
+
+Uso:
+    python -m benchmarks.bench_batch --positions 10000
+    python benchmarks/bench_batch.py --positions 10000
+"""
+
+
+def random_positions(count, rng, engine=SeegaGame):
+    games = []
+    for _ in range(count):
+        game = engine()
+        for _ in range(rng.randrange(0, 120)):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.play(rng.choice(moves))
+        games.append(game)
+    return games
+
+
+def scalar_eval(games, rng):
+    for game in games:
+        game.legal_moves()
+        game.check_winner()
+
+
+def batch_eval(batch, rng):
+    batch.legal_counts()
+    batch.winners()
+
+
+def scalar_step(games, rng):
+    for game in games:
+        moves = game.legal_moves()
+        if moves:
+            game.play(rng.choice(moves))
+        game.check_winner()
+
+
+def batch_step(batch, rng):
+    batch.play_random(rng)
+    batch.winners()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Motor em lote x SeegaGame")
+    parser.add_argument("--positions", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=20, help="passos de self-play medidos")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    games = random_positions(args.positions, rng)
+    nrng = np.random.default_rng(args.seed)
+    for title, scalar_fn, batch_fn in (("avaliação", scalar_eval, batch_eval),
+                                       ("passo", scalar_step, batch_step)):
+        rates = {}
+        for label, engine in (("SeegaGame", SeegaGame), ("bitboard", BitboardSeegaGame)):
+            scalar = random_positions(args.positions, random.Random(args.seed), engine)
+            t0 = time.perf_counter()
+            for _ in range(args.steps):
+                scalar_fn(scalar, rng)
+            rates[label] = args.positions * args.steps / (time.perf_counter() - t0)
+        batch = SeegaBatch.from_games(games)
+        t0 = time.perf_counter()
+        for _ in range(args.steps):
+            batch_fn(batch, nrng)
+        rates["lote"] = args.positions * args.steps / (time.perf_counter() - t0)
+        print(f"{title} ({args.positions} posições, {args.steps} vezes)")
+        for label, rate in rates.items():
+            print(f"  {label:10s} {rate:14,.0f} posições/s  ({rate / rates['SeegaGame']:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import server
+from benchmarks.bench_locks import FakeSocket, LegacyClient, percentile
+
+
+"""
+Latência de broadcast em função do número de destinatários lentos.
+
+Para cada quantidade de clientes (--sizes), mede quanto tempo uma chamada
+a server.broadcast() leva quando uma fração deles (--slow-ratio) tem um
+socket lento, com envio síncrono (modelo antigo) e com as filas de saída.
+
+Uso:
+    python -m benchmarks.bench_broadcast --sizes 2,16,64 --slow 1
+"""
+
+
+def measure(client_cls, size, slow_count, delay, rounds):
+    server.clients[:] = [
+        client_cls(FakeSocket(delay if i < slow_count else 0), i % 2)
+        for i in range(size)
+    ]
+    times = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        server.broadcast([f"CHAT mensagem {i}"])
+        times.append(time.perf_counter() - t0)
+    for c in server.clients:
+        if hasattr(c, "out"):
+            c.out.close()
+    server.clients[:] = []
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latência de broadcast")
+    parser.add_argument("--sizes", default="2,16,64")
+    parser.add_argument("--slow-ratio", type=float, default=0.25)
+    parser.add_argument("--slow", type=float, default=1.0, help="atraso do socket lento (ms)")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    for size in map(int, args.sizes.split(",")):
+        slow_count = max(1, int(size * args.slow_ratio))
+        for label, cls in (("síncrono", LegacyClient), ("filas", server.Client)):
+            times = measure(cls, size, slow_count, args.slow / 1000, args.rounds)
+            print(f"{size:4d} clientes ({slow_count} lentos) {label:8s}"
+                  f"  p50={percentile(times, 50) * 1e3:.3f}ms"
+                  f"  p99={percentile(times, 99) * 1e3:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
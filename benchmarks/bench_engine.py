@@ -0,0 +1,82 @@
+import argparse
+import random
+import time
+
+from bitboard import BitboardSeegaGame
+from game import SeegaGame
+
+
+"""
+Benchmark do motor: SeegaGame (listas) x BitboardSeegaGame.
+
+Gera partidas aleatórias (colocação completa e movimentos até acabar ou
+atingir --max-moves), grava a sequência de jogadas e a reaplica nos dois
+motores, chamando check_winner() depois de cada movimento como o servidor
+faz. Confere que os dois chegam ao mesmo tabuleiro e mostra jogadas/s.
+
+Uso:
+    python -m benchmarks.bench_engine --games 500
+"""
+
+ORTHO = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def random_game(rng, max_moves):
+    game = SeegaGame()
+    placements = [(x, y) for y in range(5) for x in range(5) if (x, y) != (2, 2)]
+    rng.shuffle(placements)
+    for x, y in placements:
+        game.place_piece(x, y)
+    moves = []
+    for _ in range(max_moves):
+        symbol = game.players[game.turn]
+        options = [(x, y, x + dx, y + dy)
+                   for y in range(5) for x in range(5) if game.board[y][x] == symbol
+                   for dx, dy in ORTHO
+                   if 0 <= x + dx < 5 and 0 <= y + dy < 5 and game.board[y + dy][x + dx] == ' ']
+        if not options or game.check_winner():
+            break
+        move = rng.choice(options)
+        game.move_piece(*move)
+        moves.append(move)
+    return placements, moves, game.get_board_string()
+
+
+def replay(engine_cls, games):
+    boards = []
+    for placements, moves, _ in games:
+        game = engine_cls()
+        for x, y in placements:
+            game.place_piece(x, y)
+        for move in moves:
+            game.move_piece(*move)
+            game.check_winner()
+        boards.append(game.get_board_string())
+    return boards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SeegaGame x BitboardSeegaGame")
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--max-moves", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    games = [random_game(rng, args.max_moves) for _ in range(args.games)]
+    actions = sum(len(p) + len(m) for p, m, _ in games)
+    expected = [board for _, _, board in games]
+
+    rates = {}
+    for label, cls in (("listas", SeegaGame), ("bitboard", BitboardSeegaGame)):
+        t0 = time.perf_counter()
+        boards = replay(cls, games)
+        elapsed = time.perf_counter() - t0
+        assert boards == expected, f"{label}: tabuleiro final diferente"
+        rates[label] = actions / elapsed
+        print(f"{label:9s} {rates[label]:12,.0f} jogadas/s")
+    print(f"bitboard {rates['bitboard'] / rates['listas']:.1f}x mais rápido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from bitboard import BitboardSeegaGame
+from game import SeegaGame
+from journal import Journal, SNAPSHOT_EVERY, replay
+from room import Room
+
+
+"""
+Diário das salas (journal.py): custo de gravação e tempo de recuperação.
+
+Joga partidas aleatórias em --rooms salas com diário, passando pelas
+mesmas chamadas do servidor (Room.place / Room.move), até somar --events
+registros. Depois:
+    - mede a recuperação (Journal.recover: último SNAPSHOT + cauda) e
+      confere que os tabuleiros reconstruídos batem com os da memória;
+    - mede o replay completo (replay(full=True)), que reaplica todos os
+      eventos desde o início de cada arquivo.
+
+Uso:
+    python -m benchmarks.bench_journal --events 1000000 --rooms 10
+"""
+
+
+def fill(journal, rooms, events, rng):
+    """Joga até o diário ter cerca de events registros; retorna {room_id: Room}."""
+    live = {room_id: Room(room_id, SeegaGame, journal.open_room(room_id))
+            for room_id in range(1, rooms + 1)}
+    written = 0
+    ids = list(live)
+    while written < events:
+        room = live[rng.choice(ids)]
+        game = room.game
+        moves = game.legal_moves()
+        if not moves:
+            room.dispatch(game.turn, "RESTART")
+            written += 1
+            continue
+        move = rng.choice(moves)
+        if len(move) == 2:
+            room.place(game.turn, *move)
+            written += 1
+        else:
+            room.move(game.turn, *move)
+            written += 1 + len(game.last_captures)
+    return live
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gravação e recuperação do diário")
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--snapshot-every", type=int, default=SNAPSHOT_EVERY)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="seega-journal-")
+    try:
+        journal = Journal(directory, snapshot_every=args.snapshot_every)
+        journal.start()
+        t0 = time.perf_counter()
+        live = fill(journal, args.rooms, args.events, random.Random(args.seed))
+        journal.close()
+        elapsed = time.perf_counter() - t0
+        size = sum(os.path.getsize(journal.path(r)) for r in live)
+        print(f"gravação: {args.events / elapsed:12,.0f} eventos/s (com o jogo)  "
+              f"{size / args.events:.2f} B/evento  {size / 1e6:.1f} MB")
+
+        for cls in (SeegaGame, BitboardSeegaGame):
+            t0 = time.perf_counter()
+            games = Journal(directory).recover(cls)
+            elapsed = time.perf_counter() - t0
+            for room_id, room in live.items():
+                assert games[room_id].get_board_string() == room.game.get_board_string()
+            print(f"recuperação {cls.__name__:18s} {elapsed * 1000:8.1f} ms")
+
+            t0 = time.perf_counter()
+            applied = 0
+            for room_id, room in live.items():
+                game, n, _, _ = replay(journal.path(room_id), cls, full=True)
+                assert game.get_board_string() == room.game.get_board_string()
+                applied += n
+            elapsed = time.perf_counter() - t0
+            print(f"replay completo {cls.__name__:14s} {elapsed:8.2f} s  "
+                  f"{applied / elapsed:12,.0f} eventos/s")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import random
+import threading
+import time
+
+import server
+from room import Room
+
+
+"""
+Benchmark de contenção do lock do servidor com threads.
+
+Compara dois modelos processando a mesma carga (dois jogadores enviando
+PLACE/RESTART e um terceiro cliente enviando CHAT), com um dos sockets
+lento (cada sendall demora --slow ms):
+
+    antes:  todo comando roda sob um único lock e os sendall acontecem
+            com o lock adquirido (o handle_client original);
+    depois: server.process_command — só PLACE/MOVE/RESTART pegam o lock
+            da sala, NAME/CHAT não, e os envios apenas enfileiram nas
+            filas de saída de cada cliente.
+
+Mostra os tempos de espera e de posse do lock (p50/p99/máx).
+
+Uso:
+    python -m benchmarks.bench_locks --ops 2000 --slow 2
+"""
+
+
+class TimedLock:
+    """Lock que registra quanto tempo cada thread esperou e o segurou."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = []
+        self.holds = []
+        self._acquired_at = 0.0
+
+    def __enter__(self):
+        t0 = time.perf_counter()
+        self._lock.acquire()
+        self._acquired_at = time.perf_counter()
+        self.waits.append(self._acquired_at - t0)
+        return self
+
+    def __exit__(self, *exc):
+        self.holds.append(time.perf_counter() - self._acquired_at)
+        self._lock.release()
+
+
+class FakeSocket:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def sendall(self, data):
+        if self.delay:
+            time.sleep(self.delay)
+
+
+class LegacyClient(server.Client):
+    """Cliente do modelo antigo: sendall síncrono na thread que envia."""
+
+    def __init__(self, conn, pid):
+        self.conn = conn
+        self.pid = pid
+
+    def send_bytes(self, data):
+        self.conn.sendall(data)
+
+
+def legacy_process(client, msg):
+    with server.room.lock:
+        replies, broadcasts = server.room.dispatch(client.pid, msg)
+        client.send(replies)
+        server.broadcast(broadcasts)
+
+
+def workload(process, clients, ops, seed):
+    def player(client, rng):
+        for i in range(ops):
+            if i % 50 == 49:
+                process(client, "RESTART")
+            else:
+                process(client, f"PLACE {rng.randrange(5)} {rng.randrange(5)}")
+
+    def chatter(client):
+        for i in range(ops):
+            process(client, f"CHAT mensagem {i}")
+
+    threads = [
+        threading.Thread(target=player, args=(clients[0], random.Random(seed))),
+        threading.Thread(target=player, args=(clients[1], random.Random(seed + 1))),
+        threading.Thread(target=chatter, args=(clients[2],)),
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def report(label, lock, elapsed):
+    print(f"{label:7s} tempo={elapsed:.2f}s  aquisições={len(lock.holds)}")
+    for name, values in (("posse", lock.holds), ("espera", lock.waits)):
+        print(f"        {name:6s} p50={percentile(values, 50) * 1e3:.3f}ms"
+              f"  p99={percentile(values, 99) * 1e3:.3f}ms"
+              f"  máx={max(values, default=0) * 1e3:.3f}ms")
+
+
+def run(label, process, client_cls, args):
+    server.room = Room()
+    server.room.lock = lock = TimedLock()
+    server.clients[:] = [
+        client_cls(FakeSocket(0), 0),
+        client_cls(FakeSocket(0), 1),
+        client_cls(FakeSocket(args.slow / 1000), 0),   # cliente lento
+    ]
+    elapsed = workload(process, server.clients, args.ops, args.seed)
+    report(label, lock, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Contenção do lock do servidor")
+    parser.add_argument("--ops", type=int, default=2000, help="comandos por cliente")
+    parser.add_argument("--slow", type=float, default=2.0, help="atraso do socket lento (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    run("antes", legacy_process, LegacyClient, args)
+    run("depois", server.process_command, server.Client, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.loadtest import percentile
+from matchmaking import Matchmaker, RatingStore
+
+
+"""
+Pareamento por rating e gravação dos ratings (matchmaking.py).
+
+Simula --joins entradas na fila, com ratings de uma normal (1500, 300), em
+um relógio virtual de --rate entradas por segundo e uma varredura a cada
+0,25 s virtual. Mede o tempo real de cada decisão de add() (p50/p99),
+entradas por segundo, a espera virtual até o pareamento e a diferença de
+rating dos pares. Depois mede RatingStore.record() e o flush em lote.
+
+Uso:
+    python -m benchmarks.bench_matchmaking --joins 100000 --rate 2000
+"""
+
+
+def queue(args, rng):
+    now = 0.0
+    mm = Matchmaker(clock=lambda: now)
+    joined = {}
+    decisions = []
+    waits = []
+    diffs = []
+    next_sweep = 0.25
+
+    def paired(a, b):
+        waits.append(now - joined.pop(a))
+        waits.append(now - joined.pop(b))
+        diffs.append(abs(ratings[a] - ratings[b]))
+
+    ratings = [rng.gauss(1500, 300) for _ in range(args.joins)]
+    t_start = time.perf_counter()
+    for player in range(args.joins):
+        now = player / args.rate
+        while now >= next_sweep:
+            for a, b in mm.sweep(next_sweep):
+                paired(a, b)
+            next_sweep += 0.25
+        joined[player] = now
+        t0 = time.perf_counter()
+        other = mm.add(player, ratings[player], now)
+        decisions.append(time.perf_counter() - t0)
+        if other is not None:
+            paired(other, player)
+    elapsed = time.perf_counter() - t_start
+
+    print(f"entradas: {args.joins} em {elapsed:.2f}s  ({args.joins / elapsed:.0f}/s,"
+          f" com as varreduras)")
+    print(f"add():   p50={percentile(decisions, 50) * 1e6:.1f}µs"
+          f"  p99={percentile(decisions, 99) * 1e6:.1f}µs"
+          f"  máx={max(decisions) * 1e6:.1f}µs")
+    print(f"pares: {len(diffs)}  esperando: {len(mm)}")
+    print(f"espera virtual: p50={percentile(waits, 50):.2f}s  p99={percentile(waits, 99):.2f}s")
+    print(f"diferença de rating: p50={percentile(diffs, 50):.1f}  p99={percentile(diffs, 99):.1f}")
+
+
+def store(args, rng):
+    path = os.path.join(tempfile.mkdtemp(prefix="seega-ratings-"), "ratings.db")
+    ratings = RatingStore(path)
+    names = [f"jogador{i}" for i in range(args.players)]
+    t0 = time.perf_counter()
+    for _ in range(args.results):
+        a, b = rng.sample(names, 2)
+        ratings.record(a, b)
+    record_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    rows = ratings.flush()
+    flush_s = time.perf_counter() - t0
+    ratings.close()
+    print(f"record(): {args.results / record_s:.0f}/s")
+    print(f"flush: {rows} ratings em {flush_s * 1000:.1f}ms ({os.path.getsize(path)} bytes)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pareamento por rating")
+    parser.add_argument("--joins", type=int, default=100000)
+    parser.add_argument("--rate", type=float, default=2000.0, help="entradas por segundo")
+    parser.add_argument("--players", type=int, default=20000)
+    parser.add_argument("--results", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    queue(args, rng)
+    store(args, rng)
+
+
+if __name__ == "__main__":
+    main()
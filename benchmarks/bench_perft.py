@@ -0,0 +1,88 @@
+import argparse
+import random
+import time
+
+from bitboard import BitboardSeegaGame
+from game import SeegaGame
+
+
+"""
+Perft: contagem de nós da árvore de jogadas legais.
+
+Serve como teste de regressão do gerador de jogadas (os dois motores devem
+produzir as mesmas contagens, e a posição inicial deve bater com PERFT_START)
+e como benchmark de nós/s.
+
+Posições medidas:
+    - inicial (fase de colocação);
+    - --positions posições da fase de movimentação, obtidas com colocações
+      aleatórias seguidas de alguns movimentos aleatórios.
+
+Uso:
+    python -m benchmarks.bench_perft --depth 4
+"""
+
+# contagens da posição inicial (A começa, 24 casas livres)
+PERFT_START = {1: 24, 2: 552, 3: 12144, 4: 255024}
+
+
+def movement_position(rng, warmup):
+    """Sequência de jogadas que leva a uma posição da fase de movimentação."""
+    game = BitboardSeegaGame()
+    history = []
+    while game.placement_phase:
+        move = rng.choice(game.legal_moves())
+        game.play(move)
+        history.append(move)
+    for _ in range(warmup):
+        moves = game.legal_moves()
+        if not moves:
+            break
+        move = rng.choice(moves)
+        game.play(move)
+        history.append(move)
+    return history
+
+
+def run(cls, history, depth):
+    game = cls()
+    for move in history:
+        game.play(move)
+    t0 = time.perf_counter()
+    nodes = game.perft(depth)
+    return nodes, time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft dos motores do Seega")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="movimentos aleatórios após a colocação")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    positions = [("inicial", [])]
+    positions += [(f"movimento #{i + 1}", movement_position(rng, args.warmup))
+                  for i in range(args.positions)]
+
+    totals = {SeegaGame: [0, 0.0], BitboardSeegaGame: [0, 0.0]}
+    for label, history in positions:
+        counts = {}
+        for cls in totals:
+            nodes, elapsed = run(cls, history, args.depth)
+            counts[cls] = nodes
+            totals[cls][0] += nodes
+            totals[cls][1] += elapsed
+        assert counts[SeegaGame] == counts[BitboardSeegaGame], f"{label}: {counts}"
+        if not history and args.depth in PERFT_START:
+            assert counts[SeegaGame] == PERFT_START[args.depth], "perft inicial mudou"
+        print(f"{label:14s} perft({args.depth}) = {counts[SeegaGame]}")
+
+    for cls, (nodes, elapsed) in totals.items():
+        print(f"{cls.__name__:18s} {nodes / elapsed:12,.0f} nós/s")
+
+
+if __name__ == "__main__":
+    main()
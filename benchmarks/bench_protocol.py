@@ -0,0 +1,112 @@
+import argparse
+import random
+import time
+
+import binproto
+from framing import LineFramer
+from game import SeegaGame
+
+
+"""
+Comparação entre o protocolo de texto e o binário (binproto.py).
+
+Gera um fluxo de eventos de partidas aleatórias (PLACE, MOVE, REMOVE e um
+FULL a cada partida, como num replay ou numa transmissão para bots),
+codifica nos dois formatos e mede:
+    - bytes por mensagem;
+    - custo de interpretação: texto com LineFramer + split/int (como o
+      cliente faz) e binário com BinaryFramer.
+
+Uso:
+    python -m benchmarks.bench_protocol --games 200
+"""
+
+ORTHO = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def random_game_events(rng, max_moves=60):
+    game = SeegaGame()
+    events = []
+    cells = [(x, y) for y in range(5) for x in range(5) if (x, y) != (2, 2)]
+    rng.shuffle(cells)
+    for x, y in cells:
+        symbol = game.players[game.turn]
+        game.place_piece(x, y)
+        events.append(f"PLACE {x} {y} {symbol}")
+    for _ in range(max_moves):
+        symbol = game.players[game.turn]
+        moves = [(x, y, x + dx, y + dy)
+                 for y in range(5) for x in range(5) if game.board[y][x] == symbol
+                 for dx, dy in ORTHO
+                 if 0 <= x + dx < 5 and 0 <= y + dy < 5 and game.board[y + dy][x + dx] == ' ']
+        if not moves or game.check_winner():
+            break
+        move = rng.choice(moves)
+        game.move_piece(*move)
+        events.append("MOVE %d %d %d %d %s" % (move + (symbol,)))
+        events.extend(f"REMOVE {x} {y}" for x, y in game.last_captures)
+    events.append("FULL\n" + game.get_board_string() + "\n")
+    return events
+
+
+def parse_text(data, chunk):
+    framer = LineFramer(max_line=1 << 20)
+    count = 0
+    for pos in range(0, len(data), chunk):
+        for line in framer.feed(data[pos:pos + chunk]):
+            parts = line.decode().split()
+            if not parts:
+                continue
+            cmd = parts[0]
+            if cmd == "PLACE":
+                int(parts[1]), int(parts[2])
+            elif cmd == "MOVE":
+                int(parts[1]), int(parts[2]), int(parts[3]), int(parts[4])
+            elif cmd == "REMOVE":
+                int(parts[1]), int(parts[2])
+            count += 1
+    return count
+
+
+def parse_binary(data, chunk):
+    framer = binproto.BinaryFramer()
+    count = 0
+    for pos in range(0, len(data), chunk):
+        count += len(framer.feed(data[pos:pos + chunk]))
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Protocolo de texto x binário")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--chunk", type=int, default=4096, help="bytes por leitura")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    events = []
+    for _ in range(args.games):
+        events.extend(random_game_events(rng))
+
+    text = "".join(e + "\n" for e in events).encode()
+    binary = binproto.encode_lines(events)
+    n = len(events)
+    print(f"mensagens: {n}")
+    print(f"texto:   {len(text):9d} bytes  ({len(text) / n:.2f} B/msg)")
+    print(f"binário: {len(binary):9d} bytes  ({len(binary) / n:.2f} B/msg)"
+          f"  {len(text) / len(binary):.1f}x menor")
+
+    results = {}
+    for label, fn, data in (("texto", parse_text, text), ("binário", parse_binary, binary)):
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            fn(data, args.chunk)
+        elapsed = (time.perf_counter() - t0) / args.rounds
+        results[label] = elapsed
+        print(f"{label:8s} parse {elapsed / n * 1e9:8.0f} ns/msg  {n / elapsed:12,.0f} msgs/s")
+    print(f"parse binário {results['texto'] / results['binário']:.1f}x mais rápido")
+
+
+if __name__ == "__main__":
+    main()
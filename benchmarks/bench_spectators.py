@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import multiprocessing
+import random
+import selectors
+import socket
+import time
+
+from async_server import SeegaServer
+from benchmarks.loadtest import ACK, Bot, percentile, pick_move
+from game import SeegaGame
+
+
+"""
+Espectadores no servidor asyncio (spectators.py).
+
+Uma partida é jogada por dois bots enquanto --spectators conexões assistem
+à mesma sala. Os espectadores ficam em outro processo (selectors, sem
+asyncio), para não disputar CPU com o servidor. Mede:
+    - latência de PLACE/MOVE dos jogadores sem e com espectadores;
+    - tempo até o último espectador receber o último evento da partida;
+    - bytes recebidos por espectador.
+
+Uso:
+    python -m benchmarks.bench_spectators --spectators 5000
+"""
+
+
+def watch(host, port, room_id, count, pipe):
+    sel = selectors.DefaultSelector()
+    states = []
+    for _ in range(count):
+        s = socket.create_connection((host, port))
+        s.sendall(f"WATCH {room_id}\n".encode())
+        s.setblocking(False)
+        state = [-1, 0, b""]              # último SEQ, bytes, resto da linha
+        states.append(state)
+        sel.register(s, selectors.EVENT_READ, state)
+
+    target = -1
+    t_target = 0.0
+    announced = False
+    while True:
+        if pipe.poll():
+            target = pipe.recv()
+            t_target = time.perf_counter()
+        for key, _ in sel.select(timeout=0.05):
+            try:
+                data = key.fileobj.recv(65536)
+            except BlockingIOError:
+                continue
+            if not data:
+                sel.unregister(key.fileobj)
+                continue
+            state = key.data
+            state[1] += len(data)
+            lines = (state[2] + data).split(b"\n")
+            state[2] = lines.pop()
+            for line in reversed(lines):
+                if line.startswith(b"SEQ "):
+                    state[0] = int(line[4:])
+                    break
+        lowest = min(s[0] for s in states)
+        if not announced and lowest >= 0:
+            pipe.send("ready")
+            announced = True
+        if target >= 0 and lowest >= target:
+            pipe.send((time.perf_counter() - t_target, sum(s[1] for s in states) / count))
+            return
+
+
+async def play(players, rng, moves, stats):
+    by_symbol = {b.symbol: b for b in players}
+    mirror = SeegaGame()
+    cells = [(x, y) for y in range(5) for x in range(5) if (x, y) != (2, 2)]
+    rng.shuffle(cells)
+    for x, y in cells:
+        reply, dt = await by_symbol[mirror.players[mirror.turn]].command(f"PLACE {x} {y}")
+        stats["PLACE"].append(dt)
+        assert reply == ACK[0], reply
+        mirror.place_piece(x, y)
+    for _ in range(moves):
+        move = pick_move(mirror, rng)
+        if move is None or mirror.check_winner():
+            break
+        reply, dt = await by_symbol[mirror.players[mirror.turn]].command("MOVE %d %d %d %d" % move)
+        stats["MOVE"].append(dt)
+        assert reply == ACK[1], reply
+        mirror.move_piece(*move)
+        if mirror.check_winner():
+            break
+
+
+async def run(args):
+    server = SeegaServer("127.0.0.1", 0)
+    await server.start()
+    host, port = server.host, server.port
+    loop = asyncio.get_running_loop()
+
+    for spectators in (0, args.spectators):
+        players = []
+        for _ in range(2):
+            reader, writer = await asyncio.open_connection(host, port)
+            players.append(Bot(reader, writer))
+            await players[-1].greeted.wait()
+        while any(b.symbol is None for b in players):
+            await asyncio.sleep(0.001)
+        room_id = max(server.lobby.rooms)
+
+        proc = None
+        if spectators:
+            pipe, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=watch,
+                                           args=(host, port, room_id, spectators, child))
+            proc.start()
+            await loop.run_in_executor(None, pipe.recv)
+
+        stats = {"PLACE": [], "MOVE": []}
+        await play(players, random.Random(args.seed), args.moves, stats)
+        print(f"espectadores: {spectators}")
+        for cmd in ("PLACE", "MOVE"):
+            values = stats[cmd]
+            print(f"  {cmd:5s} n={len(values):4d}  p50={percentile(values, 50) * 1000:.2f}ms"
+                  f"  p99={percentile(values, 99) * 1000:.2f}ms")
+        if proc is not None:
+            pipe.send(server.lobby.rooms[room_id].seq)
+            elapsed, per_watcher = await loop.run_in_executor(None, pipe.recv)
+            proc.join()
+            print(f"  último evento em todos os espectadores: {elapsed * 1000:.1f}ms"
+                  f"  ({per_watcher:.0f} bytes por espectador)")
+        for b in players:
+            b.close()
+
+    while server.lobby.members or any(server.audiences.values()):
+        await asyncio.sleep(0.01)
+    server.server.close()
+    await server.server.wait_closed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Espectadores no servidor asyncio")
+    parser.add_argument("--spectators", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import ai
+import tablebase
+
+
+"""
+Tablebase de finais (tablebase.py).
+
+Gera a tablebase até --max-pieces peças de cada lado (tempo por classe e
+tamanho do arquivo), mede consultas por segundo em posições aleatórias
+cobertas por ela (value e best) e, com --verify N, confere N posições de
+cada classe contra o gerador de jogadas do ai.py: o valor guardado tem de
+ser o melhor resultado entre os filhos (equação de Bellman).
+
+Uso:
+    python -m benchmarks.bench_tablebase --max-pieces 3 --verify 2000
+    python -m benchmarks.bench_tablebase --file seega.tb --lookups 200000
+"""
+
+
+def expected(tb, mine, theirs):
+    """Valor da posição calculado a partir dos filhos, com ai.generate/apply."""
+    state = (mine, theirs, 0, 12, 12, 0)
+    best = None
+    for move in ai.generate(state):
+        a, b, turn = ai.apply(state, move)[:3]
+        if not b:
+            v = 1
+        else:
+            v = tablebase.outcome(tb.value(*((b, a) if turn else (a, b))), turn == 0)
+        if best is None or tablebase._better(v, best):
+            best = v
+    return best
+
+
+def verify(tb, count, rng):
+    checked = bad = 0
+    for key, index in sorted(tb.indexes.items()):
+        values = tb.values[key]
+        sample = range(index.size) if index.size <= count else rng.sample(range(index.size), count)
+        for i in sample:
+            mine, theirs = index.position(i)
+            if not ai.generate((mine, theirs, 0, 12, 12, 0)):
+                continue
+            checked += 1
+            if values[i] != expected(tb, mine, theirs):
+                bad += 1
+                if bad <= 5:
+                    print(f"  divergência em {key} #{i}: {values[i]} != {expected(tb, mine, theirs)}")
+    print(f"verificação: {checked} posições, {bad} divergências")
+    return bad
+
+
+def lookups(tb, count, rng):
+    keys = sorted(tb.indexes)
+    positions = []
+    for _ in range(count):
+        index = tb.indexes[rng.choice(keys)]
+        positions.append(index.position(rng.randrange(index.size)))
+
+    t0 = time.perf_counter()
+    for mine, theirs in positions:
+        tb.value(mine, theirs)
+    value_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for mine, theirs in positions:
+        tb.best(mine, theirs)
+    best_s = time.perf_counter() - t0
+    print(f"value: {count / value_s:10.0f} consultas/s  ({value_s / count * 1e6:.2f}µs)")
+    print(f"best:  {count / best_s:10.0f} consultas/s  ({best_s / count * 1e6:.2f}µs)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tablebase de finais do Seega")
+    parser.add_argument("--max-pieces", type=int, default=2)
+    parser.add_argument("--file", default=None, help="usa um arquivo já gerado")
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--verify", type=int, default=0, metavar="N")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    path = args.file
+    tmp = None
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".tb", delete=False)
+        tmp.close()
+        path = tmp.name
+        t0 = time.perf_counter()
+        tables = tablebase.generate(args.max_pieces, log=lambda msg: print("  " + msg))
+        tablebase.write(path, tables)
+        print(f"geração: {sum(map(len, tables.values()))} posições em "
+              f"{time.perf_counter() - t0:.1f}s")
+    print(f"arquivo: {os.path.getsize(path)} bytes")
+
+    tb = tablebase.Tablebase(path)
+    try:
+        lookups(tb, args.lookups, rng)
+        bad = verify(tb, args.verify, rng) if args.verify else 0
+    finally:
+        tb.close()
+        if tmp is not None:
+            os.unlink(path)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
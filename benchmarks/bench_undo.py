@@ -0,0 +1,84 @@
+import argparse
+import copy
+import random
+import time
+import tracemalloc
+
+from bitboard import BitboardSeegaGame
+from game import SeegaGame
+from benchmarks.bench_perft import movement_position
+
+
+"""
+Custo de explorar variações: copy.deepcopy x make_move/unmake_move.
+
+Percorre a árvore de jogadas até --depth a partir de algumas posições da
+fase de movimentação de três formas:
+    deepcopy:   copia o SeegaGame inteiro a cada nó (o jeito antigo);
+    make/unmake SeegaGame com a pilha de desfazer;
+    bitboard:   BitboardSeegaGame com make/unmake.
+Mostra nós/s e o pico de memória alocada durante a busca.
+
+Uso:
+    python -m benchmarks.bench_undo --depth 3
+"""
+
+
+def walk_deepcopy(game, depth):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in game.legal_moves():
+        child = copy.deepcopy(game)
+        child.play(move)
+        nodes += walk_deepcopy(child, depth - 1)
+    return nodes
+
+
+def walk_undo(game, depth):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in game.legal_moves():
+        game.make_move(move)
+        nodes += walk_undo(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def measure(cls, walk, histories, depth):
+    total = 0
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for history in histories:
+        game = cls()
+        for move in history:
+            game.play(move)
+        total += walk(game, depth)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="deepcopy x make/unmake")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    histories = [movement_position(rng, 10) for _ in range(args.positions)]
+    results = []
+    for label, cls, walk in (("deepcopy", SeegaGame, walk_deepcopy),
+                             ("make/unmake", SeegaGame, walk_undo),
+                             ("bitboard", BitboardSeegaGame, walk_undo)):
+        nodes, elapsed, peak = measure(cls, walk, histories, args.depth)
+        results.append(nodes)
+        print(f"{label:12s} {nodes / elapsed:12,.0f} nós/s  pico {peak / 1024:8.1f} KiB")
+    assert len(set(results)) == 1, results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from async_server import SeegaServer
+from game import SeegaGame
+from journal import Journal
+
+
+"""
+Teste de carga do servidor asyncio.
+
+Abre N partidas simultâneas (2N conexões), joga a fase de colocação
+completa e alguns movimentos em cada uma e mede:
+    - salas/s: partidas concluídas por segundo;
+    - comandos/s de cada tipo;
+    - latência p50/p99/p999 de PLACE e MOVE (tempo entre o envio do
+      comando e a resposta do servidor ao próprio jogador) e de CHAT
+      (tempo até o próprio broadcast da mensagem voltar), com
+      --chat-every k: um CHAT a cada k jogadas.
+
+Com --json o resultado sai em JSON (o formato dos baselines de
+benchmarks/suite.py).
+
+Por padrão sobe um SeegaServer no mesmo processo em uma porta livre;
+use --connect host:port para medir um servidor externo e --journal DIR
+para medir o custo do diário das salas.
+
+Uso:
+    python -m benchmarks.loadtest --games 1000 --moves 10
+"""
+
+ACK = ("Peça colocada.", "Peça movida.")
+ORTHO = ((1, 0), (-1, 0), (0, 1), (0, -1))
+COMMANDS = ("PLACE", "MOVE", "CHAT")
+PERCENTILES = (50, 99, 99.9)
+
+
+class Bot:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.replies = asyncio.Queue()
+        self.chats = asyncio.Queue()      # o próprio CHAT voltando no broadcast
+        self.chat_prefix = None
+        self.symbol = None
+        self.greeted = asyncio.Event()
+        self.task = asyncio.ensure_future(self.read_loop())
+
+    async def read_loop(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            text = line.decode().strip()
+            self.greeted.set()
+            if text.startswith("PLAYER ") and self.symbol is None:
+                self.symbol = text.split()[1]
+                self.chat_prefix = f"CHAT Jogador {self.symbol}: "
+                continue
+            if self.chat_prefix is not None and text.startswith(self.chat_prefix):
+                await self.chats.put(text)
+                continue
+            if text in ACK or text.startswith(("Não", "Formato", "Coordenadas",
+                                               "Espaço", "Destino", "Só", "Movimento",
+                                               "Ainda", "Você já")):
+                await self.replies.put(text)
+
+    async def command(self, msg):
+        t0 = time.perf_counter()
+        self.writer.write((msg + "\n").encode())
+        reply = await self.replies.get()
+        return reply, time.perf_counter() - t0
+
+    async def chat(self, text):
+        t0 = time.perf_counter()
+        self.writer.write(f"CHAT {text}\n".encode())
+        await self.chats.get()
+        return time.perf_counter() - t0
+
+    def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+
+def pick_move(game, rng):
+    player = game.players[game.turn]
+    moves = []
+    for y in range(5):
+        for x in range(5):
+            if game.board[y][x] != player:
+                continue
+            for dx, dy in ORTHO:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < 5 and 0 <= ny < 5 and game.board[ny][nx] == ' ':
+                    moves.append((x, y, nx, ny))
+    return rng.choice(moves) if moves else None
+
+
+async def play_game(host, port, moves, rng, stats, pairing, chat_every=0):
+    # o lobby pareia por ordem de chegada: as duas conexões da mesma
+    # partida precisam entrar na fila uma logo após a outra
+    bots = []
+    async with pairing:
+        for _ in range(2):
+            reader, writer = await asyncio.open_connection(host, port)
+            bots.append(Bot(reader, writer))
+            await bots[-1].greeted.wait()
+    while any(b.symbol is None for b in bots):
+        await asyncio.sleep(0.001)
+    by_symbol = {b.symbol: b for b in bots}
+    plies = 0
+
+    async def chat(bot):
+        if chat_every and plies % chat_every == 0:
+            stats["CHAT"].append(await bot.chat(f"jogada {plies}"))
+
+    mirror = SeegaGame()
+    cells = [(x, y) for y in range(5) for x in range(5) if (x, y) != (2, 2)]
+    rng.shuffle(cells)
+    for x, y in cells:
+        bot = by_symbol[mirror.players[mirror.turn]]
+        plies += 1
+        await chat(bot)
+        reply, dt = await bot.command(f"PLACE {x} {y}")
+        stats["PLACE"].append(dt)
+        if reply != ACK[0]:
+            stats["errors"] += 1
+            break
+        mirror.place_piece(x, y)
+
+    for _ in range(moves):
+        move = pick_move(mirror, rng)
+        if move is None or mirror.check_winner():
+            break
+        bot = by_symbol[mirror.players[mirror.turn]]
+        plies += 1
+        await chat(bot)
+        reply, dt = await bot.command("MOVE %d %d %d %d" % move)
+        stats["MOVE"].append(dt)
+        if reply != ACK[1]:
+            stats["errors"] += 1
+            break
+        mirror.move_piece(*move)
+
+    for b in bots:
+        b.close()
+    stats["games"] += 1
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def summary(stats, elapsed):
+    """Resultado de uma execução: salas/s, comandos/s e latências em ms."""
+    result = {"games": stats["games"], "errors": stats["errors"],
+              "seconds": round(elapsed, 3), "rooms_per_s": round(stats["games"] / elapsed, 1)}
+    for cmd in COMMANDS:
+        lat = stats[cmd]
+        if not lat:
+            continue
+        result[cmd] = {"n": len(lat), "per_s": round(len(lat) / elapsed, 1)}
+        for p in PERCENTILES:
+            result[cmd][f"p{p:g}"] = round(percentile(lat, p) * 1e3, 3)
+    return result
+
+
+def print_summary(result):
+    print(f"partidas: {result['games']}  erros: {result['errors']}  tempo: {result['seconds']:.2f}s")
+    print(f"salas/s: {result['rooms_per_s']:.1f}")
+    for cmd in COMMANDS:
+        if cmd in result:
+            r = result[cmd]
+            print(f"{cmd:5s} n={r['n']:7d}  {r['per_s']:8.0f}/s  " +
+                  "  ".join(f"p{p:g}={r[f'p{p:g}']:.2f}ms" for p in PERCENTILES))
+
+
+async def run(args):
+    """Executa o teste de carga descrito por args e retorna summary()."""
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        journal = Journal(args.journal) if args.journal else None
+        server = SeegaServer("127.0.0.1", 0, journal=journal)
+        await server.start()
+        host, port = server.host, server.port
+
+    rng = random.Random(args.seed)
+    stats = {"PLACE": [], "MOVE": [], "CHAT": [], "games": 0, "errors": 0}
+    sem = asyncio.Semaphore(args.concurrency or args.games)
+    pairing = asyncio.Lock()
+
+    async def one():
+        async with sem:
+            await play_game(host, port, args.moves, random.Random(rng.random()), stats,
+                            pairing, args.chat_every)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.games)))
+    elapsed = time.perf_counter() - t0
+
+    if server is not None:
+        # deixa o servidor encerrar as conexões antes de parar o loop
+        for _ in range(100):
+            if not server.lobby.members:
+                break
+            await asyncio.sleep(0.01)
+        server.server.close()
+        await server.server.wait_closed()
+        if server.journal is not None:
+            server.journal.close()
+    return summary(stats, elapsed)
+
+
+def parser():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor Seega")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--moves", type=int, default=10)
+    parser.add_argument("--chat-every", type=int, default=0,
+                        help="um CHAT a cada k jogadas (0 = sem chat)")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="máximo de partidas simultâneas (0 = todas)")
+    parser.add_argument("--connect", help="host:port de um servidor externo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--journal", metavar="DIR", help="servidor interno grava o diário em DIR")
+    return parser
+
+
+def main(argv=None):
+    p = parser()
+    p.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = p.parse_args(argv)
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_summary(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+from benchmarks import loadtest
+
+
+"""
+Suíte de desempenho do servidor com baselines guardados.
+
+Roda os cenários de SCENARIOS com o gerador de carga (loadtest.py), cada
+um em um servidor asyncio novo no mesmo processo, e compara com o
+baseline salvo em benchmarks/baselines/ (um JSON por máquina/nome):
+    - salas/s não pode cair mais que --tolerance;
+    - o p99 de cada comando não pode subir mais que --latency-tolerance
+      (o p99 de poucos milhares de amostras oscila bem mais que a vazão).
+
+Cada cenário roda --repeat vezes e fica a melhor execução (a de mais
+salas/s), o que reduz o ruído de uma máquina compartilhada. Com alguma
+regressão o processo sai com código 1.
+
+Uso:
+    python -m benchmarks.suite                  # compara com o baseline
+    python -m benchmarks.suite --save           # grava um baseline novo
+    python -m benchmarks.suite --only chat --repeat 5
+"""
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+DEFAULT_BASELINE = "loadtest"
+TOLERANCE = 0.2
+LATENCY_TOLERANCE = 0.5
+
+SCENARIOS = {
+    "placement": ["--games", "500", "--moves", "0", "--concurrency", "100"],
+    "games": ["--games", "500", "--moves", "20", "--concurrency", "100"],
+    "chat": ["--games", "300", "--moves", "20", "--chat-every", "2", "--concurrency", "100"],
+    "journal": ["--games", "300", "--moves", "20", "--journal", "{tmp}", "--concurrency", "100"],
+}
+
+
+def run_scenario(argv, repeat):
+    best = None
+    for _ in range(repeat):
+        tmp = tempfile.mkdtemp(prefix="seega-suite-")
+        try:
+            args = loadtest.parser().parse_args([a.format(tmp=tmp) for a in argv])
+            result = asyncio.run(loadtest.run(args))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        if best is None or result["rooms_per_s"] > best["rooms_per_s"]:
+            best = result
+    return best
+
+
+def compare(name, result, base, tolerance, latency_tolerance):
+    """Linhas do relatório de um cenário e se houve regressão."""
+    lines = []
+    regressed = False
+
+    def row(label, new, old, limit=None):
+        # limit > 0: maior é melhor (vazão); limit < 0: menor é melhor; None: só informa
+        nonlocal regressed
+        if old is None:
+            lines.append(f"  {label:14s} {new:10.2f}")
+            return
+        change = (new - old) / old if old else 0.0
+        bad = limit is not None and (change < -limit if limit > 0 else change > -limit)
+        regressed |= bad
+        flag = "  REGRESSÃO" if bad else ""
+        lines.append(f"  {label:14s} {new:10.2f}  baseline {old:10.2f}  {change:+7.1%}{flag}")
+
+    base = base or {}
+    lines.append(name)
+    row("salas/s", result["rooms_per_s"], base.get("rooms_per_s"), tolerance)
+    for cmd in loadtest.COMMANDS:
+        if cmd not in result:
+            continue
+        old = base.get(cmd, {})
+        row(f"{cmd} p50 ms", result[cmd]["p50"], old.get("p50"))
+        row(f"{cmd} p99 ms", result[cmd]["p99"], old.get("p99"), -latency_tolerance)
+        row(f"{cmd} p999 ms", result[cmd]["p99.9"], old.get("p99.9"))
+    if result["errors"]:
+        lines.append(f"  erros: {result['errors']}")
+        regressed = True
+    return lines, regressed
+
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de desempenho do servidor Seega")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="nome do baseline em benchmarks/baselines/")
+    parser.add_argument("--save", action="store_true", help="grava o resultado como baseline")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="cenários a rodar")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="queda máxima de salas/s (fração)")
+    parser.add_argument("--latency-tolerance", type=float, default=LATENCY_TOLERANCE,
+                        help="aumento máximo do p99 (fração)")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(BASELINE_DIR, args.baseline + ".json")
+    baseline = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif not args.save:
+        print(f"sem baseline em {path}; rode com --save para criar", file=sys.stderr)
+
+    results = {}
+    regressed = False
+    for name in args.only or SCENARIOS:
+        results[name] = run_scenario(SCENARIOS[name], args.repeat)
+        lines, bad = compare(name, results[name], baseline.get("scenarios", {}).get(name),
+                             args.tolerance, args.latency_tolerance)
+        regressed |= bad
+        print("\n".join(lines), flush=True)
+
+    if args.save:
+        scenarios = dict(baseline.get("scenarios", {}), **results)
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine(), "scenarios": scenarios}, f, indent=2)
+            f.write("\n")
+        print(f"baseline gravado em {path}")
+        return 0
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+import struct
+
+
+"""
+Protocolo binário compacto, opcional, ao lado dos comandos de texto.
+
+Negociação: o cliente envia a linha de texto "PROTO BIN". Um servidor que
+suporta o modo responde "PROTO BIN" e, a partir daí, as duas direções usam
+apenas quadros binários (o cliente só deve trocar de modo depois de receber
+a resposta). Um servidor antigo responde "Comando desconhecido." e a
+conexão continua em texto.
+
+Cada quadro começa com um byte de opcode. As células são codificadas em um
+byte como y * 5 + x e o jogador como 0 (A) ou 1 (B):
+
+    PLACE    op cell player            3 bytes
+    MOVE     op from to player         4 bytes
+    REMOVE   op cell                   2 bytes  (captura)
+    TURN     op turn                   2 bytes
+    BOARD    op + 7 bytes              8 bytes  (25 células x 2 bits)
+    RESTART  op                        1 byte
+    REPLY    op code                   2 bytes  (resposta conhecida, ver REPLIES)
+    TEXT     op len(2) utf-8           3 + n    (CHAT, PLAYER, NAME, ...)
+    SEQ      op seq(4)                 5 bytes  (número do último evento do jogo)
+    STATE    op flags pa pb ca cb origens(4)
+                                       10 bytes (flags: turn | colocação << 1)
+
+Nos quadros PLACE/MOVE enviados pelo cliente o byte do jogador é ignorado.
+Uma linha com coordenadas fora de 0..4 não tem quadro próprio e vai como
+TEXT (o servidor responde a ela como a qualquer comando de texto).
+"""
+
+OP_PLACE = 1
+OP_MOVE = 2
+OP_REMOVE = 3
+OP_TURN = 4
+OP_BOARD = 5
+OP_RESTART = 6
+OP_REPLY = 7
+OP_TEXT = 8
+OP_SEQ = 9
+OP_STATE = 10
+
+SIZES = {
+    OP_PLACE: 3,
+    OP_MOVE: 4,
+    OP_REMOVE: 2,
+    OP_TURN: 2,
+    OP_BOARD: 8,
+    OP_RESTART: 1,
+    OP_REPLY: 2,
+    OP_SEQ: 5,
+    OP_STATE: 10,
+}
+
+TEXT_HEADER = struct.Struct("!BH")
+SEQ_FRAME = struct.Struct("!BI")
+STATE_FRAME = struct.Struct("!BBBBBBI")
+MAX_TEXT = 4096
+
+PLAYERS = "AB"
+CELL_CODES = {' ': 0, 'A': 1, 'B': 2, 'X': 3}
+CELL_CHARS = " ABX"
+# células fora do tabuleiro viram (-1, -1) e são recusadas pelo SeegaGame
+CELL_XY = [(i % 5, i // 5) if i < 25 else (-1, -1) for i in range(256)]
+
+# respostas fixas do servidor (SeegaGame e Room), enviadas como um byte
+REPLIES = (
+    "Peça colocada.",
+    "Peça movida.",
+    "Não é seu turno.",
+    "Espaço ocupado.",
+    "Destino ocupado.",
+    "Coordenadas inválidas ou centro bloqueado.",
+    "Coordenadas inválidas.",
+    "Você já colocou 12 peças.",
+    "Ainda na fase de colocação.",
+    "Só pode mover suas próprias peças.",
+    "Movimento inválido.",
+    "Comando desconhecido.",
+    "Aguardando oponente...",
+)
+REPLY_CODES = {text: code for code, text in enumerate(REPLIES)}
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def cell(x, y):
+    """Byte da célula (x, y); fora do tabuleiro levanta ValueError (5 0 não vira 0 1)."""
+    if not (0 <= x < 5 and 0 <= y < 5):
+        raise ValueError(f"Célula fora do tabuleiro: {x} {y}")
+    return y * 5 + x
+
+
+def encode_place(x, y, player=0):
+    return bytes((OP_PLACE, cell(x, y), player))
+
+
+def encode_move(x1, y1, x2, y2, player=0):
+    return bytes((OP_MOVE, cell(x1, y1), cell(x2, y2), player))
+
+
+def encode_remove(x, y):
+    return bytes((OP_REMOVE, cell(x, y)))
+
+
+def encode_turn(turn):
+    return bytes((OP_TURN, turn))
+
+
+def encode_seq(seq):
+    return SEQ_FRAME.pack(OP_SEQ, seq & 0xFFFFFFFF)
+
+
+def encode_state(turn, placement, pa, pb, ca, cb, origins):
+    return STATE_FRAME.pack(OP_STATE, turn | placement << 1, pa, pb, ca, cb, origins)
+
+
+def encode_board(board_string):
+    """Empacota get_board_string() (5 linhas de 5 células) em 8 bytes."""
+    value = 0
+    for i, ch in enumerate(board_string.replace("\n", "")):
+        value |= CELL_CODES.get(ch, 0) << (2 * i)
+    return bytes((OP_BOARD,)) + value.to_bytes(7, "little")
+
+
+def decode_board(payload):
+    """Inverso de encode_board: devolve as 5 linhas do tabuleiro."""
+    value = int.from_bytes(payload, "little")
+    cells = "".join(CELL_CHARS[(value >> (2 * i)) & 3] for i in range(25))
+    return [cells[i:i + 5] for i in range(0, 25, 5)]
+
+
+def encode_text(text):
+    data = text.encode()
+    if len(data) > MAX_TEXT:
+        data = data[:MAX_TEXT]
+    return TEXT_HEADER.pack(OP_TEXT, len(data)) + data
+
+
+def encode_line(line):
+    """Converte uma linha do protocolo de texto no quadro binário equivalente."""
+    code = REPLY_CODES.get(line)
+    if code is not None:
+        return bytes((OP_REPLY, code))
+    parts = line.split()
+    if not parts:
+        return b""
+    cmd = parts[0]
+    try:
+        if cmd == "PLACE" and len(parts) in (3, 4):
+            player = PLAYERS.index(parts[3]) if len(parts) == 4 else 0
+            return encode_place(int(parts[1]), int(parts[2]), player)
+        if cmd == "MOVE" and len(parts) in (5, 6):
+            player = PLAYERS.index(parts[5]) if len(parts) == 6 else 0
+            x1, y1, x2, y2 = map(int, parts[1:5])
+            return encode_move(x1, y1, x2, y2, player)
+        if cmd == "REMOVE" and len(parts) == 3:
+            return encode_remove(int(parts[1]), int(parts[2]))
+        if cmd == "TURN" and len(parts) == 2:
+            return encode_turn(int(parts[1]))
+        if cmd == "RESTART" and len(parts) == 1:
+            return bytes((OP_RESTART,))
+        if cmd == "SEQ" and len(parts) == 2:
+            return encode_seq(int(parts[1]))
+        if cmd == "STATE" and len(parts) == 8:
+            return encode_state(int(parts[1]), parts[2] == "P", *map(int, parts[3:7]),
+                                int(parts[7], 16))
+        if cmd == "FULL":
+            return encode_board(line[5:].rstrip("\n"))
+    except ValueError:
+        pass
+    return encode_text(line)
+
+
+def encode_lines(lines):
+    return b"".join(encode_line(line) for line in lines)
+
+
+def frame_to_line(frame):
+    """Converte um quadro decodificado de volta na linha de texto equivalente."""
+    op = frame[0]
+    if op == OP_PLACE:
+        _, x, y, p = frame
+        return f"PLACE {x} {y} {PLAYERS[p]}"
+    if op == OP_MOVE:
+        _, x1, y1, x2, y2, p = frame
+        return f"MOVE {x1} {y1} {x2} {y2} {PLAYERS[p]}"
+    if op == OP_REMOVE:
+        return f"REMOVE {frame[1]} {frame[2]}"
+    if op == OP_TURN:
+        return f"TURN {frame[1]}"
+    if op == OP_BOARD:
+        return "FULL\n" + "\n".join(frame[1]) + "\n"
+    if op == OP_RESTART:
+        return "RESTART"
+    if op == OP_SEQ:
+        return f"SEQ {frame[1]}"
+    if op == OP_STATE:
+        _, turn, placement, pa, pb, ca, cb, origins = frame
+        return f"STATE {turn} {'P' if placement else 'M'} {pa} {pb} {ca} {cb} {origins:x}"
+    return frame[1]
+
+
+class BinaryFramer:
+    """
+    Separa o fluxo de bytes em quadros. feed() devolve tuplas:
+        (OP_PLACE, x, y, player)     (OP_MOVE, x1, y1, x2, y2, player)
+        (OP_REMOVE, x, y)            (OP_TURN, turn)
+        (OP_BOARD, rows)             (OP_RESTART,)
+        (OP_REPLY, texto)            (OP_TEXT, texto)
+        (OP_SEQ, seq)
+        (OP_STATE, turn, colocação, pa, pb, ca, cb, origens)
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        buf = self.buffer
+        buf += data
+        frames = []
+        pos = 0
+        end = len(buf)
+        xy = CELL_XY
+        while pos < end:
+            op = buf[pos]
+            size = SIZES.get(op)
+            if size is None:
+                if op != OP_TEXT:
+                    raise ProtocolError(f"Opcode desconhecido: {op}")
+                if end - pos < 3:
+                    break
+                n = (buf[pos + 1] << 8) | buf[pos + 2]
+                if n > MAX_TEXT:
+                    raise ProtocolError("Texto maior que o permitido.")
+                if end - pos < 3 + n:
+                    break
+                frames.append((OP_TEXT, buf[pos + 3:pos + 3 + n].decode(errors="replace")))
+                pos += 3 + n
+                continue
+            if end - pos < size:
+                break
+            if op == OP_MOVE:
+                x1, y1 = xy[buf[pos + 1]]
+                x2, y2 = xy[buf[pos + 2]]
+                frames.append((OP_MOVE, x1, y1, x2, y2, buf[pos + 3] & 1))
+            elif op == OP_PLACE:
+                x, y = xy[buf[pos + 1]]
+                frames.append((OP_PLACE, x, y, buf[pos + 2] & 1))
+            elif op == OP_REMOVE:
+                x, y = xy[buf[pos + 1]]
+                frames.append((OP_REMOVE, x, y))
+            elif op == OP_REPLY:
+                code = buf[pos + 1]
+                text = REPLIES[code] if code < len(REPLIES) else ""
+                frames.append((OP_REPLY, text))
+            elif op == OP_TURN:
+                frames.append((OP_TURN, buf[pos + 1]))
+            elif op == OP_BOARD:
+                frames.append((OP_BOARD, decode_board(bytes(buf[pos + 1:pos + 8]))))
+            elif op == OP_SEQ:
+                frames.append((OP_SEQ, SEQ_FRAME.unpack_from(buf, pos)[1]))
+            elif op == OP_STATE:
+                _, flags, pa, pb, ca, cb, origins = STATE_FRAME.unpack_from(buf, pos)
+                frames.append((OP_STATE, flags & 1, bool(flags & 2), pa, pb, ca, cb, origins))
+            else:
+                frames.append((OP_RESTART,))
+            pos += size
+        if pos:
+            del buf[:pos]
+        return frames
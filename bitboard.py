@@ -0,0 +1,296 @@
+
+"""
+SeegaGame com tabuleiro em bitboards.
+
+BitboardSeegaGame tem a mesma API de game.SeegaGame (place_piece,
+move_piece, check_capture, check_winner, surrender, reset_game,
+get_board_string, valid_coords), mas guarda o tabuleiro em dois inteiros de
+25 bits, um por jogador: a célula (x, y) é o bit y * 5 + x.
+
+As máscaras de vizinhança e os pares (peça capturada, peça aliada) de cada
+direção são pré-calculados, e a quantidade de peças de cada jogador é
+mantida a cada colocação e captura. Assim aplicar um movimento e verificar
+o vencedor custam poucas operações de bits, sem percorrer o tabuleiro.
+
+Também implementa legal_moves(), is_blocked(), play(), perft(),
+make_move()/unmake_move() e snapshot()/restore() com as mesmas regras
+(movimento ortogonal; jogador bloqueado passa a vez). Aqui o snapshot é só
+uma tupla de inteiros.
+
+O atributo board continua disponível (somente leitura) para quem ainda lê o
+tabuleiro como lista de listas.
+"""
+
+SIZE = 5
+CELLS = SIZE * SIZE
+CENTER = 2 * SIZE + 2
+CENTER_BIT = 1 << CENTER
+FULL_MASK = (1 << CELLS) - 1
+
+ORTHOGONAL = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def _mask(cells):
+    m = 0
+    for c in cells:
+        m |= 1 << c
+    return m
+
+
+def _on_board(x, y):
+    return 0 <= x < SIZE and 0 <= y < SIZE
+
+
+# vizinhos ortogonais de cada célula
+NEIGHBORS = [
+    _mask((y + dy) * SIZE + x + dx
+          for dx, dy in ORTHOGONAL if _on_board(x + dx, y + dy))
+    for y in range(SIZE) for x in range(SIZE)
+]
+CELL_XY = [(i % SIZE, i // SIZE) for i in range(CELLS)]
+COL0 = _mask(y * SIZE for y in range(SIZE))
+COL4 = _mask(y * SIZE + SIZE - 1 for y in range(SIZE))
+
+# para cada célula: (bit adjacente, bit logo depois) em cada direção ortogonal
+CAPTURES = [
+    tuple((1 << ((y + dy) * SIZE + x + dx), 1 << ((y + 2 * dy) * SIZE + x + 2 * dx))
+          for dx, dy in ORTHOGONAL if _on_board(x + 2 * dx, y + 2 * dy))
+    for y in range(SIZE) for x in range(SIZE)
+]
+
+
+class BitboardSeegaGame:
+    def __init__(self, broadcast_fn=None):
+        self.reset_game()
+        self.broadcast = broadcast_fn
+
+    def reset_game(self):
+        self.bits = [0, 0]                # peças de A e de B
+        self.counts = [0, 0]              # peças de cada um no tabuleiro
+        self.players = ['A', 'B']
+        self.turn = 0                     # 0 → A, 1 → B
+        self.placement_phase = True
+        self.placement_count = [0, 0]
+        self.captured_pieces = [0, 0]
+        self.last_captures = []
+        self.undo_stack = []
+
+    @property
+    def board(self):
+        rows = self.get_board_string().split('\n')
+        return [list(row) for row in rows]
+
+    def get_board_string(self):
+        a, b = self.bits
+        cells = []
+        for i in range(CELLS):
+            bit = 1 << i
+            if a & bit:
+                cells.append('A')
+            elif b & bit:
+                cells.append('B')
+            elif i == CENTER and self.placement_phase:
+                cells.append('X')
+            else:
+                cells.append(' ')
+        return '\n'.join(''.join(cells[i:i + SIZE]) for i in range(0, CELLS, SIZE))
+
+    def valid_coords(self, x, y):
+        if not (0 <= x < SIZE and 0 <= y < SIZE):
+            return False
+        if self.placement_phase and x == 2 and y == 2:
+            return False
+        return True
+
+    def place_piece(self, x, y):
+        if not self.valid_coords(x, y):
+            return False, "Coordenadas inválidas ou centro bloqueado."
+
+        turn = self.turn
+        if self.placement_count[turn] >= 12:
+            return False, "Você já colocou 12 peças."
+
+        bit = 1 << (y * SIZE + x)
+        if (self.bits[0] | self.bits[1]) & bit:
+            return False, "Espaço ocupado."
+
+        self.bits[turn] |= bit
+        self.counts[turn] += 1
+        self.placement_count[turn] += 1
+
+        if self.placement_count[0] + self.placement_count[1] == 24:
+            self.placement_phase = False  # o centro fica livre para movimentação
+        self.turn = 1 - turn
+        if self.is_blocked():
+            self.turn = turn
+        return True, "Peça colocada."
+
+    def move_piece(self, x1, y1, x2, y2):
+        if self.placement_phase:
+            return False, "Ainda na fase de colocação."
+
+        if not (self.valid_coords(x1, y1) and self.valid_coords(x2, y2)):
+            return False, "Coordenadas inválidas."
+
+        turn = self.turn
+        src = y1 * SIZE + x1
+        dst = y2 * SIZE + x2
+        src_bit = 1 << src
+        dst_bit = 1 << dst
+        if not self.bits[turn] & src_bit:
+            return False, "Só pode mover suas próprias peças."
+
+        if (self.bits[0] | self.bits[1]) & dst_bit:
+            return False, "Destino ocupado."
+
+        if not NEIGHBORS[src] & dst_bit:
+            return False, "Movimento inválido."
+
+        self.bits[turn] ^= src_bit | dst_bit
+
+        self.last_captures = self.check_capture(x2, y2)
+        if self.broadcast is not None:
+            for ax, ay in self.last_captures:
+                self.broadcast(f"REMOVE {ax} {ay}")
+        self.turn = 1 - turn
+        if self.is_blocked():
+            self.turn = turn
+        return True, "Peça movida."
+
+    def check_capture(self, x, y):
+        cell = y * SIZE + x
+        bit = 1 << cell
+        if self.bits[0] & bit:
+            mover = 0
+        elif self.bits[1] & bit:
+            mover = 1
+        else:
+            return []
+        mine = self.bits[mover]
+        theirs = self.bits[1 - mover]
+        captured = []
+        for adj, far in CAPTURES[cell]:
+            if theirs & adj and mine & far:
+                theirs ^= adj
+                self.counts[1 - mover] -= 1
+                self.captured_pieces[mover] += 1
+                captured.append(CELL_XY[adj.bit_length() - 1])
+        self.bits[1 - mover] = theirs
+        return captured
+
+    def check_winner(self):
+        if self.counts[0] == 0:
+            return "Jogador B venceu!"
+        if self.counts[1] == 0:
+            return "Jogador A venceu!"
+        return None
+
+    def surrender(self):
+        loser = self.players[self.turn]
+        winner = self.players[1 - self.turn]
+        return f"Jogador {loser} desistiu. {winner} venceu!"
+
+    def legal_moves(self):
+        """Mesmo formato de SeegaGame.legal_moves(), gerado com máscaras."""
+        turn = self.turn
+        occupied = self.bits[0] | self.bits[1]
+        if self.placement_phase:
+            if self.placement_count[turn] >= 12:
+                return []
+            empty = FULL_MASK & ~occupied & ~CENTER_BIT
+            return [CELL_XY[i] for i in _bits(empty)]
+        if not (self.counts[0] and self.counts[1]):
+            return []
+        return _piece_moves(self.bits[turn], FULL_MASK & ~occupied)
+
+    def is_blocked(self, turn=None):
+        if self.placement_phase:
+            return False
+        mine = self.bits[self.turn if turn is None else turn]
+        return not mobile(mine, FULL_MASK & ~(self.bits[0] | self.bits[1]))
+
+    def play(self, move):
+        if len(move) == 2:
+            return self.place_piece(*move)
+        return self.move_piece(*move)
+
+    def perft(self, depth):
+        if depth == 0:
+            return 1
+        moves = self.legal_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.make_move(move)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    def make_move(self, move):
+        """Como SeegaGame.make_move(): sem validação e sem broadcast."""
+        self.undo_stack.append(self.snapshot())
+        turn = self.turn
+        bits = self.bits
+        if len(move) == 2:
+            x, y = move
+            bits[turn] |= 1 << (y * SIZE + x)
+            self.counts[turn] += 1
+            self.placement_count[turn] += 1
+            captured = []
+            if self.placement_count[0] + self.placement_count[1] == 24:
+                self.placement_phase = False
+        else:
+            x1, y1, x2, y2 = move
+            bits[turn] ^= (1 << (y1 * SIZE + x1)) | (1 << (y2 * SIZE + x2))
+            captured = self.check_capture(x2, y2)
+        self.turn = 1 - turn
+        if self.is_blocked():
+            self.turn = turn
+        return captured
+
+    def unmake_move(self):
+        self.restore(self.undo_stack.pop(), keep_undo=True)
+
+    def snapshot(self):
+        return (self.bits[0], self.bits[1], self.counts[0], self.counts[1], self.turn,
+                self.placement_phase, tuple(self.placement_count),
+                tuple(self.captured_pieces))
+
+    def restore(self, snap, keep_undo=False):
+        (a, b, ca, cb, self.turn, self.placement_phase,
+         placement, captured) = snap
+        self.bits = [a, b]
+        self.counts = [ca, cb]
+        self.placement_count = list(placement)
+        self.captured_pieces = list(captured)
+        self.last_captures = []
+        if not keep_undo:
+            self.undo_stack = []
+
+
+def mobile(pieces, empty):
+    """Máscara das peças com ao menos uma casa vazia ortogonal (só deslocamentos)."""
+    reach = (((empty >> 1) & ~COL4) | ((empty << 1) & ~COL0)
+             | (empty >> SIZE) | (empty << SIZE))
+    return pieces & reach
+
+
+def _bits(mask):
+    """Índices dos bits ligados de mask, do menor para o maior."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _piece_moves(mine, empty):
+    moves = []
+    for i in _bits(mobile(mine, empty)):
+        targets = NEIGHBORS[i] & empty
+        if targets:
+            x1, y1 = CELL_XY[i]
+            for j in _bits(targets):
+                x2, y2 = CELL_XY[j]
+                moves.append((x1, y1, x2, y2))
+    return moves
@@ -1,20 +1,69 @@
 
+import queue
 import socket
+import sys
 import threading
+import time
 import tkinter as tk
 from tkinter import simpledialog, messagebox
+import binproto
+from framing import LineFramer
+
+"""
+A thread de rede nunca toca nos widgets nem no estado do jogo: process_line()
+só interpreta as linhas e põe eventos ("cell", "board", "state", "me", "chat",
+...) em self.events.
+O loop do Tk esvazia a fila a cada FRAME_MS (drain), junta todas as
+alterações do quadro e redesenha só as células cujo conteúdo mudou em
+relação a self.board, que guarda o que está na tela. Rajadas de eventos
+(partidas rápidas assistidas, retomada com muitos eventos) viram poucos
+quadros, em vez de um redesenho por linha recebida.
+
+Depois de cada jogada aceita o servidor envia "STATE" (vez, fase, peças
+colocadas, capturas e as casas de onde o jogador da vez pode mover). Com
+ele o cliente responde localmente às jogadas que o servidor certamente
+recusaria (rejection), sem gastar uma ida e volta.
+"""
 
 HOST = 'localhost'
 PORT = 12345
+RECONNECT_ATTEMPTS = 5  # tentativas de retomar a sessão quando a conexão cai
+RECONNECT_DELAY = 1.0   # segundos entre tentativas (dobra a cada falha)
+FRAME_MS = 30           # intervalo entre os quadros que aplicam os eventos na tela
+MAX_EVENTS_PER_FRAME = 2000  # o resto fica para o próximo quadro (a janela não trava)
+MAX_LOG_LINES = 500     # linhas mantidas no chat e no painel de jogadas
+
+# aparência de cada conteúdo de célula: um único config por célula alterada
+CELL_STYLE = {
+    'A': dict(text='●', fg='red', state='normal'),
+    'B': dict(text='●', fg='blue', state='normal'),
+    'X': dict(text='X', fg='black', state='disabled'),
+    ' ': dict(text='', fg='black', state='normal'),
+}
+EMPTY_BOARD = [' ' * 5] * 5
+
 
 class SeegaClient:
-    def __init__(self):
+    def __init__(self, binary=False):
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((HOST, PORT))
         except Exception as e:
             messagebox.showerror("Erro de Conexão", f"Não foi possível conectar: {e}")
             return
+        # Protocolo binário (binproto.py): pede "PROTO BIN" e segura os envios
+        # até o servidor aceitar (ou recusar, e aí continua em texto)
+        self.binary = False
+        self.want_binary = binary
+        self.negotiating = binary
+        self.held = []
+        self.send_lock = threading.Lock()
+        # Sessão: token do lugar e número do último evento recebido ("SEQ n"),
+        # usados para retomar a partida se a conexão cair
+        self.session = None
+        self.seq = 0
+        if binary:
+            self.sock.sendall(b"PROTO BIN\n")
         self.root = tk.Tk()
         self.root.title("Seega Cliente")
         self.player_name = self.ask_player_name()  # Pergunta ao jogador o nome
@@ -22,6 +71,10 @@ class SeegaClient:
         self.board = [[' ']*5 for _ in range(5)]  # Tabuleiro 5x5
         self.placement_count = [0, 0]  # Conta o número de peças colocadas
         self.capture_count = [0, 0]  # Conta o número de peças retiradas
+        self.me = None  # 0 (A) ou 1 (B); None antes de ocupar um lugar ou assistindo
+        self.state = None  # (turn, fase de colocação, máscara de origens) do último STATE
+        self.full_rows = None  # Linhas de um FULL ainda em recebimento
+        self.events = queue.SimpleQueue()  # eventos da thread de rede para o Tk
 
        
 
@@ -59,6 +112,7 @@ class SeegaClient:
         frame.pack(padx=5, pady=5)
         self.cells = [[None]*5 for _ in range(5)]
         self.selected = None
+        self.highlighted = None
 
         for y in range(5):
             for x in range(5):
@@ -71,6 +125,7 @@ class SeegaClient:
         tk.Button(self.root, text="🔁 Reiniciar", command=lambda: self.send("RESTART"), bg='gray40', fg='white').pack(pady=(0,10))
 
         threading.Thread(target=self.receive_loop, daemon=True).start()
+        self.root.after(FRAME_MS, self.drain)
         self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.root.mainloop()
 
@@ -79,9 +134,7 @@ class SeegaClient:
         return simpledialog.askstring("Nome do Jogador", "Qual é o seu nome?", parent=self.root)
 
     def on_click(self, x, y):
-        text = self.cells[y][x]['text']
-
-        if text in ('●', '⛔'):
+        if self.board[y][x] in ('A', 'B'):
             # seleção de peça para mover
             if self.selected == (x, y):
                 self.selected = None
@@ -94,27 +147,77 @@ class SeegaClient:
             # célula vazia: PLACE ou MOVE
             if self.selected:
                 x1, y1 = self.selected
-                self.send(f"MOVE {x1} {y1} {x} {y}")
                 self.selected = None
                 self.highlight(None)
+                self.play(f"MOVE {x1} {y1} {x} {y}", self.rejection(x1, y1, x, y))
             else:
-                self.send(f"PLACE {x} {y}")
+                self.play(f"PLACE {x} {y}", self.rejection(x, y))
+
+    def play(self, msg, reason):
+        """Envia a jogada, ou mostra na hora o motivo pelo qual o servidor a recusaria"""
+        if reason is None:
+            self.send(msg)
+        else:
+            self.show_game_message(reason)
+
+    def rejection(self, x1, y1, x2=None, y2=None):
+        """
+        Pelo último STATE, a recusa que o servidor certamente daria ao PLACE
+        (x2 None) ou ao MOVE; None se a jogada pode ser aceita.
+        """
+        state, me = self.state, self.me
+        if state is None or me is None:
+            return None
+        turn, placement, origins = state
+        if turn != me:
+            return "Não é seu turno."
+        if x2 is None:
+            if not placement or self.placement_count[me] >= 12:
+                return "Você já colocou 12 peças."
+            return None
+        if placement:
+            return "Ainda na fase de colocação."
+        if not origins >> (y1 * 5 + x1) & 1:
+            if self.board[y1][x1] != "AB"[me]:
+                return "Só pode mover suas próprias peças."
+            return "Movimento inválido."
+        if abs(x1 - x2) + abs(y1 - y2) != 1:
+            return "Movimento inválido."
+        return None
 
     def highlight(self, pos):
-        # limpa todos
-        for row in self.cells:
-            for b in row:
-                b.config(bg='gray30')
+        # só a célula destacada antes e a nova mudam
+        if self.highlighted is not None:
+            x, y = self.highlighted
+            self.cells[y][x].config(bg='gray30')
+        self.highlighted = pos
         if pos:
             x, y = pos
             self.cells[y][x].config(bg='yellow')
 
     def send(self, msg):
+        with self.send_lock:
+            if self.negotiating:
+                self.held.append(msg)
+                return
+            if self.binary:
+                data = binproto.encode_line(msg)
+            else:
+                data = (msg + "\n").encode()
         try:
-            self.sock.sendall((msg + "\n").encode())
+            self.sock.sendall(data)
         except:
-            messagebox.showerror("Erro", "Conexão perdida.")
-            self.close()
+            # receive_loop percebe a queda e tenta retomar a sessão
+            self.events.put(("game", "Conexão perdida; comando não enviado."))
+
+    def finish_negotiation(self, binary):
+        """Fixa o protocolo e envia o que ficou retido durante a negociação"""
+        with self.send_lock:
+            self.binary = binary
+            self.negotiating = False
+            held, self.held = self.held, []
+        for msg in held:
+            self.send(msg)
 
     def send_chat(self, event=None):
         m = self.entry.get().strip()
@@ -123,90 +226,229 @@ class SeegaClient:
             self.send("CHAT " + m)
 
     def receive_loop(self):
-        buffer = ""
+        while True:
+            self.read_connection()
+            if not self.reconnect():
+                break
+        self.events.put(("closed",))
+
+    def read_connection(self):
+        framer = LineFramer()
         try:
             while True:
-                data = self.sock.recv(1024).decode()
-                if not data:
+                if self.binary:
+                    data = self.sock.recv(4096)
+                    if not data:
+                        break
+                    self.process_frames(framer.feed(data))
+                    continue
+                lines = framer.recv(self.sock)
+                if lines is None:
                     break
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    self.process_line(line.strip())
+                for i, line in enumerate(lines):
+                    line = line.decode(errors='replace').rstrip('\r')
+                    if self.negotiating and line == "PROTO BIN":
+                        # o resto do que chegou já está em binário
+                        rest = b"".join(l + b"\n" for l in lines[i + 1:]) + bytes(framer.buffer)
+                        framer = binproto.BinaryFramer()
+                        self.finish_negotiation(True)
+                        self.process_frames(framer.feed(rest))
+                        break
+                    if self.negotiating and line == "Comando desconhecido.":
+                        self.finish_negotiation(False)
+                    self.process_line(line)
         except:
             pass
-        messagebox.showwarning("Aviso", "Servidor desconectado.")
-        self.close()
+
+    def reconnect(self):
+        """Reabre a conexão e pede "RESUME token seq"; False se não conseguir."""
+        if self.session is None:
+            return False
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        delay = RECONNECT_DELAY
+        for _ in range(RECONNECT_ATTEMPTS):
+            time.sleep(delay)
+            delay *= 2
+            try:
+                sock = socket.create_connection((HOST, PORT))
+            except OSError:
+                continue
+            with self.send_lock:
+                self.sock = sock
+                self.binary = False
+                self.negotiating = self.want_binary
+                self.full_rows = None
+                hello = f"RESUME {self.session} {self.seq}\n"
+                if self.want_binary:
+                    hello += "PROTO BIN\n"
+                try:
+                    sock.sendall(hello.encode())
+                except OSError:
+                    continue
+            return True
+        return False
+
+    def process_frames(self, frames):
+        for frame in frames:
+            for line in binproto.frame_to_line(frame).split("\n"):
+                self.process_line(line)
 
     def process_line(self, line):
+        """Interpreta uma linha na thread de rede e enfileira os eventos para o Tk"""
+        # FULL: 5 linhas do tabuleiro (podem ser só espaços) e uma linha vazia
+        if self.full_rows is not None:
+            if line == "":
+                self.events.put(("board", self.full_rows))
+                self.full_rows = None
+            else:
+                self.full_rows.append(line)
+            return
+
+        line = line.strip()
         if not line:
             return
         parts = line.split()
         cmd = parts[0]
 
+        if cmd == "SEQ" and len(parts) == 2:
+            self.seq = int(parts[1])
+            return
+
+        if cmd == "SESSION" and len(parts) == 2:
+            self.session = parts[1]
+            return
+
+        if cmd == "STATE" and len(parts) == 8:
+            turn, pa, pb, ca, cb = map(int, (parts[1], *parts[3:7]))
+            self.events.put(("state", (turn, parts[2] == "P", int(parts[7], 16)),
+                             [pa, pb], [ca, cb]))
+            return
+
+        if line.startswith("Você é o Jogador "):
+            self.events.put(("me", "AB".find(line[-1]) if line[-1] in "AB" else None))
+        elif cmd == "WATCH":
+            self.events.put(("me", None))
+
         if cmd == "TURN" and len(parts) == 2:
-            self.turn = int(parts[1])  # Atualiza o turno
-            self.update_info()  # Atualiza as informações de turno
+            self.events.put(("turn", int(parts[1])))  # Atualiza o turno
 
         if cmd == "PLACE" and len(parts) == 4:
             _, xs, ys, p = parts
             x, y = int(xs), int(ys)
-            self.draw_cell(x, y, p)
-            self.update_info()  # Atualiza as informações de peças
-            self.show_game_message(f"Jogador {self.player_name} colocou uma peça em ({x},{y})")
+            self.events.put(("cell", x, y, p))
+            self.events.put(("game", f"Jogador {self.player_name} colocou uma peça em ({x},{y})"))
 
         elif cmd == "MOVE" and len(parts) == 6:
             _, x1s, y1s, x2s, y2s, p = parts
             x1, y1, x2, y2 = map(int, (x1s, y1s, x2s, y2s))
-            self.draw_cell(x1, y1, ' ')
-            self.draw_cell(x2, y2, p)
-            self.update_info()  # Atualiza as informações de peças
-            self.show_game_message(f"Jogador {self.player_name} moveu de ({x1},{y1}) para ({x2},{y2})")
+            self.events.put(("cell", x1, y1, ' '))
+            self.events.put(("cell", x2, y2, p))
+            self.events.put(("game", f"Jogador {self.player_name} moveu de ({x1},{y1}) para ({x2},{y2})"))
+
+        elif cmd == "FULL":
+            self.full_rows = []
 
         elif cmd == "CHAT":
-            text = line[5:]
-            self.chat_box.config(state='normal')
-            self.chat_box.insert(tk.END, text + "\n")
-            self.chat_box.config(state='disabled')
-            self.chat_box.see(tk.END)
+            self.events.put(("chat", line[5:]))
 
         elif cmd == "RESTART":
             # limpa o tabuleiro local
-            for yy in range(5):
-                for xx in range(5):
-                    self.draw_cell(xx, yy, ' ')
-            self.update_info()  # Atualiza após reiniciar o jogo
+            self.events.put(("board", EMPTY_BOARD))
 
         elif cmd == "REMOVE" and len(parts) == 3:
             _, xs, ys = parts
-            x, y = int(xs), int(ys)
-            self.draw_cell(x, y, ' ')
-            self.update_info()  # Atualiza as informações após remoção de peça
-
-    def draw_cell(self, x, y, ch):
-        btn = self.cells[y][x]
-        btn.config(bg='gray30')
-        if ch == 'A':
-            btn.config(text='●', fg='red', state='normal')
-        elif ch == 'B':
-            btn.config(text='●', fg='blue', state='normal')
-        elif ch == 'X':
-            btn.config(text='X', fg='black', state='disabled')
-        else:
-            btn.config(text='', fg='black', state='normal')
+            self.events.put(("cell", int(xs), int(ys), ' '))
+
+    def drain(self):
+        """Aplica os eventos pendentes em um único quadro (roda no loop do Tk)"""
+        dirty = {}        # (x, y) → conteúdo final da célula neste quadro
+        chat, game = [], []
+        info = closed = False
+        events = self.events
+        for _ in range(MAX_EVENTS_PER_FRAME):
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == "cell":
+                dirty[event[1], event[2]] = event[3]
+            elif kind == "board":
+                for y, row in enumerate(event[1][:5]):
+                    for x, ch in enumerate(row.ljust(5)[:5]):
+                        dirty[x, y] = ch
+            elif kind == "chat":
+                chat.append(event[1])
+            elif kind == "game":
+                game.append(f"Jogada: {event[1]}")
+            elif kind == "state":
+                # o estado do jogo só muda aqui, na thread do Tk que o lê
+                self.state, self.placement_count, self.capture_count = event[1:]
+                self.turn = self.state[0]
+                info = True
+            elif kind == "turn":
+                self.turn = event[1]
+                info = True
+            elif kind == "me":
+                self.me = event[1]
+            elif kind == "closed":
+                closed = True
+        if dirty:
+            self.render(dirty)
+            info = True
+        if info:
+            self.update_info()
+        if chat:
+            self.append_lines(self.chat_box, chat)
+        if game:
+            self.append_lines(self.game_box, game)
+        if closed:
+            messagebox.showwarning("Aviso", "Servidor desconectado.")
+            self.close()
+            return
+        self.root.after(FRAME_MS, self.drain)
+
+    def render(self, dirty):
+        """Reconfigura só as células cujo conteúdo difere do que está na tela (self.board)"""
+        board = self.board
+        for (x, y), ch in dirty.items():
+            if ch not in CELL_STYLE:
+                ch = ' '
+            if board[y][x] == ch:
+                continue
+            board[y][x] = ch
+            if self.selected == (x, y):
+                # a peça selecionada saiu dali
+                self.selected = None
+                self.highlighted = None
+            self.cells[y][x].config(bg='gray30', **CELL_STYLE[ch])
 
     def update_info(self):
         """Atualiza as informações de nome, peças restantes e capturadas"""
-        if self.player_name:
-            self.label_player_name.config(text=f"Jogador: {self.player_name}")
+        text = f"Jogador: {self.player_name}" if self.player_name else "Jogador: "
+        if self.state is not None:
+            turn, placement, _ = self.state
+            pa, pb = self.placement_count
+            ca, cb = self.capture_count
+            phase = "colocação" if placement else "movimentação"
+            text += (f"  |  Vez: {'AB'[turn]} ({phase})  |  Colocadas A {pa}, B {pb}"
+                     f"  |  Capturas A {ca}, B {cb}")
+        self.label_player_name.config(text=text)
 
     def show_game_message(self, message):
         """Exibe uma mensagem do jogo no painel de mensagens"""
-        game_message = f"Jogada: {message}"
-        self.game_box.config(state='normal')
-        self.game_box.insert(tk.END, game_message + "\n")
-        self.game_box.config(state='disabled')
-        self.game_box.see(tk.END)
+        self.append_lines(self.game_box, [f"Jogada: {message}"])
+
+    def append_lines(self, box, lines):
+        """Acrescenta as linhas com um único insert e descarta as mais antigas"""
+        box.config(state='normal')
+        box.insert(tk.END, "\n".join(lines) + "\n")
+        box.delete("1.0", f"end-{MAX_LOG_LINES + 1}l")
+        box.config(state='disabled')
+        box.see(tk.END)
 
     def count_total_pieces(self):
         """Conta o número total de peças no tabuleiro"""
@@ -217,4 +459,4 @@ class SeegaClient:
         self.root.quit()
 
 if __name__ == "__main__":
-    SeegaClient()
\ No newline at end of file
+    SeegaClient(binary="--bin" in sys.argv[1:])
\ No newline at end of file
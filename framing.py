@@ -0,0 +1,56 @@
+"""
+Enquadramento de linhas do protocolo de texto.
+
+O TCP não preserva fronteiras de mensagem: um único recv pode trazer vários
+comandos (ex.: MOVE e CHAT juntos) ou só um pedaço de um comando. O
+LineFramer acumula os bytes recebidos em um bytearray reutilizado e devolve
+apenas linhas completas, sem o '\\n' final. O recv é feito com recv_into
+em um buffer fixo, então nenhuma string intermediária é criada por leitura;
+todas as linhas completas de uma leitura são separadas com um único split
+e o buffer é compactado uma única vez por chamada (custo linear, não
+quadrático como o split da string inteira a cada linha).
+
+Uma linha maior que max_line gera LineTooLong: o par que enviou dados sem
+'\\n' não consegue fazer o buffer crescer sem limite.
+
+Usado pelo server.py, pelo async_server.py e pelo client.py.
+"""
+
+MAX_LINE = 4096
+RECV_SIZE = 4096
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+class LineFramer:
+    def __init__(self, max_line=MAX_LINE, recv_size=RECV_SIZE):
+        self.max_line = max_line
+        self.buffer = bytearray()
+        self.chunk = bytearray(recv_size)
+        self.view = memoryview(self.chunk)
+
+    def feed(self, data):
+        """Acrescenta data ao buffer e retorna a lista de linhas completas (bytes)."""
+        buf = self.buffer
+        buf += data
+        nl = buf.rfind(b"\n")
+        if nl < 0:
+            if len(buf) > self.max_line:
+                raise LineTooLong(f"Linha maior que {self.max_line} bytes.")
+            return []
+        # uma cópia e um split em C para todas as linhas completas
+        lines = bytes(buf[:nl]).split(b"\n")
+        del buf[:nl + 1]
+        if (nl > self.max_line and max(map(len, lines)) > self.max_line) \
+                or len(buf) > self.max_line:
+            raise LineTooLong(f"Linha maior que {self.max_line} bytes.")
+        return lines
+
+    def recv(self, sock):
+        """Lê do socket e retorna as linhas completas; None quando a conexão fechou."""
+        n = sock.recv_into(self.chunk)
+        if not n:
+            return None
+        return self.feed(self.view[:n])
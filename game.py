@@ -1,4 +1,7 @@
 
+ORTHOGONAL = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
 class SeegaGame:
     """
     Classe que implementa a lógica do jogo Seega.
@@ -17,20 +20,33 @@ class SeegaGame:
         placement_phase (bool): Indica se ainda estamos na fase de colocação.
         placement_count (list[int]): Contagem de peças colocadas por cada jogador.
         captured_pieces (list[int]): Contagem de peças capturadas por cada jogador.
-        broadcast (callable): Função para notificar eventos externos (como remoções).
+        broadcast (callable | None): Função opcional que recebe um "REMOVE x y" a cada
+            captura feita por move_piece (compatibilidade; prefira last_captures).
+        last_captures (list[tuple]): Casas capturadas pelo último move_piece.
 
     Métodos:
-        __init__(broadcast_fn): Inicializa o jogo com a função de broadcast.
+        __init__(broadcast_fn=None): Inicializa o jogo, opcionalmente com a função de broadcast.
         reset_game(): Reinicia o estado do jogo.
         get_board_string(): Retorna uma representação textual do tabuleiro (útil para debug).
         valid_coords(x, y): Verifica se as coordenadas são válidas para jogadas.
         place_piece(x, y): Realiza uma jogada de colocação de peça no tabuleiro.
         move_piece(x1, y1, x2, y2): Move uma peça de (x1, y1) para (x2, y2), se permitido.
-        check_capture(x, y): Verifica e executa capturas ao redor da peça recém-movida.
+        check_capture(x, y): Executa as capturas ao redor da peça recém-movida e as retorna.
         check_winner(): Verifica se algum jogador venceu (sem peças no tabuleiro).
         surrender(): Finaliza o jogo com desistência do jogador atual.
+        legal_moves(): Lista as jogadas legais do jogador da vez.
+        is_blocked(turn): Verifica se um jogador não tem movimento possível.
+        play(move): Aplica uma jogada no formato de legal_moves().
+        perft(depth): Conta as posições alcançáveis em depth jogadas.
+        make_move(move): Aplica uma jogada legal sem validação, guardando como desfazê-la.
+        unmake_move(): Desfaz a última jogada feita com make_move().
+        snapshot() / restore(snap): Salva e restaura o estado completo do jogo.
+
+    Movimentos são ortogonais (uma casa na horizontal ou vertical), como as
+    capturas. Se, na fase de movimentação, o jogador da vez fica bloqueado
+    (nenhuma peça pode se mover), ele passa a vez.
     """
-    def __init__(self,broadcast_fn):
+    def __init__(self,broadcast_fn=None):
         self.reset_game()
         self.broadcast = broadcast_fn
     def reset_game(self):
@@ -41,6 +57,8 @@ class SeegaGame:
         self.placement_phase = True
         self.placement_count = [0, 0]
         self.captured_pieces = [0, 0]
+        self.last_captures = []
+        self.undo_stack = []              # registros de make_move()
     
     
    
@@ -95,6 +113,8 @@ class SeegaGame:
             self.placement_phase = False
             self.board[2][2] = ' '  # Desbloqueia o centro para movimentaçõess
         self.turn = 1 - self.turn
+        if self.is_blocked():
+            self.turn = 1 - self.turn
         return True, "Peça colocada."
 
     def move_piece(self, x1, y1, x2, y2):
@@ -115,22 +135,29 @@ class SeegaGame:
         if dest.strip() != '':
             return False, "Destino ocupado."
 
-        if max(abs(x1 - x2), abs(y1 - y2)) != 1:
+        if abs(x1 - x2) + abs(y1 - y2) != 1:
             return False, "Movimento inválido."
 
         # Executa movimento
         self.board[y1][x1] = ' '
         self.board[y2][x2] = player
 
-        # Captura e troca de turno
-        self.check_capture(x2, y2)
+        # Captura e troca de turno (o adversário bloqueado passa a vez)
+        self.last_captures = self.check_capture(x2, y2)
+        if self.broadcast is not None:
+            for ax, ay in self.last_captures:
+                self.broadcast(f"REMOVE {ax} {ay}")
         self.turn = 1 - self.turn
+        if self.is_blocked():
+            self.turn = 1 - self.turn
         return True, "Peça movida."
 
 
     def check_capture(self, x, y):
+        """Remove as peças capturadas pela peça em (x, y) e retorna suas casas."""
         player = self.board[y][x]
         opponent = 'A' if player == 'B' else 'B'
+        captured = []
         for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
             ax, ay = x + dx, y + dy
             bx, by = x + 2*dx, y + 2*dy
@@ -140,7 +167,8 @@ class SeegaGame:
                 self.board[ay][ax] = ' '
                 mover = self.players.index(player)
                 self.captured_pieces[mover] += 1
-                self.broadcast(f"REMOVE {ax} {ay}")
+                captured.append((ax, ay))
+        return captured
 
     def check_winner(self):
         a = sum(row.count('A') for row in self.board)
@@ -153,3 +181,134 @@ class SeegaGame:
         loser = self.players[self.turn]
         winner = self.players[1-self.turn]
         return f"Jogador {loser} desistiu. {winner} venceu!"
+
+    def legal_moves(self):
+        """
+        Jogadas legais do jogador da vez: (x, y) na fase de colocação e
+        (x1, y1, x2, y2) na movimentação. Lista vazia se o jogo acabou ou
+        se o jogador está bloqueado.
+        """
+        if self.placement_phase:
+            if self.placement_count[self.turn] >= 12:
+                return []
+            # o centro está marcado com 'X' durante a colocação
+            return [(x, y) for y in range(5) for x in range(5) if self.board[y][x] == ' ']
+        if self.check_winner():
+            return []
+        return self._piece_moves(self.players[self.turn])
+
+    def _piece_moves(self, player):
+        board = self.board
+        moves = []
+        for y in range(5):
+            row = board[y]
+            for x in range(5):
+                if row[x] != player:
+                    continue
+                for dx, dy in ORTHOGONAL:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < 5 and 0 <= ny < 5 and board[ny][nx] == ' ':
+                        moves.append((x, y, nx, ny))
+        return moves
+
+    def is_blocked(self, turn=None):
+        """Na fase de movimentação, True se o jogador (por padrão o da vez) não pode mover."""
+        if self.placement_phase:
+            return False
+        player = self.players[self.turn if turn is None else turn]
+        board = self.board
+        for y in range(5):
+            for x in range(5):
+                if board[y][x] != player:
+                    continue
+                for dx, dy in ORTHOGONAL:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < 5 and 0 <= ny < 5 and board[ny][nx] == ' ':
+                        return False
+        return True
+
+    def play(self, move):
+        """Aplica uma jogada no formato devolvido por legal_moves()."""
+        if len(move) == 2:
+            return self.place_piece(*move)
+        return self.move_piece(*move)
+
+    def perft(self, depth):
+        """
+        Conta as folhas da árvore de jogadas legais com profundidade depth
+        (teste de regressão e de desempenho do gerador de jogadas).
+        """
+        if depth == 0:
+            return 1
+        moves = self.legal_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.make_move(move)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    def make_move(self, move):
+        """
+        Aplica uma jogada de legal_moves() sem validá-la e sem broadcast,
+        empilhando o necessário para desfazê-la. Retorna as casas capturadas.
+        """
+        turn = self.turn
+        board = self.board
+        if len(move) == 2:
+            x, y = move
+            board[y][x] = self.players[turn]
+            self.placement_count[turn] += 1
+            captured = []
+            phase_ended = sum(self.placement_count) == 24
+            if phase_ended:
+                self.placement_phase = False
+                board[2][2] = ' '
+        else:
+            x1, y1, x2, y2 = move
+            board[y2][x2] = board[y1][x1]
+            board[y1][x1] = ' '
+            captured = self.check_capture(x2, y2)
+            phase_ended = False
+        self.undo_stack.append((move, captured, turn, phase_ended))
+        self.turn = 1 - turn
+        if self.is_blocked():
+            self.turn = turn
+        return captured
+
+    def unmake_move(self):
+        """Desfaz a última jogada de make_move()."""
+        move, captured, turn, phase_ended = self.undo_stack.pop()
+        board = self.board
+        self.turn = turn
+        if len(move) == 2:
+            x, y = move
+            board[y][x] = ' '
+            self.placement_count[turn] -= 1
+            if phase_ended:
+                self.placement_phase = True
+                board[2][2] = 'X'
+        else:
+            x1, y1, x2, y2 = move
+            board[y1][x1] = board[y2][x2]
+            board[y2][x2] = ' '
+            opponent = self.players[1 - turn]
+            for ax, ay in captured:
+                board[ay][ax] = opponent
+            self.captured_pieces[turn] -= len(captured)
+
+    def snapshot(self):
+        """Estado completo em uma tupla imutável (o tabuleiro vira uma string de 25 casas)."""
+        return (''.join(''.join(row) for row in self.board), self.turn, self.placement_phase,
+                tuple(self.placement_count), tuple(self.captured_pieces))
+
+    def restore(self, snap):
+        """Volta ao estado salvo por snapshot(); a pilha de desfazer é descartada."""
+        cells, self.turn, self.placement_phase, placement, captured = snap
+        self.board = [list(cells[i:i + 5]) for i in range(0, 25, 5)]
+        self.placement_count = list(placement)
+        self.captured_pieces = list(captured)
+        self.last_captures = []
+        self.undo_stack = []
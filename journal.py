@@ -0,0 +1,301 @@
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+
+import binproto
+from game import SeegaGame
+
+
+"""
+Diário (journal) de partidas: um arquivo binário só de acréscimo por sala.
+
+Cada jogada aceita pela sala (PLACE, MOVE, as capturas REMOVE e RESTART,
+inclusive o reinício automático depois de uma vitória) vira um registro
+
+    tamanho (2 bytes, big-endian) + carga
+
+em que a carga é o próprio quadro de binproto.py (PLACE/MOVE/REMOVE/RESTART)
+ou um dos registros exclusivos do diário:
+
+    SNAPSHOT  op + quadro BOARD + turn, fase, colocadas A/B, capturas A/B
+    CLOSE     op                   a sala terminou (não é recuperada)
+
+Escrita em grupo (group commit): os registros se acumulam em memória e uma
+thread do Journal grava todas as salas a cada FLUSH_INTERVAL segundos, com
+um único write (e, se pedido, um fsync) por arquivo. Uma queda perde no
+máximo esse intervalo.
+
+A cada SNAPSHOT_EVERY eventos a sala grava o estado completo. Na
+recuperação, replay() percorre o arquivo via mmap só pelos prefixos de
+tamanho até o último SNAPSHOT ou RESTART, carrega esse estado e reaplica a
+cauda com place_piece/move_piece; um registro final incompleto (queda no
+meio da escrita) é descartado e cortado do arquivo.
+"""
+
+FLUSH_INTERVAL = 0.01
+SNAPSHOT_EVERY = 1000
+
+REC_SNAPSHOT = 0x40
+REC_CLOSE = 0x41
+
+HEADER = struct.Struct("!H")
+SNAPSHOT = struct.Struct("!B8sBBBBBB")
+CLOSE_RECORD = HEADER.pack(1) + bytes((REC_CLOSE,))
+
+FILE_NAME = "room-%d.log"
+FILE_PATTERN = re.compile(r"room-(\d+)\.log$")
+
+
+class JournalError(ValueError):
+    pass
+
+
+def encode_snapshot(game):
+    pa, pb = game.placement_count
+    ca, cb = game.captured_pieces
+    return SNAPSHOT.pack(REC_SNAPSHOT, binproto.encode_board(game.get_board_string()),
+                         game.turn, game.placement_phase, pa, pb, ca, cb)
+
+
+def load_snapshot(game, payload):
+    """Coloca game (SeegaGame ou BitboardSeegaGame) no estado de um registro SNAPSHOT."""
+    _, board, turn, phase, pa, pb, ca, cb = SNAPSHOT.unpack(payload)
+    cells = "".join(binproto.decode_board(board[1:]))
+    phase = bool(phase)
+    if hasattr(game, "bits"):
+        a = sum(1 << i for i, ch in enumerate(cells) if ch == 'A')
+        b = sum(1 << i for i, ch in enumerate(cells) if ch == 'B')
+        game.restore((a, b, bin(a).count("1"), bin(b).count("1"), turn, phase,
+                      (pa, pb), (ca, cb)))
+    else:
+        game.restore((cells, turn, phase, (pa, pb), (ca, cb)))
+
+
+class RoomJournal:
+    """Diário de uma sala. Os métodos só acrescentam ao buffer; quem grava é flush()."""
+
+    def __init__(self, path, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.file = open(path, "ab")
+        self.buffer = bytearray()
+        self.lock = threading.Lock()      # protege o buffer (append não espera o disco)
+        self.write_lock = threading.RLock()   # troca do buffer, write, fsync e close em ordem
+        self.snapshot_every = snapshot_every
+        self.events = 0               # eventos desde o último SNAPSHOT/RESTART
+        self.closed = False
+
+    def append(self, payload):
+        with self.lock:
+            self.buffer += HEADER.pack(len(payload))
+            self.buffer += payload
+
+    def record(self, payload, game):
+        self.append(payload)
+        self.events += 1
+        if self.events >= self.snapshot_every:
+            self.snapshot(game)
+
+    def place(self, x, y, player, game):
+        self.record(binproto.encode_place(x, y, player), game)
+
+    def move(self, x1, y1, x2, y2, player, captures, game):
+        frames = [binproto.encode_move(x1, y1, x2, y2, player)]
+        frames += [binproto.encode_remove(x, y) for x, y in captures]
+        with self.lock:
+            for frame in frames:
+                self.buffer += HEADER.pack(len(frame))
+                self.buffer += frame
+        self.events += len(frames)
+        if self.events >= self.snapshot_every:
+            self.snapshot(game)
+
+    def restart(self):
+        self.append(bytes((binproto.OP_RESTART,)))
+        self.events = 0
+
+    def snapshot(self, game):
+        self.append(encode_snapshot(game))
+        self.events = 0
+
+    def flush(self, sync=False):
+        with self.write_lock:
+            with self.lock:
+                if not self.buffer or self.file.closed:
+                    return
+                data = bytes(self.buffer)
+                self.buffer.clear()
+            self.file.write(data)
+            self.file.flush()
+            if sync:
+                os.fsync(self.file.fileno())
+
+    def close(self, ended=True, sync=False):
+        """Grava o pendente e fecha; com ended=True a sala não será recuperada."""
+        if self.closed:
+            return
+        if ended:
+            self.append(bytes((REC_CLOSE,)))
+        with self.write_lock:
+            self.flush(sync)
+            self.closed = True
+            self.file.close()
+
+
+def replay(path, engine=SeegaGame, full=False):
+    """
+    Reconstrói o jogo de um diário. Retorna (game, eventos reaplicados,
+    tamanho válido do arquivo, sala encerrada). Com full=True ignora os
+    SNAPSHOTs e reaplica o arquivo inteiro desde o primeiro registro.
+    """
+    game = engine()
+    size = os.path.getsize(path)
+    if size == 0:
+        return game, 0, 0, False
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # 1ª passada: só os prefixos, para achar o ponto de partida e o fim válido
+        pos = 0
+        start = None
+        last = None
+        while pos + 3 <= size:
+            n = (mm[pos] << 8) | mm[pos + 1]
+            if n == 0 or pos + 2 + n > size:
+                break
+            op = mm[pos + 2]
+            if op == REC_SNAPSHOT or op == binproto.OP_RESTART:
+                start = pos
+            last = op
+            pos += 2 + n
+        end = pos
+
+        # 2ª passada: carrega o ponto de partida e reaplica a cauda
+        pos = 0
+        if start is not None and not full:
+            n = (mm[start] << 8) | mm[start + 1]
+            if mm[start + 2] == REC_SNAPSHOT:
+                load_snapshot(game, mm[start + 2:start + 2 + n])
+            pos = start + 2 + n
+        xy = binproto.CELL_XY
+        applied = 0
+        place, move = game.place_piece, game.move_piece
+        while pos < end:
+            n = (mm[pos] << 8) | mm[pos + 1]
+            op = mm[pos + 2]
+            if op == binproto.OP_PLACE:
+                ok, resp = place(*xy[mm[pos + 3]])
+            elif op == binproto.OP_MOVE:
+                ok, resp = move(*xy[mm[pos + 3]], *xy[mm[pos + 4]])
+            elif op == binproto.OP_RESTART:
+                game.reset_game()
+                ok = True
+            else:
+                # REMOVE é consequência do MOVE; SNAPSHOT e CLOSE não alteram o jogo
+                ok = True
+            if not ok:
+                raise JournalError(f"{path}: registro em {pos} recusado: {resp}")
+            applied += 1
+            pos += 2 + n
+    return game, applied, end, last == REC_CLOSE
+
+
+class Journal:
+    """Diretório com os diários das salas e a thread de escrita em grupo."""
+
+    def __init__(self, directory, interval=FLUSH_INTERVAL, sync=False,
+                 snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.interval = interval
+        self.sync = sync
+        self.snapshot_every = snapshot_every
+        self.rooms = {}                   # room_id → RoomJournal
+        self.rooms_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, room_id):
+        return os.path.join(self.directory, FILE_NAME % room_id)
+
+    def room_ids(self):
+        ids = []
+        for name in os.listdir(self.directory):
+            match = FILE_PATTERN.match(name)
+            if match:
+                ids.append(int(match.group(1)))
+        return sorted(ids)
+
+    def next_id(self):
+        """Primeiro id de sala ainda sem arquivo (salas novas não reusam diários antigos)."""
+        ids = self.room_ids()
+        return ids[-1] + 1 if ids else 0
+
+    def open_room(self, room_id):
+        journal = RoomJournal(self.path(room_id), self.snapshot_every)
+        with self.rooms_lock:
+            self.rooms[room_id] = journal
+        return journal
+
+    def close_room(self, room_id, ended=True):
+        with self.rooms_lock:
+            journal = self.rooms.pop(room_id, None)
+        if journal is not None:
+            journal.close(ended, self.sync)
+
+    def recover(self, engine=SeegaGame):
+        """
+        Reconstrói as salas que não foram encerradas. Retorna {room_id: game};
+        os arquivos com registro final incompleto são cortados no último
+        registro válido e as salas com um registro recusado são ignoradas.
+        """
+        games = {}
+        for room_id in self.room_ids():
+            path = self.path(room_id)
+            if os.path.getsize(path) == 0:
+                continue                  # sala formada sem nenhuma jogada
+            with open(path, "rb") as f:
+                f.seek(max(0, os.path.getsize(path) - len(CLOSE_RECORD)))
+                if f.read() == CLOSE_RECORD:
+                    continue
+            try:
+                game, _, end, ended = replay(path, engine)
+            except JournalError as e:
+                # um diário recusado não impede a volta das outras salas; o
+                # arquivo fica onde está para ser examinado
+                print(f"sala {room_id} não recuperada: {e}", file=sys.stderr)
+                continue
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+            if not ended:
+                games[room_id] = game
+        return games
+
+    def flush_all(self):
+        with self.rooms_lock:
+            journals = list(self.rooms.values())
+        for journal in journals:
+            try:
+                journal.flush(self.sync)
+            except (OSError, ValueError) as e:
+                # uma sala com erro não pode parar o diário das outras
+                print(f"diário {journal.path}: {e}", file=sys.stderr)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.flush_all()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Para a thread e grava o pendente; as salas abertas continuam recuperáveis."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        with self.rooms_lock:
+            journals = list(self.rooms.values())
+            self.rooms.clear()
+        for journal in journals:
+            journal.close(ended=False, sync=self.sync)
@@ -0,0 +1,256 @@
+import itertools
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, insort
+
+
+"""
+Pareamento por rating e rating Elo persistente.
+
+Matchmaker guarda quem espera em uma lista ordenada por (rating, chegada):
+um jogador novo é comparado só com os vizinhos de rating, achados por
+bisect, e nunca com a fila inteira. Dois jogadores podem se enfrentar se a
+diferença de rating cabe na faixa do que espera há mais tempo; a faixa
+começa em BASE_BAND e cresce WIDEN_PER_SECOND por segundo de espera, até
+MAX_BAND. sweep() refaz a busca periódica para quem ficou esperando
+enquanto a faixa se alargava.
+
+RatingStore mantém os ratings em memória e os grava em um SQLite local em
+lotes: record() só altera o cache e marca o nome; uma thread grava todos os
+nomes marcados em uma única transação a cada FLUSH_INTERVAL segundos (ou
+antes, ao juntar BATCH_SIZE nomes). Uma queda perde no máximo esse
+intervalo.
+"""
+
+DEFAULT_RATING = 1500.0
+BASE_BAND = 50.0
+WIDEN_PER_SECOND = 25.0
+MAX_BAND = 400.0
+MAX_SCAN = 32             # vizinhos examinados de cada lado em uma busca
+
+K_PROVISIONAL = 40.0      # fator K nas primeiras PROVISIONAL_GAMES partidas
+K_FACTOR = 20.0
+PROVISIONAL_GAMES = 30
+
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE = 512
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratings (
+    name TEXT PRIMARY KEY,
+    rating REAL NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+
+def expected_score(rating, other):
+    """Pontuação esperada (0 a 1) de rating contra other."""
+    return 1.0 / (1.0 + 10.0 ** ((other - rating) / 400.0))
+
+
+def k_factor(games):
+    return K_PROVISIONAL if games < PROVISIONAL_GAMES else K_FACTOR
+
+
+class Ticket:
+    __slots__ = ("key", "item", "rating", "since")
+
+    def __init__(self, key, item, rating, since):
+        self.key = key
+        self.item = item
+        self.rating = rating
+        self.since = since
+
+
+class Matchmaker:
+    """Fila de espera ordenada por rating, com faixas de tolerância que se alargam."""
+
+    def __init__(self, base_band=BASE_BAND, widen=WIDEN_PER_SECOND, max_band=MAX_BAND,
+                 clock=time.monotonic):
+        self.base_band = base_band
+        self.widen = widen
+        self.max_band = max_band
+        self.clock = clock
+        self.keys = []                    # (rating, chegada), ordenada
+        self.tickets = {}                 # item → Ticket, na ordem de chegada
+        self.by_key = {}                  # (rating, chegada) → Ticket
+        self._arrivals = itertools.count()
+
+    def __len__(self):
+        return len(self.tickets)
+
+    def __contains__(self, item):
+        return item in self.tickets
+
+    def band(self, ticket, now):
+        return min(self.max_band, self.base_band + self.widen * (now - ticket.since))
+
+    def add(self, item, rating, now=None):
+        """
+        Põe item na fila ou o pareia com quem já espera. Retorna o adversário
+        (que sai da fila) ou None se item ficou esperando.
+        """
+        now = self.clock() if now is None else now
+        ticket = Ticket((rating, next(self._arrivals)), item, rating, now)
+        other = self._best(ticket, now)
+        if other is not None:
+            self._discard(other)
+            return other.item
+        self._insert(ticket)
+        return None
+
+    def insert(self, item, rating, now=None):
+        """Põe item na fila sem procurar adversário (ver sweep)."""
+        now = self.clock() if now is None else now
+        self._insert(Ticket((rating, next(self._arrivals)), item, rating, now))
+
+    def remove(self, item):
+        ticket = self.tickets.get(item)
+        if ticket is None:
+            return False
+        self._discard(ticket)
+        return True
+
+    def sweep(self, now=None):
+        """Pareia quem já cabe na faixa alargada; retorna [(mais antigo, mais novo)]."""
+        now = self.clock() if now is None else now
+        pairs = []
+        for ticket in list(self.tickets.values()):
+            if ticket.item not in self.tickets:
+                continue                  # já pareado nesta varredura
+            other = self._best(ticket, now)
+            if other is None:
+                continue
+            self._discard(ticket)
+            self._discard(other)
+            pairs.append((ticket.item, other.item) if ticket.since <= other.since
+                         else (other.item, ticket.item))
+        return pairs
+
+    def _best(self, ticket, now):
+        """Vizinho de rating mais próximo que aceita ticket (ou que ticket aceita)."""
+        keys = self.keys
+        by_key = self.by_key
+        rating = ticket.rating
+        band = self.band(ticket, now)
+        pos = bisect_left(keys, ticket.key)
+        best = None
+        best_diff = None
+        for step, start, stop in ((-1, pos - 1, max(-1, pos - 1 - MAX_SCAN)),
+                                  (1, pos, min(len(keys), pos + MAX_SCAN))):
+            for i in range(start, stop, step):
+                key = keys[i]
+                diff = abs(key[0] - rating)
+                if diff > self.max_band or (best_diff is not None and diff >= best_diff):
+                    break
+                other = by_key[key]
+                if other is ticket:
+                    continue
+                if diff <= band or diff <= self.band(other, now):
+                    best, best_diff = other, diff
+                    break
+        return best
+
+    def _insert(self, ticket):
+        insort(self.keys, ticket.key)
+        self.by_key[ticket.key] = ticket
+        self.tickets[ticket.item] = ticket
+
+    def _discard(self, ticket):
+        keys = self.keys
+        del keys[bisect_left(keys, ticket.key)]
+        del self.by_key[ticket.key]
+        del self.tickets[ticket.item]
+
+
+class RatingStore:
+    """Ratings Elo em memória, gravados em lotes em um SQLite."""
+
+    def __init__(self, path, interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.path = path
+        self.interval = interval
+        self.batch_size = batch_size
+        # leitura no thread de quem chama, escrita no thread do flush (WAL: sem bloqueio)
+        self.writer = sqlite3.connect(path, check_same_thread=False)
+        self.writer.execute("PRAGMA journal_mode=WAL")
+        self.writer.execute("PRAGMA synchronous=NORMAL")
+        self.writer.execute(SCHEMA)
+        self.writer.commit()
+        self.reader = sqlite3.connect(path, check_same_thread=False)
+        self.cache = {}                   # nome → [rating, partidas, vitórias, derrotas]
+        self.dirty = set()
+        self.lock = threading.Lock()      # protege dirty e as linhas lidas pelo flush
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def entry(self, name):
+        entry = self.cache.get(name)
+        if entry is None:
+            row = self.reader.execute(
+                "SELECT rating, games, wins, losses FROM ratings WHERE name = ?",
+                (name,)).fetchone()
+            entry = self.cache[name] = list(row) if row else [DEFAULT_RATING, 0, 0, 0]
+        return entry
+
+    def get(self, name):
+        return self.entry(name)[0]
+
+    def stats(self, name):
+        """(rating, partidas, vitórias, derrotas)."""
+        return tuple(self.entry(name))
+
+    def record(self, winner, loser):
+        """Atualiza os ratings depois da vitória de winner sobre loser."""
+        w = self.entry(winner)
+        l = self.entry(loser)
+        expected = expected_score(w[0], l[0])
+        with self.lock:
+            w[0] += k_factor(w[1]) * (1.0 - expected)
+            l[0] -= k_factor(l[1]) * (1.0 - expected)
+            w[1] += 1
+            w[2] += 1
+            l[1] += 1
+            l[3] += 1
+            self.dirty.add(winner)
+            self.dirty.add(loser)
+            full = len(self.dirty) >= self.batch_size
+        if full:
+            self.wake.set()
+
+    def flush(self):
+        """Grava os ratings alterados em uma transação; retorna quantos."""
+        now = time.time()
+        with self.lock:
+            rows = [(name, *self.cache[name], now) for name in self.dirty]
+            self.dirty.clear()
+        if rows:
+            with self.writer:
+                self.writer.executemany(
+                    "INSERT OR REPLACE INTO ratings VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.flush()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Para a thread e grava o pendente."""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+        self.reader.close()
+        self.writer.close()
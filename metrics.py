@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+"""
+Métricas dos servidores no formato de texto do Prometheus.
+
+As métricas ficam em um registro global (REGISTRY) e são baratas o
+bastante para ficarem sempre ligadas:
+    - Counter.inc() é uma soma;
+    - Histogram.observe() é um bisect em buckets fixos e duas somas;
+    - Gauge é uma função chamada só na hora da coleta (salas, conexões,
+      filas de saída), sem custo nenhum no caminho quente.
+
+As somas não pegam lock: no servidor com threads um incremento
+concorrente raro pode se perder, o que não importa para estatística e
+evita um lock a mais por comando. TimedLock mede o tempo de espera e de
+posse de um threading.Lock (o lock da sala no server.py).
+
+render() gera o texto; serve() expõe GET /metrics em uma thread (HTTP) e
+dump() grava o texto periodicamente em um arquivo, trocado atomicamente.
+
+Uso nos servidores: --metrics-port PORTA ou --metrics-file ARQUIVO.
+"""
+
+# segundos: de 10µs a 1s, o bastante para comandos, locks e o motor
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+           0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DUMP_INTERVAL = 10.0
+
+clock = time.perf_counter
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.value = 0
+        self.children = {}
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            child = self.children.setdefault(values, Counter(self.name, self.help))
+        return child
+
+    def inc(self, n=1):
+        self.value += n
+
+    def samples(self):
+        if not self.labelnames:
+            yield self.name, "", self.value
+        for values, child in list(self.children.items()):
+            yield self.name, _labels(self.labelnames, values), child.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # o último é +Inf
+        self.sum = 0.0
+        self.children = {}
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            child = self.children.setdefault(
+                values, Histogram(self.name, self.help, buckets=self.buckets))
+        return child
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        items = list(self.children.items()) if self.labelnames else [((), self)]
+        for values, h in items:
+            counts = list(h.counts)
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                total += count
+                le = _labels(self.labelnames + ("le",), values + (bound,))
+                yield self.name + "_bucket", le, total
+            lbl = _labels(self.labelnames, values)
+            yield self.name + "_sum", lbl, h.sum
+            yield self.name + "_count", lbl, total
+
+
+class Gauge:
+    """Valor lido na coleta: fn() devolve um número ou {rótulo: número}."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labelname=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelname = labelname
+
+    def samples(self):
+        value = self.fn()
+        if self.labelname is None:
+            yield self.name, "", value
+        else:
+            for label, v in value.items():
+                yield self.name, _labels((self.labelname,), (label,)), v
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, metric):
+        # um servidor novo no mesmo processo substitui as gauges do anterior
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        out = []
+        for metric in list(self.metrics.values()):
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                out.append(f"{name}{labels} {value:g}" if isinstance(value, float)
+                           else f"{name}{labels} {value}")
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help, labelnames=()):
+    return REGISTRY.add(Counter(name, help, labelnames))
+
+
+def histogram(name, help, labelnames=(), buckets=BUCKETS):
+    return REGISTRY.add(Histogram(name, help, labelnames, buckets))
+
+
+def gauge(name, help, fn, labelname=None):
+    return REGISTRY.add(Gauge(name, help, fn, labelname))
+
+
+def render():
+    return REGISTRY.render()
+
+
+COMMAND_SECONDS = histogram("seega_command_seconds",
+                            "Tempo de processamento de um comando no servidor.", ("command",))
+ENGINE_SECONDS = histogram("seega_engine_seconds",
+                           "Tempo de validação e aplicação da jogada no motor.", ("op",))
+LOCK_WAIT_SECONDS = histogram("seega_lock_wait_seconds",
+                              "Tempo esperando um lock.", ("lock",))
+LOCK_HOLD_SECONDS = histogram("seega_lock_hold_seconds",
+                              "Tempo com um lock adquirido.", ("lock",))
+BYTES_IN = counter("seega_bytes_in_total", "Bytes recebidos dos clientes.")
+BYTES_OUT = counter("seega_bytes_out_total", "Bytes enviados aos clientes.")
+SEND_ERRORS = counter("seega_send_errors_total",
+                      "Clientes desconectados por erro de envio ou fila cheia.")
+DROPPED = counter("seega_dropped_messages_total",
+                  "Mensagens descartadas pela política de cliente lento.")
+CONNECTIONS = counter("seega_connections_total", "Conexões aceitas.")
+
+COMMANDS = ("PLACE", "MOVE", "CHAT", "NAME", "RESTART", "RESUME", "WATCH", "ROOMS", "HINT",
+            "SURRENDER")
+_commands = {name: COMMAND_SECONDS.labels(name) for name in COMMANDS}
+_other = COMMAND_SECONDS.labels("other")
+
+
+def command_histogram(msg):
+    """Histograma de latência do comando de texto msg."""
+    name = msg.split(" ", 1)[0]
+    return _commands.get(name, _other)
+
+
+def queue_depths(queues):
+    """{"total": …, "max": …} das filas de saída (para uma Gauge com labelname)."""
+    depths = [len(q.items) for q in queues]
+    return {"total": sum(depths), "max": max(depths, default=0)}
+
+
+class TimedLock:
+    """threading.Lock que registra espera e posse em LOCK_WAIT/LOCK_HOLD_SECONDS."""
+
+    def __init__(self, name):
+        self.lock = threading.Lock()
+        self.wait = LOCK_WAIT_SECONDS.labels(name)
+        self.hold = LOCK_HOLD_SECONDS.labels(name)
+        self.acquired = 0.0
+
+    def __enter__(self):
+        t0 = clock()
+        self.lock.acquire()
+        # só quem tem o lock escreve em acquired
+        self.acquired = clock()
+        self.wait.observe(self.acquired - t0)
+        return self
+
+    def __exit__(self, *exc):
+        self.hold.observe(clock() - self.acquired)
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(host, port):
+    """Expõe GET /metrics em uma thread; retorna o HTTPServer (port 0 escolhe uma livre)."""
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def dump(path, interval=DUMP_INTERVAL):
+    """Grava render() em path a cada interval segundos, em uma thread."""
+    def run():
+        while True:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(render())
+            os.replace(tmp, path)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from collections import deque
+
+import metrics
+
+
+"""
+Filas de saída por cliente.
+
+Cada cliente tem uma fila limitada de mensagens (bytes) esvaziada por um
+escritor próprio: uma thread no servidor com threads (OutboundQueue) ou uma
+task no servidor asyncio (AsyncOutboundQueue). Quem faz broadcast só
+enfileira e nunca espera por um socket lento. O escritor junta tudo o que
+estiver pendente em uma única escrita (até batch_bytes).
+
+Quando a fila de um cliente lento enche, a política configurada decide:
+    DROP        descarta a mensagem nova;
+    DISCONNECT  derruba o cliente;
+    SNAPSHOT    descarta o que estava pendente e envia no lugar o estado
+                atual (FULL, STATE e SEQ, como Room.catch_up()); snapshot()
+                deve devolver bytes.
+
+Os bytes escritos, as mensagens descartadas e os clientes derrubados
+entram nas métricas (metrics.py).
+"""
+
+DROP = "drop"
+DISCONNECT = "disconnect"
+SNAPSHOT = "snapshot"
+POLICIES = (DROP, DISCONNECT, SNAPSHOT)
+
+MAX_PENDING = 256
+BATCH_BYTES = 64 * 1024
+
+
+class _Pending:
+    """Estado comum às duas filas: itens pendentes e a política de estouro."""
+
+    def __init__(self, max_pending, policy, snapshot, batch_bytes):
+        if policy not in POLICIES:
+            raise ValueError(f"Política inválida: {policy}")
+        if policy == SNAPSHOT and snapshot is None:
+            raise ValueError("A política snapshot precisa de uma função snapshot().")
+        self.items = deque()
+        self.max_pending = max_pending
+        self.policy = policy
+        self.snapshot = snapshot
+        self.batch_bytes = batch_bytes
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, data):
+        """Enfileira data; retorna False se o cliente deve ser desconectado."""
+        if len(self.items) < self.max_pending:
+            self.items.append(data)
+            return True
+        if self.policy == DROP:
+            self.dropped += 1
+            metrics.DROPPED.inc()
+            return True
+        if self.policy == SNAPSHOT:
+            self.dropped += len(self.items) + 1
+            metrics.DROPPED.inc(len(self.items) + 1)
+            self.items.clear()
+            self.items.append(self.snapshot())
+            return True
+        return False
+
+    def take_batch(self):
+        items = self.items
+        batch = [items.popleft()]
+        size = len(batch[0])
+        while items and size < self.batch_bytes:
+            data = items.popleft()
+            batch.append(data)
+            size += len(data)
+        metrics.BYTES_OUT.inc(size)
+        return b"".join(batch)
+
+
+class OutboundQueue(_Pending):
+    """Fila de saída de um socket bloqueante, esvaziada por uma thread."""
+
+    def __init__(self, sock, max_pending=MAX_PENDING, policy=DROP, snapshot=None,
+                 batch_bytes=BATCH_BYTES):
+        super().__init__(max_pending, policy, snapshot, batch_bytes)
+        self.sock = sock
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, data):
+        with self.cond:
+            if self.closed:
+                return
+            if not self.push(data):
+                self._abort()
+                return
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.items and not self.closed:
+                    self.cond.wait()
+                if not self.items:
+                    return
+                data = self.take_batch()
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                with self.cond:
+                    self._abort()
+                return
+
+    def _abort(self):
+        # chamado com self.cond adquirido
+        metrics.SEND_ERRORS.inc()
+        self.closed = True
+        self.items.clear()
+        self.cond.notify()
+        try:
+            self.sock.shutdown(2)     # acorda o recv da thread do cliente
+        except OSError:
+            pass
+
+    def close(self):
+        """Para o escritor depois de enviar o que já estava na fila."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+
+class AsyncOutboundQueue(_Pending):
+    """Fila de saída de um StreamWriter, esvaziada por uma task."""
+
+    def __init__(self, writer, max_pending=MAX_PENDING, policy=DROP, snapshot=None,
+                 batch_bytes=BATCH_BYTES):
+        super().__init__(max_pending, policy, snapshot, batch_bytes)
+        self.writer = writer
+        self.ready = asyncio.Event()
+        self.task = asyncio.ensure_future(self._run())
+
+    def put(self, data):
+        if self.closed:
+            return
+        if not self.push(data):
+            self._abort()
+            return
+        self.ready.set()
+
+    async def _run(self):
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.items:
+                    self.writer.write(self.take_batch())
+                    await self.writer.drain()
+                if self.closed:
+                    return
+        except (ConnectionError, OSError):
+            self._abort()
+
+    def _abort(self):
+        metrics.SEND_ERRORS.inc()
+        self.closed = True
+        self.items.clear()
+        self.ready.set()
+        self.writer.transport.abort()
+
+    def close(self):
+        """Para o escritor depois de enviar o que já estava na fila."""
+        self.closed = True
+        self.ready.set()
@@ -0,0 +1,287 @@
+from collections import deque
+
+import metrics
+from bitboard import FULL_MASK, mobile
+from game import SeegaGame
+
+
+"""
+Room: uma sala de jogo independente de transporte.
+
+Cada sala possui sua própria instância de SeegaGame e o mapa de nomes dos
+jogadores. O método dispatch() interpreta um comando de texto de um jogador
+e devolve as linhas que devem ser respondidas a ele e as que devem ser
+transmitidas para toda a sala, sem fazer nenhuma E/S. Assim a mesma lógica
+serve tanto ao servidor com threads (server.py) quanto ao servidor asyncio
+(async_server.py).
+
+Com um diário (journal.py), cada jogada aceita também é registrada, para
+que a sala possa ser reconstruída depois de uma queda do servidor.
+
+Quando uma partida termina (vitória ou "SURRENDER"), a sala chama
+on_result(sala, pid do vencedor), se definido, antes de recomeçar o jogo.
+Um recorder (analytics.GameRecorder) recebe as mesmas jogadas que o diário
+e o resultado de cada partida terminada.
+
+Os eventos do jogo transmitidos (PLACE, MOVE, REMOVE, RESTART) são
+numerados: cada lote termina com "STATE ..." (state_line) e "SEQ n", o
+número do último evento. A sala
+guarda os HISTORY eventos mais recentes, e resume() usa esse histórico para
+atualizar um jogador que reconecta enviando só o que ele perdeu.
+
+STATE é o estado autoritativo depois do lote:
+
+    STATE turn fase colocadas_A colocadas_B capturas_A capturas_B origens
+
+com fase P (colocação) ou M (movimentação) e origens a máscara, em hex,
+das casas (bit y * 5 + x) de onde o jogador da vez pode mover. Com isso o
+cliente deixa de enviar jogadas que o servidor certamente recusaria.
+"""
+
+HISTORY = 1024
+STATE_EVENTS = ("PLACE", "MOVE", "REMOVE", "RESTART")
+
+ENGINE_PLACE = metrics.ENGINE_SECONDS.labels("place")
+ENGINE_MOVE = metrics.ENGINE_SECONDS.labels("move")
+
+
+class Room:
+    def __init__(self, room_id=0, engine=SeegaGame, journal=None, game=None):
+        self.room_id = room_id
+        # engine: SeegaGame ou qualquer classe com a mesma API (ex.: BitboardSeegaGame);
+        # game: jogo já em andamento (ex.: recuperado do diário)
+        self.game = game if game is not None else engine()
+        self.journal = journal            # RoomJournal ou None
+        self.recorder = None              # analytics.GameRecorder ou None
+        self.names = {}                   # símbolo → nome
+        self.seq = 0                      # número do último evento do jogo
+        self.history = deque(maxlen=HISTORY)   # (seq, linha) dos eventos recentes
+        self.on_result = None             # on_result(sala, pid do vencedor) ao fim da partida
+        # serializa as alterações do jogo no servidor com threads; o
+        # servidor asyncio roda em uma única thread e não precisa dele
+        self.lock = metrics.TimedLock("room")
+
+    def symbol(self, pid):
+        return self.game.players[pid]
+
+    def display_name(self, pid):
+        symbol = self.symbol(pid)
+        return self.names.get(symbol, f"Jogador {symbol}")
+
+    def welcome(self, pid):
+        """Linhas enviadas a um jogador quando ele ocupa seu lugar na sala."""
+        symbol = self.symbol(pid)
+        return [
+            f"Você é o Jogador {symbol}",
+            f"PLAYER {symbol}",
+        ] + self.catch_up()
+
+    def watch_welcome(self):
+        """Linhas enviadas a um espectador quando ele começa a assistir à sala."""
+        lines = [f"WATCH {self.room_id}"]
+        lines += [f"PLAYER {symbol} {name}" for symbol, name in self.names.items()]
+        return lines + self.catch_up()
+
+    def catch_up(self):
+        """Tabuleiro, STATE e SEQ: o suficiente para quem perdeu eventos."""
+        return [self.snapshot(), self.state_line(), f"SEQ {self.seq}"]
+
+    def resume(self, pid, last_seq, full=False):
+        """
+        Linhas para um jogador que volta depois de ter recebido até o evento
+        last_seq: só os eventos seguintes, ou o tabuleiro completo se eles
+        já saíram do histórico. Com full=True manda sempre o tabuleiro (o
+        cliente já recebeu o de outra sala e limpou o seu).
+        """
+        symbol = self.symbol(pid)
+        lines = [f"Você é o Jogador {symbol}", f"PLAYER {symbol}"]
+        history = self.history
+        if full:
+            lines.append(self.snapshot())
+        elif last_seq == self.seq:
+            pass
+        elif 0 <= last_seq < self.seq and history and history[0][0] <= last_seq + 1:
+            lines.extend(line for seq, line in history if seq > last_seq)
+        else:
+            lines.append(self.snapshot())
+        lines.append(self.state_line())
+        lines.append(f"SEQ {self.seq}")
+        return lines
+
+    def snapshot(self):
+        """Tabuleiro completo; com o '\\n' final termina em linha em branco."""
+        return "FULL\n" + self.game.get_board_string() + "\n"
+
+    def origins(self):
+        """Máscara das casas de onde o jogador da vez pode mover (0 na colocação)."""
+        game = self.game
+        if game.placement_phase:
+            return 0
+        if hasattr(game, "bits"):
+            a, b = game.bits
+            mine = game.bits[game.turn]
+        else:
+            player = game.players[game.turn]
+            a = b = mine = 0
+            for i, ch in enumerate(game.get_board_string().replace("\n", "")):
+                if ch == ' ':
+                    continue
+                a |= 1 << i
+                if ch == player:
+                    mine |= 1 << i
+        return mobile(mine, FULL_MASK & ~(a | b))
+
+    def state_line(self):
+        game = self.game
+        origins = self.origins()
+        pa, pb = game.placement_count
+        ca, cb = game.captured_pieces
+        phase = "P" if game.placement_phase else "M"
+        return f"STATE {game.turn} {phase} {pa} {pb} {ca} {cb} {origins:x}"
+
+    def sequence(self, broadcasts):
+        """Numera os eventos do jogo em broadcasts e fecha o lote com STATE e "SEQ n"."""
+        numbered = False
+        for line in broadcasts:
+            if line.startswith(STATE_EVENTS):
+                self.seq += 1
+                self.history.append((self.seq, line))
+                numbered = True
+        if numbered:
+            broadcasts.append(self.state_line())
+            broadcasts.append(f"SEQ {self.seq}")
+        return broadcasts
+
+    def dispatch(self, pid, msg):
+        """
+        Processa um comando do jogador pid.
+
+        Retorna (replies, broadcasts): listas de linhas (sem '\\n') para o
+        próprio jogador e para todos os jogadores da sala.
+        """
+        game = self.game
+        symbol = self.symbol(pid)
+        replies, broadcasts = [], []
+
+        # COMANDO PARA NOME DO JOGADOR
+        if msg.startswith("NAME "):
+            name = msg[5:].strip()
+            self.names[symbol] = name
+            broadcasts.append(f"PLAYER {symbol} {name}")
+
+        # COMANDO PARA COLOCAR AS PEÇAS
+        elif msg.startswith("PLACE"):
+            if game.turn != pid:
+                replies.append("Não é seu turno.")
+                return replies, broadcasts
+            try:
+                _, xs, ys = msg.split()
+                x, y = int(xs), int(ys)
+            except ValueError:
+                replies.append("Formato inválido. Use: PLACE x y")
+                return replies, broadcasts
+
+            return self.place(pid, x, y)
+
+        # COMANDO PARA MOVER AS PEÇAS
+        elif msg.startswith("MOVE"):
+            if game.turn != pid:
+                replies.append("Não é seu turno.")
+                return replies, broadcasts
+            try:
+                _, x1s, y1s, x2s, y2s = msg.split()
+                x1, y1, x2, y2 = map(int, (x1s, y1s, x2s, y2s))
+            except ValueError:
+                replies.append("Formato inválido. Use: MOVE x1 y1 x2 y2")
+                return replies, broadcasts
+
+            return self.move(pid, x1, y1, x2, y2)
+
+        # interação com o chat
+        elif msg.startswith("CHAT"):
+            broadcasts.append(f"CHAT {self.display_name(pid)}: {msg[5:]}")
+
+        # desistência do jogador da vez
+        elif msg == "SURRENDER":
+            if game.turn != pid:
+                replies.append("Não é seu turno.")
+                return replies, broadcasts
+            broadcasts.append(f"CHAT {game.surrender()}")
+            self.finish(1 - pid, broadcasts, "surrender")
+            self.sequence(broadcasts)
+
+        # restart jogo
+        elif msg == "RESTART":
+            game.reset_game()
+            if self.journal is not None:
+                self.journal.restart()
+            if self.recorder is not None:
+                self.recorder.restart()
+            broadcasts.append("RESTART")
+            self.sequence(broadcasts)
+
+        else:
+            replies.append("Comando desconhecido.")
+
+        return replies, broadcasts
+
+    def place(self, pid, x, y):
+        """PLACE já interpretado (usado também pelo protocolo binário)."""
+        game = self.game
+        if game.turn != pid:
+            return ["Não é seu turno."], []
+        t0 = metrics.clock()
+        ok, resp = game.place_piece(x, y)
+        ENGINE_PLACE.observe(metrics.clock() - t0)
+        if not ok:
+            return [resp], []
+        if self.journal is not None:
+            self.journal.place(x, y, pid, game)
+        if self.recorder is not None:
+            self.recorder.place(x, y, pid)
+        return [resp], self.sequence([f"PLACE {x} {y} {self.symbol(pid)}"])
+
+    def move(self, pid, x1, y1, x2, y2):
+        """MOVE já interpretado (usado também pelo protocolo binário)."""
+        game = self.game
+        if game.turn != pid:
+            return ["Não é seu turno."], []
+        symbol = self.symbol(pid)
+        broadcasts = []
+
+        t0 = metrics.clock()
+        ok, resp = game.move_piece(x1, y1, x2, y2)
+        ENGINE_MOVE.observe(metrics.clock() - t0)
+        if ok:
+            broadcasts.append(f"MOVE {x1} {y1} {x2} {y2} {symbol}")
+            broadcasts.extend(f"REMOVE {ax} {ay}" for ax, ay in game.last_captures)
+            if self.journal is not None:
+                self.journal.move(x1, y1, x2, y2, pid, game.last_captures, game)
+            if self.recorder is not None:
+                self.recorder.move(x1, y1, x2, y2, pid, game.last_captures)
+
+        # só um movimento aceito na fase de movimentação decide a partida
+        result = game.check_winner() if ok and not game.placement_phase else None
+        if result:
+            winner = game.players.index(result.split()[1])
+            broadcasts.append(f"CHAT {result}")
+            self.finish(winner, broadcasts)
+        return [resp], self.sequence(broadcasts)
+
+    def finish(self, winner, broadcasts, reason="pieces"):
+        """Fim da partida: avisa on_result e o recorder e recomeça o jogo."""
+        if self.on_result is not None:
+            self.on_result(self, winner)
+        if self.recorder is not None:
+            self.recorder.finish(winner, reason)
+        # o jogo recomeça: os clientes (e quem for retomar a sessão) limpam o tabuleiro
+        broadcasts.append("RESTART")
+        self.game.reset_game()
+        if self.journal is not None:
+            self.journal.restart()
+
+    def farewell(self, pid):
+        return f"CHAT {self.display_name(pid)} saiu."
+
+    def comeback(self, pid):
+        return f"CHAT {self.display_name(pid)} voltou."
@@ -1,6 +1,12 @@
+import secrets
 import socket
 import threading
-from game import SeegaGame
+import metrics
+from analytics import AnalyticsSink, GameRecorder
+from framing import LineFramer, LineTooLong
+from journal import Journal
+from outbound import OutboundQueue, DROP
+from room import Room
 
 
 """"
@@ -8,16 +14,43 @@ socket: Para comunicação em rede.
 
 threading: Para permitir que múltiplos jogadores (clientes) se comuniquem com o servidor ao mesmo tempo.
 
-SeegaGame: Classe que representa a lógica do jogo (você implementou isso antes).
+Room: Sala de jogo (room.py) com o SeegaGame e o tratamento dos comandos.
 
 
 HOST e PORT: O servidor vai escutar conexões em localhost:12345.
 
-clients: Lista com os sockets dos clientes conectados.
+clients: Lista dos clientes (Client) conectados.
 
-player_names: Mapeia os jogadores 'A' e 'B' para seus nomes.
+room: A sala com o SeegaGame e os nomes; room.lock serializa apenas as ações
+que alteram o jogo (PLACE, MOVE, RESTART). NAME e CHAT não tocam no jogo e não
+pegam o lock, e nenhum envio pelo socket é feito com o lock adquirido: um
+cliente lento não trava mais os outros jogadores.
 
-lock: Garante que só uma thread acesse partes críticas do código (como ações do jogo) por vez.
+Cada Client tem uma fila de saída (outbound.py) esvaziada por uma thread
+própria; broadcast só enfileira. OUTBOUND_LIMIT e SLOW_POLICY definem o
+tamanho da fila e o que fazer quando ela enche (drop, disconnect ou snapshot).
+
+Com --journal DIR as jogadas da sala são gravadas em um diário (journal.py)
+e, se o servidor cair, a partida é reconstruída ao subir de novo.
+
+Com --analytics DIR cada partida terminada vai para os arquivos colunares
+de DIR (analytics.py).
+
+Com os dois lugares ocupados, as próximas conexões (até MAX_SPECTATORS)
+entram como espectadoras: recebem os mesmos bytes do broadcast, sempre
+enfileirados depois dos jogadores, e não podem jogar. Para muitos
+espectadores use o servidor asyncio (spectators.py).
+
+Métricas (metrics.py): latência por comando, espera e posse dos locks,
+tempo do motor, bytes, filas de saída e conexões; expostas com
+--metrics-port PORTA (GET /metrics, formato do Prometheus) ou gravadas
+periodicamente com --metrics-file ARQUIVO.
+
+Cada lugar (A ou B) tem um token de sessão, enviado como "SESSION token".
+Quem reconecta ocupa o lugar vago e, com "RESUME token seq", recebe só os
+eventos do jogo posteriores ao último "SEQ n" que tinha visto. Cada novo
+ocupante recebe um token novo; o do ocupante anterior nunca é enviado e só
+vale em RESUME, e deixa de valer quando o lugar muda de dono de novo.
 """
 
 """
@@ -59,115 +92,223 @@ Reinicia o jogo, voltando para a fase de colocação.
 HOST = 'localhost'
 PORT = 12345
 
-clients = []
-def broadcast(msg, exclude=None):
-    for c in clients:
-        if c is not exclude:
-            try:
-                c.sendall((msg + "\n").encode())
-            except:
-                pass
-
-game = SeegaGame(broadcast)
-lock = threading.Lock()
-player_names = {}  # Adicione isso no topo, fora da função
-
-def handle_client(conn, addr, pid):
-    global game
-    player_symbol = game.players[pid]
-    
-    conn.sendall(f"Você é o Jogador {player_symbol}\n".encode())
-    conn.sendall(f"PLAYER {player_symbol}\n".encode())
-    conn.sendall(("FULL\n" + game.get_board_string() + "\n\n").encode())
+# comandos que alteram o estado do jogo e precisam do lock da sala
+GAME_COMMANDS = ("PLACE", "MOVE", "RESTART", "SURRENDER")
+
+OUTBOUND_LIMIT = 256     # mensagens pendentes por cliente
+MAX_SPECTATORS = 64      # conexões além dos dois jogadores, só assistindo
+SLOW_POLICY = DROP       # drop | disconnect | snapshot
+
+
+def snapshot_bytes():
+    return "".join(line + "\n" for line in room.catch_up()).encode()
+
+
+class Client:
+    """Socket de um jogador com sua fila de saída."""
 
+    def __init__(self, conn, pid):
+        self.conn = conn
+        self.pid = pid                    # None para espectadores
+        self.token = None
+        self.previous_token = None        # token de quem ocupava o lugar antes
+        self.out = OutboundQueue(conn, OUTBOUND_LIMIT, SLOW_POLICY, snapshot_bytes)
+
+    def send_bytes(self, data):
+        self.out.put(data)
+
+    def send(self, lines):
+        if lines:
+            self.send_bytes("".join(line + "\n" for line in lines).encode())
+
+
+clients = []
+clients_lock = metrics.TimedLock("clients")   # protege apenas a lista de clientes
+sessions = {}                     # pid → token do lugar
+
+
+def broadcast(lines, exclude=None):
+    if not lines:
+        return
+    data = "".join(line + "\n" for line in lines).encode()
+    with clients_lock:
+        targets = [c for c in clients if c is not exclude]
+    # jogadores primeiro; espectadores recebem o mesmo objeto bytes depois
+    targets.sort(key=lambda c: c.pid is None)
+    for c in targets:
+        c.send_bytes(data)
+
+
+room = Room()
+
+
+def process_command(client, msg):
+    """
+    Executa um comando. Os envios só enfileiram (nunca bloqueiam), então
+    os eventos do jogo entram nas filas dentro do lock, na ordem em que
+    foram aplicados.
+    """
+    t0 = metrics.clock()
+    if client.pid is None:
+        client.send(["Você está assistindo."])
+    elif msg.startswith("RESUME "):
+        resume(client, msg)
+    elif msg.startswith(GAME_COMMANDS):
+        with room.lock:
+            replies, broadcasts = room.dispatch(client.pid, msg)
+            client.send(replies)
+            broadcast(broadcasts)
+    else:
+        replies, broadcasts = room.dispatch(client.pid, msg)
+        client.send(replies)
+        broadcast(broadcasts)
+    metrics.command_histogram(msg).observe(metrics.clock() - t0)
+
+
+def resume(client, msg):
+    """RESUME token seq: confere o token do lugar e envia os eventos perdidos."""
+    try:
+        _, token, seq = msg.split()
+        last_seq = int(seq)
+    except ValueError:
+        client.send(["Formato inválido. Use: RESUME token seq"])
+        return
+    if token not in (client.token, client.previous_token):
+        client.send(["Sessão expirada."])
+        return
+    with clients_lock:
+        # quem apresentou o token anterior retoma o lugar com ele
+        client.token = sessions[client.pid] = token
+        client.previous_token = None
+    with room.lock:
+        client.send(room.resume(client.pid, last_seq) + [f"SESSION {token}"])
+    broadcast([room.comeback(client.pid)], exclude=client)
+
+
+def handle_client(client):
+    conn = client.conn
+    with room.lock:
+        if client.pid is None:
+            welcome = room.watch_welcome()
+        else:
+            welcome = room.welcome(client.pid) + [f"SESSION {client.token}"]
+        # enfileirado dentro do lock: nenhum broadcast passa na frente do SEQ
+        client.send(welcome)
+
+    framer = LineFramer()
     try:
         while True:
-            data = conn.recv(1024)
-            if not data:
+            # um recv pode trazer vários comandos ou só parte de um
+            n = conn.recv_into(framer.chunk)
+            if not n:
                 break
-            msg = data.decode().strip()
-
-            with lock:
-                # COMANDO PARA NOME DO JOGADOR
-                if msg.startswith("NAME "):
-                    name = msg[5:].strip()
-                    player_names[player_symbol] = name
-                    broadcast(f"PLAYER {player_symbol} {name}")
-                    continue
-                # COMANDO PARA NOME COLOCAR AS PEÇAS
-                if msg.startswith("PLACE"):
-                    if game.turn != pid:
-                        conn.sendall("Não é seu turno.\n".encode())
-                        continue
-                    try:
-                        _, xs, ys = msg.split()
-                        x, y = int(xs), int(ys)
-                    except:
-                        conn.sendall("Formato inválido. Use: PLACE x y\n".encode())
-                        continue
-
-                    ok, resp = game.place_piece(x, y)
-                    conn.sendall((resp + "\n").encode())
-                    if ok:
-                        broadcast(f"PLACE {x} {y} {player_symbol}")
-                 # COMANDO PARA NOME MOVER AS PEÇAS
-                elif msg.startswith("MOVE"):
-                    if game.turn != pid:
-                        conn.sendall("Não é seu turno.\n".encode())
-                        continue
-                    try:
-                        _, x1s, y1s, x2s, y2s = msg.split()
-                        x1, y1, x2, y2 = map(int, (x1s, y1s, x2s, y2s))
-                    except:
-                        conn.sendall("Formato inválido. Use: MOVE x1 y1 x2 y2\n".encode())
-                        continue
-
-                    ok, resp = game.move_piece(x1, y1, x2, y2)
-                    conn.sendall((resp + "\n").encode())
-                    if ok:
-                        broadcast(f"MOVE {x1} {y1} {x2} {y2} {player_symbol}")
-                    
-                    if game.check_winner():
-                            broadcast(f"CHAT Jogador {player_symbol} venceu!")
-                            game.reset_game()
-                            
-                #interacao com o chat
-                elif msg.startswith("CHAT"):
-                    texto = msg[5:]
-                    nome = player_names.get(player_symbol, f"Jogador {player_symbol}")
-                    broadcast(f"CHAT {nome}: {texto}")
-                #restart jogo
-                elif msg == "RESTART":
-                    game.reset_game()
-                    broadcast("RESTART")
-
-                else:
-                    conn.sendall("Comando desconhecido.\n".encode())
-
+            metrics.BYTES_IN.inc(n)
+            lines = framer.feed(framer.view[:n])
+            for line in lines:
+                msg = line.decode(errors="replace").strip()
+                if msg:
+                    process_command(client, msg)
+
+    except LineTooLong:
+        client.send(["Linha muito longa."])
+    except ConnectionError:
+        pass
     finally:
+        with clients_lock:
+            if client in clients:
+                clients.remove(client)
+        client.out.close()
+        client.out.thread.join(timeout=1)
         conn.close()
-        if conn in clients:
-            clients.remove(conn)
-        nome = player_names.get(player_symbol, f"Jogador {player_symbol}")
-        broadcast(f"CHAT {nome} saiu.")
+        if client.pid is not None:
+            broadcast([room.farewell(client.pid)])
+
+def open_journal(directory):
+    """Recupera a sala 0 do diário (se estava em andamento) e passa a registrá-la."""
+    global room
+    journal = Journal(directory)
+    game = journal.recover().get(0)
+    room = Room(0, journal=journal.open_room(0), game=game)
+    journal.start()
+    return journal
+
+
+def register_metrics():
+    def connections():
+        with clients_lock:
+            return {"player": sum(1 for c in clients if c.pid is not None),
+                    "spectator": sum(1 for c in clients if c.pid is None)}
+
+    def queues():
+        with clients_lock:
+            return metrics.queue_depths([c.out for c in clients])
+
+    metrics.gauge("seega_rooms", "Salas ativas.", lambda: 1)
+    metrics.gauge("seega_connections", "Conexões abertas.", connections, "role")
+    metrics.gauge("seega_outbound_queue", "Mensagens nas filas de saída.", queues, "stat")
+
+
+def main(journal_dir=None, metrics_port=None, metrics_file=None, analytics_dir=None):
+    if journal_dir is not None:
+        open_journal(journal_dir)
+    analytics = None
+    if analytics_dir is not None:
+        analytics = AnalyticsSink(analytics_dir)
+        analytics.start()
+        room.recorder = GameRecorder(analytics, room.room_id)
+    register_metrics()
+    if metrics_port is not None:
+        metrics.serve(HOST, metrics_port)
+    if metrics_file is not None:
+        metrics.dump(metrics_file)
+    try:
+        serve()
+    finally:
+        if analytics is not None:
+            analytics.close()
+
 
-def main():
+def serve():
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind((HOST, PORT))
         s.listen()
         print(f"Servidor rodando em {HOST}:{PORT}")
 
-        pid = 0  # alterna entre 0 e 1
         while True:
             conn, addr = s.accept()
-            if len(clients) >= 2:
+            metrics.CONNECTIONS.inc()
+            with clients_lock:
+                # quem chega ocupa o lugar vago (o de quem caiu, se for o caso)
+                free = {0, 1} - {c.pid for c in clients}
+                watchers = sum(1 for c in clients if c.pid is None)
+                full = not free and watchers >= MAX_SPECTATORS
+                if free:
+                    client = Client(conn, min(free))
+                    client.previous_token = sessions.get(client.pid)
+                    client.token = sessions[client.pid] = secrets.token_urlsafe(12)
+                    clients.append(client)
+                elif not full:
+                    client = Client(conn, None)
+                    clients.append(client)
+            if full:
                 conn.sendall("Servidor cheio. Tente novamente mais tarde.\n".encode())
                 conn.close()
                 continue
 
-            clients.append(conn)
-            threading.Thread(target=handle_client, args=(conn, addr, pid), daemon=True).start()
-            pid = 1 - pid
+            threading.Thread(target=handle_client, args=(client,), daemon=True).start()
 
 if __name__ == "__main__":
-    main()
+    import sys
+    if "--async" in sys.argv[1:]:
+        # modo asyncio: várias salas em um único event loop
+        import async_server
+        async_server.main([a for a in sys.argv[1:] if a != "--async"])
+    else:
+        args = sys.argv[1:]
+
+        def option(name):
+            return args[args.index(name) + 1] if name in args else None
+
+        port = option("--metrics-port")
+        main(option("--journal"), int(port) if port else None, option("--metrics-file"),
+             option("--analytics"))
@@ -0,0 +1,275 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai import choose_move, state_from_game
+from analytics import AnalyticsSink, FORMATS, GameRecorder
+from bitboard import BitboardSeegaGame
+from game import SeegaGame
+
+
+"""
+Simulador de partidas sem interface (self-play em lote).
+
+Joga N partidas entre duas políticas diretamente sobre o motor (SeegaGame,
+ou BitboardSeegaGame com --bitboard), sem sockets nem Tk:
+    random:  jogada legal aleatória;
+    greedy:  na movimentação, a jogada que mais captura (empates ao acaso);
+    search:  a busca alpha-beta de ai.py, com profundidade e tempo limitados.
+
+As partidas são divididas em lotes de --shard jogos e distribuídas em um
+pool de processos. Cada partida usa a semente --seed + índice, então um
+mesmo comando reproduz os mesmos jogos com qualquer número de processos
+(exceto com search, que depende do relógio e da tabela de transposição).
+Os resultados são gravados à medida que os lotes terminam, em JSON lines
+ou CSV (um registro por partida, ver FIELDS); no fim, o resumo com
+partidas/hora e a utilização de cada processo vai para stderr.
+
+Com --analytics DIR as partidas também são gravadas lance a lance nos
+arquivos colunares de analytics.py (os mesmos do servidor).
+
+Uso:
+    python simulate.py --games 10000 --a greedy --b random --out results.jsonl
+"""
+
+MAX_PLIES = 300                 # limite de lances da movimentação (empate)
+SHARD = 200
+SEARCH_DEPTH = 2
+SEARCH_TIME = 0.05
+
+FIELDS = ("game", "seed", "policy_a", "policy_b", "winner", "reason", "plies",
+          "moves", "captures_a", "captures_b", "pieces_a", "pieces_b",
+          "first_place", "edge_a", "edge_b")
+
+EDGE = frozenset((x, y) for y in range(5) for x in range(5) if x in (0, 4) or y in (0, 4))
+
+
+def random_policy(game, moves, rng, options):
+    return rng.choice(moves)
+
+
+def greedy_policy(game, moves, rng, options):
+    if game.placement_phase:
+        return rng.choice(moves)
+    best, best_moves = -1, []
+    for move in moves:
+        captured = len(game.make_move(move))
+        game.unmake_move()
+        if captured > best:
+            best, best_moves = captured, [move]
+        elif captured == best:
+            best_moves.append(move)
+    return rng.choice(best_moves)
+
+
+def search_policy(game, moves, rng, options):
+    move, _, _ = choose_move(state_from_game(game), options["search_time"],
+                             options["search_depth"])
+    return move if move is not None else rng.choice(moves)
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "search": search_policy,
+}
+
+
+def pieces(game):
+    board = game.board
+    return (sum(row.count('A') for row in board), sum(row.count('B') for row in board))
+
+
+def play_game(engine, policies, seed, options):
+    """Joga uma partida e devolve o registro com os campos de FIELDS (menos game/policy)."""
+    rng = random.Random(seed)
+    game = engine()
+    recorder = GameRecorder() if options.get("record") else None
+    first_place = None
+    edge = (None, None)               # só existe se a colocação terminar
+    plies = moves_played = 0
+    reason = "limit"
+    while True:
+        moves = game.legal_moves()
+        if not moves:
+            # sem peças de um dos lados, ou ninguém consegue mover
+            reason = "pieces" if game.check_winner() else "blocked"
+            break
+        if moves_played >= options["max_plies"]:
+            break
+        move = policies[game.turn](game, moves, rng, options)
+        if first_place is None:
+            first_place = "%d,%d" % move
+        was_placement = game.placement_phase
+        turn = game.turn
+        captured = game.make_move(move)
+        plies += 1
+        if recorder is not None:
+            if was_placement:
+                recorder.place(move[0], move[1], turn)
+            else:
+                recorder.move(*move, turn, captured)
+        if was_placement:
+            if not game.placement_phase:
+                board = game.board
+                edge = [sum(1 for x, y in EDGE if board[y][x] == p) for p in game.players]
+        else:
+            moves_played += 1
+
+    count_a, count_b = pieces(game)
+    # "limit" é empate (MAX_PLIES); "blocked" (ninguém consegue mover)
+    # encerra o jogo e vence quem tem mais peças, como na regra tradicional
+    winner = None
+    if reason != "limit" and count_a != count_b:
+        winner = 'A' if count_a > count_b else 'B'
+    record = {
+        "seed": seed, "winner": winner, "reason": reason, "plies": plies,
+        "moves": moves_played,
+        "captures_a": game.captured_pieces[0], "captures_b": game.captured_pieces[1],
+        "pieces_a": count_a, "pieces_b": count_b,
+        "first_place": first_place, "edge_a": edge[0], "edge_b": edge[1],
+    }
+    if recorder is not None:
+        record["analytics"] = recorder.take(None if winner is None else "AB".index(winner),
+                                            reason)
+    return record
+
+
+def run_shard(first, count, names, engine, seed, options):
+    """
+    Joga as partidas [first, first + count) em um processo do pool.
+    Retorna (registros, pid, tempo de CPU gasto, tempo de parede).
+    """
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    results = []
+    for index in range(first, first + count):
+        # com --swap, as cores se alternam: partidas ímpares trocam os lados
+        a, b = names[::-1] if options["swap"] and index % 2 else names
+        record = play_game(engine, (POLICIES[a], POLICIES[b]), seed + index, options)
+        record["game"] = index
+        record["policy_a"], record["policy_b"] = a, b
+        results.append(record)
+    return (results, os.getpid(), time.process_time() - cpu0,
+            time.perf_counter() - wall0)
+
+
+class JsonLinesSink:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, records):
+        self.stream.write("".join(json.dumps(r, separators=(",", ":")) + "\n"
+                                  for r in records))
+
+
+class CsvSink:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, FIELDS)
+        self.writer.writeheader()
+
+    def write(self, records):
+        self.writer.writerows(records)
+
+
+SINKS = {"jsonl": JsonLinesSink, "csv": CsvSink}
+
+
+def simulate(games, names, engine=SeegaGame, workers=None, shard=SHARD, seed=0,
+             sink=None, options=None, analytics=None):
+    """
+    Distribui as partidas pelo pool e passa cada lote concluído ao sink (e
+    ao AnalyticsSink analytics, se houver).
+    Retorna (estatísticas por pid, placar, tempo total).
+    """
+    options = options or {}
+    options = {"max_plies": MAX_PLIES, "swap": False, "search_depth": SEARCH_DEPTH,
+               "search_time": SEARCH_TIME, "record": analytics is not None, **options}
+    workers = workers or os.cpu_count()
+    per_worker = {}
+    score = {}
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_shard, first, min(shard, games - first), names,
+                                   engine, seed, options)
+                   for first in range(0, games, shard)]
+        for future in as_completed(futures):
+            records, pid, cpu, wall = future.result()
+            stats = per_worker.setdefault(pid, [0, 0.0, 0.0])
+            stats[0] += len(records)
+            stats[1] += cpu
+            stats[2] += wall
+            for r in records:
+                key = r["policy_a"] if r["winner"] == 'A' else \
+                      r["policy_b"] if r["winner"] == 'B' else None
+                score[key] = score.get(key, 0) + 1
+            if analytics is not None:
+                analytics.write([r.pop("analytics") for r in records])
+            if sink is not None:
+                sink.write(records)
+    return per_worker, score, time.perf_counter() - t0
+
+
+def report(games, per_worker, score, elapsed, out=sys.stderr):
+    print(f"{games} partidas em {elapsed:.2f}s: {games / elapsed:,.0f} partidas/s, "
+          f"{games / elapsed * 3600:,.0f} partidas/hora", file=out)
+    for name, wins in sorted(score.items(), key=lambda kv: str(kv[0])):
+        label = "empates" if name is None else f"vitórias {name}"
+        print(f"  {label:18s} {wins:8d}  ({wins / games:.1%})", file=out)
+    for pid, (count, cpu, wall) in sorted(per_worker.items()):
+        print(f"  processo {pid:7d}: {count:7d} partidas  CPU {cpu:7.2f}s  "
+              f"ocupado {wall / elapsed:6.1%}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partidas de Seega sem interface, em lote")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--a", default="random", choices=POLICIES, help="política do Jogador A")
+    parser.add_argument("--b", default="random", choices=POLICIES, help="política do Jogador B")
+    parser.add_argument("--swap", action="store_true", help="alterna as cores a cada partida")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos)")
+    parser.add_argument("--shard", type=int, default=SHARD, help="partidas por lote")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES,
+                        help="lances de movimentação antes de declarar empate")
+    parser.add_argument("--search-depth", type=int, default=SEARCH_DEPTH)
+    parser.add_argument("--search-time", type=float, default=SEARCH_TIME,
+                        help="tempo por jogada da política search (s)")
+    parser.add_argument("--bitboard", action="store_true", help="usa o motor BitboardSeegaGame")
+    parser.add_argument("--out", default="-", help="arquivo de saída ('-' para stdout)")
+    parser.add_argument("--format", choices=SINKS, default=None,
+                        help="jsonl ou csv (padrão: pela extensão de --out)")
+    parser.add_argument("--analytics", metavar="DIR", default=None,
+                        help="grava também as partidas lance a lance em DIR (analytics.py)")
+    parser.add_argument("--analytics-format", choices=FORMATS, default=None)
+    args = parser.parse_args(argv)
+    if args.max_plies < 1:
+        parser.error("--max-plies precisa ser pelo menos 1")
+
+    fmt = args.format or ("csv" if args.out.endswith(".csv") else "jsonl")
+    stream = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    options = {"max_plies": args.max_plies, "swap": args.swap,
+               "search_depth": args.search_depth, "search_time": args.search_time}
+    engine = BitboardSeegaGame if args.bitboard else SeegaGame
+    analytics = (AnalyticsSink(args.analytics, args.analytics_format)
+                 if args.analytics else None)
+    if analytics is not None:
+        analytics.start()
+    try:
+        per_worker, score, elapsed = simulate(
+            args.games, (args.a, args.b), engine, args.workers, args.shard, args.seed,
+            SINKS[fmt](stream), options, analytics)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        if analytics is not None:
+            analytics.close()
+    report(args.games, per_worker, score, elapsed)
+
+
+if __name__ == "__main__":
+    main()
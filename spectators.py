@@ -0,0 +1,143 @@
+import asyncio
+
+import metrics
+
+
+"""
+Espectadores de uma sala no servidor asyncio.
+
+Uma sala popular pode ter milhares de espectadores. Audience recebe os
+lotes de linhas transmitidos na sala (publish) e os distribui em fatias:
+cada lote é codificado uma única vez por protocolo (texto ou binário) e o
+mesmo objeto bytes é escrito para todos, sem cópia por destinatário. A
+escrita vai direto ao transporte do espectador (sem passar pela task da sua
+fila de saída), a não ser que a fila ainda tenha algo pendente, para não
+furar a ordem.
+
+A distribuição não passa na frente dos jogadores: publish() só acumula as
+linhas e agenda a primeira fatia com loop.call_soon() depois que o servidor
+enfileirou as respostas e eventos dos jogadores, então os escritores deles
+rodam antes na mesma volta do event loop. Cada fatia escreve para no máximo
+CHUNK espectadores e agenda a seguinte, de modo que entre duas fatias o loop
+volta ao select() e atende os comandos que chegaram. Lotes que chegam durante
+uma distribuição são juntados e enviados na passada seguinte.
+
+O custo continua existindo: com milhares de espectadores a passada ocupa
+o processo por dezenas de milissegundos a cada evento, e a resposta de um
+jogador que chega no meio dela espera as fatias das voltas que precisa
+percorrer (ver benchmarks/bench_spectators.py). A garantia é de atraso
+limitado por CHUNK escritas por volta, não de atraso zero.
+
+Espectador lento (mais de BUFFER_LIMIT bytes esperando no transporte) não
+recebe o lote; quando volta a dar conta, recebe o tabuleiro completo da
+passada em andamento no lugar dos eventos perdidos.
+"""
+
+CHUNK = 8                        # espectadores escritos por volta do event loop
+BUFFER_LIMIT = 64 * 1024
+
+
+class Audience:
+    def __init__(self, room):
+        self.room = room
+        self.watchers = {}                # Connection → None (ordem de chegada)
+        self.joining = []                 # aguardando o fim da passada em andamento
+        self.pending = []                 # linhas ainda não distribuídas
+        self.stale = set()                # espectadores que perderam lotes
+        self.handle = None                # próxima fatia agendada (None: parado)
+        self.targets = []                 # espectadores da passada em andamento
+        self.position = 0
+        self.lines = []
+        self.snapshot = []
+        self.encoded = {}                 # (binary, é snapshot) → bytes
+
+    def __len__(self):
+        return len(self.watchers) + len(self.joining)
+
+    def add(self, conn):
+        conn.watching = self
+        if self.handle is None:
+            conn.send_many(self.room.watch_welcome())
+            self.watchers[conn] = None
+        else:
+            # o tabuleiro atual já inclui eventos ainda não distribuídos
+            self.joining.append(conn)
+
+    def remove(self, conn):
+        conn.watching = None
+        self.watchers.pop(conn, None)
+        self.stale.discard(conn)
+        if conn in self.joining:
+            self.joining.remove(conn)
+
+    def publish(self, lines):
+        if not self.watchers and not self.joining:
+            return
+        self.pending.extend(lines)
+        if self.handle is None:
+            self.handle = asyncio.get_running_loop().call_soon(self.step)
+
+    def step(self):
+        """Uma fatia: no máximo CHUNK espectadores, depois devolve o loop."""
+        if self.position >= len(self.targets):
+            if not self.pending and not self.joining:
+                self.handle = None
+                return
+            self.begin()
+        self.write_chunk()
+        self.handle = asyncio.get_running_loop().call_soon(self.step)
+
+    def begin(self):
+        """Começa uma passada com todas as linhas acumuladas até aqui."""
+        lines, self.pending = self.pending, []
+        # neste ponto a sala está exatamente no estado após lines
+        self.snapshot = self.room.catch_up()
+        self.lines = lines
+        self.encoded = {}
+        self.targets = list(self.watchers) if lines else []
+        self.position = 0
+        joining, self.joining = self.joining, []
+        for conn in joining:
+            conn.send_many(self.room.watch_welcome())
+            self.watchers[conn] = None
+
+    def write_chunk(self):
+        encoded = self.encoded
+        stale = self.stale
+        end = min(self.position + CHUNK, len(self.targets))
+        for conn in self.targets[self.position:end]:
+            transport = conn.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > BUFFER_LIMIT:
+                stale.add(conn)
+                continue
+            late = conn in stale
+            key = (conn.binary, late)
+            data = encoded.get(key)
+            if data is None:
+                data = encoded[key] = conn.encode(self.snapshot if late else self.lines)
+            if late:
+                stale.discard(conn)
+            if conn.out.items:
+                conn.out.put(data)
+            else:
+                transport.write(data)
+                metrics.BYTES_OUT.inc(len(data))
+        self.position = end
+
+    def close(self):
+        """A sala acabou: desliga todos os espectadores e os devolve."""
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        watchers = list(self.watchers) + self.joining
+        for conn in watchers:
+            conn.watching = None
+        self.watchers.clear()
+        self.stale.clear()
+        self.joining = []
+        self.pending = []
+        self.targets = []
+        self.position = 0
+        return watchers
@@ -0,0 +1,472 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from math import comb
+
+from bitboard import CAPTURES, CELL_XY, CELLS, FULL_MASK, NEIGHBORS, SIZE, _bits, mobile
+
+
+"""
+Tablebase de finais do Seega (fase de movimentação).
+
+Com poucas peças de cada lado o jogo pode ser resolvido por completo. Para
+cada classe de material (m peças do lado da vez, o peças do adversário)
+generate() calcula, por análise retrógrada, o valor exato de todas as
+posições:
+
+    v > 0   o lado da vez vence em v lances (o último é a captura final);
+    v < 0   o lado da vez perde em -v lances;
+    v = 0   empate (nenhum lado força a vitória, ou os dois bloqueados).
+
+As regras são as de SeegaGame: movimento ortogonal de uma casa, capturas
+por custódia, e o jogador bloqueado passa a vez. Movimentos sem captura
+alternam entre as classes (m, o) e (o, m), que são resolvidas juntas; as
+capturas levam a classes menores, já resolvidas antes.
+
+Índice com redução de simetria: das 8 simetrias do tabuleiro, escolhe-se a
+que leva as peças do lado da vez ao menor conjunto (representante da
+órbita); a posição é então
+
+    índice do representante * C(25 - m, o) + posto colex das peças do
+    adversário entre as casas livres
+
+o que reduz cada classe a cerca de 1/8. Consultar um valor é O(peças):
+um posto colex, uma tabela de representantes e duas transformações de bits
+por tabelas de 7 bits.
+
+Formato em disco (little-endian), lido com mmap:
+
+    MAGIC, itemsize (1 ou 2 bytes por valor), número de classes
+    por classe: m, o, deslocamento e tamanho dos valores
+    valores com sinal de cada classe
+
+Uso:
+    python tablebase.py --max-pieces 3 --out seega.tb
+"""
+
+MAGIC = b"SEEGATB1"
+HEADER = struct.Struct("<8sBB")
+CLASS_ENTRY = struct.Struct("<BBQQ")
+MAX_PIECES = 3
+
+CHUNK = 7
+
+
+def _transform_cell(t, cell):
+    """Simetria t (bits: troca x/y, espelha x, espelha y) aplicada a uma casa."""
+    x, y = CELL_XY[cell]
+    if t & 4:
+        x, y = y, x
+    if t & 1:
+        x = SIZE - 1 - x
+    if t & 2:
+        y = SIZE - 1 - y
+    return y * SIZE + x
+
+
+def _chunk_tables(t):
+    tables = []
+    for shift in range(0, CELLS, CHUNK):
+        table = []
+        for value in range(1 << CHUNK):
+            mask = 0
+            for k in range(CHUNK):
+                if value >> k & 1 and shift + k < CELLS:
+                    mask |= 1 << _transform_cell(t, shift + k)
+            table.append(mask)
+        tables.append(table)
+    return tables
+
+
+SYMMETRIES = [_chunk_tables(t) for t in range(8)]
+BINOM = [[comb(n, k) for k in range(CELLS + 1)] for n in range(CELLS + 1)]
+
+
+def transform(mask, t):
+    c0, c1, c2, c3 = SYMMETRIES[t]
+    return c0[mask & 127] | c1[mask >> 7 & 127] | c2[mask >> 14 & 127] | c3[mask >> 21]
+
+
+def rank(mask):
+    """Posto colex do conjunto de casas mask entre os conjuntos do mesmo tamanho."""
+    r = 0
+    k = 1
+    for i in _bits(mask):
+        r += BINOM[i][k]
+        k += 1
+    return r
+
+
+def unrank(r, k):
+    mask = 0
+    for kk in range(k, 0, -1):
+        p = kk - 1
+        while BINOM[p + 1][kk] <= r:
+            p += 1
+        r -= BINOM[p][kk]
+        mask |= 1 << p
+    return mask
+
+
+def compress(theirs, mine):
+    """Renumera as casas de theirs contando só as casas livres de mine."""
+    out = 0
+    for i in _bits(theirs):
+        out |= 1 << (i - (mine & ((1 << i) - 1)).bit_count())
+    return out
+
+
+def expand(packed, mine):
+    free = [i for i in range(CELLS) if not mine >> i & 1]
+    out = 0
+    for j in _bits(packed):
+        out |= 1 << free[j]
+    return out
+
+
+class Orbits:
+    """Representantes, sob as 8 simetrias, dos conjuntos de m casas."""
+
+    def __init__(self, m):
+        self.m = m
+        self.reps = []
+        self.canon = []                   # posto colex → (representante, simetria)
+        ids = {}
+        for r in range(BINOM[CELLS][m]):
+            mask = unrank(r, m)
+            images = [transform(mask, t) for t in range(8)]
+            rep = min(images)
+            if rep not in ids:
+                ids[rep] = len(self.reps)
+                self.reps.append(rep)
+            self.canon.append((ids[rep], images.index(rep)))
+
+
+class MaterialIndex:
+    """Índice das posições da classe (m, o): m peças do lado da vez, o do adversário."""
+
+    def __init__(self, m, o, orbits):
+        self.m = m
+        self.o = o
+        self.orbits = orbits
+        self.per_rep = BINOM[CELLS - m][o]
+        self.size = len(orbits.reps) * self.per_rep
+
+    def index(self, mine, theirs):
+        c, t = self.orbits.canon[rank(mine)]
+        if t:
+            mine = transform(mine, t)
+            theirs = transform(theirs, t)
+        return c * self.per_rep + rank(compress(theirs, mine))
+
+    def position(self, index):
+        c, r = divmod(index, self.per_rep)
+        mine = self.orbits.reps[c]
+        return mine, expand(unrank(r, self.o), mine)
+
+
+def children(mine, theirs):
+    """
+    Lances do lado da vez: (origem, destino, filho), com filho None quando
+    o lance captura a última peça do adversário e, senão, (lado da vez,
+    adversário, mesmo_lado) já com a regra do bloqueado que passa a vez;
+    filho (0, 0, False) indica os dois lados bloqueados (empate).
+    """
+    empty = FULL_MASK & ~(mine | theirs)
+    for src in _bits(mobile(mine, empty)):
+        for dst in _bits(NEIGHBORS[src] & empty):
+            m2 = mine ^ (1 << src) ^ (1 << dst)
+            t2 = theirs
+            for adj, far in CAPTURES[dst]:
+                if t2 & adj and m2 & far:
+                    t2 ^= adj
+            if not t2:
+                yield src, dst, None
+                continue
+            empty2 = FULL_MASK & ~(m2 | t2)
+            if mobile(t2, empty2):
+                yield src, dst, (t2, m2, False)
+            elif mobile(m2, empty2):
+                yield src, dst, (m2, t2, True)
+            else:
+                yield src, dst, (0, 0, False)
+
+
+def outcome(value, same_side):
+    """Valor de um lance para quem o faz, dado o valor v do filho (0 = empate)."""
+    if value == 0:
+        return 0
+    if same_side:
+        return value + 1 if value > 0 else value - 1
+    return -value + 1 if value < 0 else -value - 1
+
+
+def _better(a, b):
+    """True se o valor a é preferível a b: vitória mais rápida, empate, derrota mais lenta."""
+    if (a > 0) != (b > 0):
+        return a > 0
+    if a > 0:
+        return a < b
+    if (a == 0) != (b == 0):
+        return a == 0
+    return a < b
+
+
+class Tablebase:
+    """Tablebase em disco (mmap); consulta em O(peças)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, itemsize, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: não é uma tablebase do Seega")
+        typecode = "b" if itemsize == 1 else "h"
+        self.values = {}
+        self.indexes = {}
+        orbits = {}
+        pos = HEADER.size
+        self.view = view = memoryview(self.mm)
+        for _ in range(count):
+            m, o, offset, size = CLASS_ENTRY.unpack_from(self.mm, pos)
+            pos += CLASS_ENTRY.size
+            if m not in orbits:
+                orbits[m] = Orbits(m)
+            self.indexes[m, o] = MaterialIndex(m, o, orbits[m])
+            self.values[m, o] = view[offset:offset + size * itemsize].cast(typecode)
+        self.max_pieces = max(max(k) for k in self.values) if self.values else 0
+
+    def covers(self, mine, theirs):
+        return (mine.bit_count(), theirs.bit_count()) in self.values
+
+    def value(self, mine, theirs):
+        """Valor para o lado da vez (peças mine); None fora da tablebase ou com o jogo acabado."""
+        key = (mine.bit_count(), theirs.bit_count())
+        values = self.values.get(key)
+        if values is None or not key[0] or not key[1]:
+            return None
+        empty = FULL_MASK & ~(mine | theirs)
+        if not mobile(mine, empty):
+            # posição que o jogo nunca deixa na vez de quem está bloqueado
+            if not mobile(theirs, empty):
+                return 0
+            theirs_value = self.value(theirs, mine)
+            return None if theirs_value is None else -theirs_value
+        return values[self.indexes[key].index(mine, theirs)]
+
+    def best(self, mine, theirs):
+        """Melhor lance ((origem, destino), valor) do lado da vez; None fora da tablebase."""
+        if self.value(mine, theirs) is None:
+            return None
+        best = None
+        for src, dst, child in children(mine, theirs):
+            if child is None:
+                return (src, dst), 1
+            m2, t2, same = child
+            if not m2:
+                v = 0
+            else:
+                v = self.value(m2, t2)
+                if v is None:
+                    return None
+                v = outcome(v, same)
+            if best is None or _better(v, best[1]):
+                best = (src, dst), v
+        return best
+
+    def probe(self, game):
+        """Valor da posição de um SeegaGame/BitboardSeegaGame para o jogador da vez."""
+        if game.placement_phase:
+            return None
+        mine, theirs = _masks(game)
+        return self.value(mine, theirs)
+
+    def best_move(self, game):
+        """((x1, y1, x2, y2), valor) para o jogador da vez, ou None."""
+        if game.placement_phase:
+            return None
+        hit = self.best(*_masks(game))
+        if hit is None:
+            return None
+        (src, dst), value = hit
+        return CELL_XY[src] + CELL_XY[dst], value
+
+    def close(self):
+        for values in self.values.values():
+            values.release()
+        self.values.clear()
+        self.view.release()
+        self.mm.close()
+        self.file.close()
+
+
+def _masks(game):
+    """(peças do jogador da vez, peças do adversário) de um jogo."""
+    if hasattr(game, "bits"):
+        a, b = game.bits
+    else:
+        a = b = 0
+        for y, row in enumerate(game.board):
+            for x, cell in enumerate(row):
+                if cell == 'A':
+                    a |= 1 << (y * SIZE + x)
+                elif cell == 'B':
+                    b |= 1 << (y * SIZE + x)
+    return (b, a) if game.turn else (a, b)
+
+
+# ---------------------------------------------------------------- geração
+
+
+def solve_pair(m, o, solved, orbits):
+    """
+    Resolve juntas as classes (m, o) e (o, m). solved: {(m, o): array} das
+    classes menores. Retorna {(m, o): array, (o, m): array}.
+
+    Análise retrógrada por distância: cada posição conta os lances ainda
+    não resolvidos; os resultados saem em ordem crescente de distância
+    (baldes), então a primeira vitória encontrada é a mais rápida e a
+    última derrota resolvida, a mais lenta.
+    """
+    keys = [(m, o)] if m == o else [(m, o), (o, m)]
+    indexes = {k: MaterialIndex(k[0], k[1], orbits[k[0]]) for k in keys}
+    lower = {k: MaterialIndex(k[0], k[1], orbits[k[0]]) for k in solved}
+    offsets = {}
+    total = 0
+    for k in keys:
+        offsets[k] = total
+        total += indexes[k].size
+
+    pending = array("i", bytes(4 * total))     # lances ainda sem resultado
+    value = array("h", bytes(2 * total))
+    done = bytearray(total)
+    edges_child = array("i")
+    edges_parent = array("i")                  # pai * 2 + mesmo_lado
+    buckets = [[]]                             # distância → eventos pai * 2 + vitória
+
+    def event(parent, win, dist):
+        while len(buckets) <= dist:
+            buckets.append([])
+        buckets[dist].append(parent * 2 + win)
+
+    for k in keys:
+        index = indexes[k]
+        base = offsets[k]
+        for i in range(index.size):
+            node = base + i
+            mine, theirs = index.position(i)
+            moves = 0
+            for _, _, child in children(mine, theirs):
+                moves += 1
+                if child is None:
+                    event(node, 1, 1)
+                    continue
+                m2, t2, same = child
+                if not m2:
+                    continue                   # empate: nunca resolve o pai
+                ck = (m2.bit_count(), t2.bit_count())
+                if ck in indexes:
+                    edges_child.append(offsets[ck] + indexes[ck].index(m2, t2))
+                    edges_parent.append(node * 2 + same)
+                    continue
+                v = solved[ck][lower[ck].index(m2, t2)]
+                if v:
+                    v = outcome(v, same)
+                    event(node, v > 0, abs(v))
+            if moves == 0:
+                done[node] = 1                 # lado da vez bloqueado: nunca alcançada
+            pending[node] = moves
+
+    # predecessores em CSR (contagem e soma de prefixos)
+    start = array("i", bytes(4 * (total + 1)))
+    for c in edges_child:
+        start[c + 1] += 1
+    for i in range(total):
+        start[i + 1] += start[i]
+    fill = array("i", start)
+    preds = array("i", bytes(4 * len(edges_child)))
+    for c, p in zip(edges_child, edges_parent):
+        preds[fill[c]] = p
+        fill[c] += 1
+    del edges_child, edges_parent, fill
+
+    dist = 1
+    while dist < len(buckets):
+        for ev in buckets[dist]:
+            node, win = ev >> 1, ev & 1
+            if done[node]:
+                continue
+            if win:
+                v = dist
+            else:
+                pending[node] -= 1
+                if pending[node]:
+                    continue
+                v = -dist
+            done[node] = 1
+            value[node] = v
+            for j in range(start[node], start[node + 1]):
+                p = preds[j]
+                parent = p >> 1
+                if not done[parent]:
+                    # o valor do filho para o pai: mesmo sinal se o pai joga de novo
+                    event(parent, (v > 0) == bool(p & 1), dist + 1)
+        buckets[dist] = None
+        dist += 1
+
+    return {k: value[offsets[k]:offsets[k] + indexes[k].size] for k in keys}
+
+
+def generate(max_pieces=MAX_PIECES, log=None):
+    """Resolve todas as classes com até max_pieces peças de cada lado; {(m, o): array}."""
+    orbits = {m: Orbits(m) for m in range(1, max_pieces + 1)}
+    solved = {}
+    pairs = sorted(((m, o) for m in range(1, max_pieces + 1) for o in range(1, m + 1)),
+                   key=lambda k: (k[0] + k[1], k))
+    for m, o in pairs:
+        t0 = time.perf_counter()
+        result = solve_pair(m, o, solved, orbits)
+        solved.update(result)
+        if log is not None:
+            sizes = " ".join(f"{k[0]}x{k[1]}={len(v)}" for k, v in result.items())
+            log(f"{m}x{o}: {sizes} posições em {time.perf_counter() - t0:.2f}s")
+    return solved
+
+
+def write(path, tables):
+    keys = sorted(tables)
+    widest = max((max(map(abs, tables[k]), default=0) for k in keys), default=0)
+    itemsize = 1 if widest <= 127 else 2
+    typecode = "b" if itemsize == 1 else "h"
+    offset = HEADER.size + CLASS_ENTRY.size * len(keys)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, itemsize, len(keys)))
+        for k in keys:
+            f.write(CLASS_ENTRY.pack(k[0], k[1], offset, len(tables[k])))
+            offset += len(tables[k]) * itemsize
+        for k in keys:
+            data = array(typecode, tables[k])
+            if sys.byteorder != "little":
+                data.byteswap()
+            f.write(data.tobytes())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera a tablebase de finais do Seega")
+    parser.add_argument("--max-pieces", type=int, default=MAX_PIECES,
+                        help="peças de cada lado (3 leva cerca de um minuto; 4, bem mais)")
+    parser.add_argument("--out", default="seega.tb")
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    tables = generate(args.max_pieces, log=lambda msg: print(msg, file=sys.stderr))
+    write(args.out, tables)
+    print(f"{args.out}: {sum(map(len, tables.values()))} posições em "
+          f"{time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import unittest
+
+from analytics import GameRecorder, REASONS
+
+
+"""
+GameRecorder.finish: desistências na colocação entram nos arquivos, uma
+vitória por peças sem nenhum movimento é descartada.
+
+    python -m pytest tests
+"""
+
+
+class Sink:
+    def __init__(self):
+        self.records = []
+
+    def add(self, record):
+        self.records.append(record)
+
+
+class FinishTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = Sink()
+        self.recorder = GameRecorder(self.sink, room_id=1)
+        self.recorder.place(0, 0, 0)
+        self.recorder.place(4, 4, 1)
+
+    def test_surrender_in_placement_is_recorded(self):
+        self.recorder.finish(1, "surrender")
+        self.assertEqual(len(self.sink.records), 1)
+        record = self.sink.records[0]
+        self.assertEqual(record[3:6], (1, REASONS.index("surrender"), 0))
+
+    def test_pieces_without_moves_is_dropped(self):
+        self.recorder.finish(0, "pieces")
+        self.assertEqual(self.sink.records, [])
+        self.assertEqual(len(self.recorder.placements), 0)
+
+    def test_game_with_moves_is_recorded(self):
+        self.recorder.move(0, 0, 0, 1, 0, [])
+        self.recorder.finish(0, "pieces")
+        self.assertEqual(len(self.sink.records), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import random
+import unittest
+
+try:
+    import numpy as np
+    from batch import ORTHOGONAL, SeegaBatch
+except ImportError:                       # batch.py precisa do NumPy
+    np = None
+from game import SeegaGame
+
+
+"""
+Motor em lote (batch.py) contra SeegaGame, em posições sorteadas de
+partidas aleatórias (colocação e movimentação, inclusive partidas já
+decididas e jogadores bloqueados):
+    - peças, check_winner(), is_blocked() e o conjunto de legal_moves();
+    - uma jogada legal sorteada e uma coordenada qualquer (muitas
+      inválidas) aplicadas nos dois: aceitação, capturas e o estado depois;
+    - PLIES jogadas seguidas de play_random(), repetidas em cada SeegaGame.
+
+    python -m pytest tests
+"""
+
+POSITIONS = 300
+PLIES = 30
+SEED = 0
+
+
+def random_positions(count, rng):
+    games = []
+    for _ in range(count):
+        game = SeegaGame()
+        for _ in range(rng.randrange(0, 120)):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.play(rng.choice(moves))
+        games.append(game)
+    return games
+
+
+def copies(games):
+    result = [SeegaGame() for _ in games]
+    for copy, game in zip(result, games):
+        copy.restore(game.snapshot())
+    return result
+
+
+def state(game):
+    return (game.get_board_string(), game.turn, game.placement_phase,
+            tuple(game.placement_count), tuple(game.captured_pieces))
+
+
+def batch_state(batch, boards, i):
+    return (boards[i], int(batch.turn[i]), bool(batch.placement_phase[i]),
+            tuple(int(c) for c in batch.placement_count[i]),
+            tuple(int(c) for c in batch.captured_pieces[i]))
+
+
+def legal_set(batch, i, moves, places):
+    if batch.placement_phase[i]:
+        return {(int(x), int(y)) for y, x in zip(*np.nonzero(places[i]))}
+    result = set()
+    for d, y, x in zip(*np.nonzero(moves[i])):
+        dx, dy = ORTHOGONAL[d]
+        result.add((int(x), int(y), int(x + dx), int(y + dy)))
+    return result
+
+
+@unittest.skipIf(np is None, "batch.py precisa do NumPy")
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(SEED)
+        self.games = random_positions(POSITIONS, self.rng)
+
+    def test_queries(self):
+        games = self.games
+        batch = SeegaBatch.from_games(games)
+        counts = batch.counts()
+        winners = batch.winners(counts)
+        blocked = batch.blocked()
+        moves = batch.legal_move_masks()
+        places = batch.place_masks()
+        legal = batch.legal_counts()
+        wrong = []
+        for i, game in enumerate(games):
+            board = game.get_board_string()
+            expected_winner = {None: -1, "Jogador A venceu!": 0,
+                               "Jogador B venceu!": 1}[game.check_winner()]
+            if not (tuple(counts[i]) == (board.count('A'), board.count('B'))
+                    and winners[i] == expected_winner
+                    and blocked[i] == game.is_blocked()
+                    and legal[i] == len(game.legal_moves())
+                    and legal_set(batch, i, moves, places) == set(game.legal_moves())):
+                wrong.append(i)
+        self.assertEqual(wrong, [])
+
+    def check_moves(self, invalid):
+        """Uma jogada (legal ou qualquer) em cada posição, nos dois motores."""
+        games = copies(self.games)
+        rng = self.rng
+        batch = SeegaBatch.from_games(games)
+        coords = []
+        for game in games:
+            moves = game.legal_moves()
+            if invalid or not moves:
+                move = tuple(rng.randrange(-1, 6) for _ in range(4))
+                move = move[:2] if game.placement_phase else move
+            else:
+                move = rng.choice(moves)
+            coords.append(move + move[:2] if len(move) == 2 else move)
+        x1, y1, x2, y2 = (np.array(c) for c in zip(*coords))
+        placing = batch.placement_phase.copy()
+        placed = batch.place(x1, y1, placing)
+        moved, captures = batch.move(x1, y1, x2, y2, ~placing)
+        boards = batch.board_strings()
+        wrong = []
+        for i, game in enumerate(games):
+            move = coords[i][:2] if placing[i] else coords[i]
+            ok, _ = game.play(move)
+            captured = set()
+            if not placing[i]:
+                for d in np.nonzero(captures[i])[0]:
+                    dx, dy = ORTHOGONAL[d]
+                    captured.add((int(x2[i] + dx), int(y2[i] + dy)))
+            expected = set(game.last_captures) if ok and not placing[i] else set()
+            if (ok != bool(placed[i] or moved[i]) or captured != expected
+                    or batch_state(batch, boards, i) != state(game)):
+                wrong.append((i, move))
+        self.assertEqual(wrong, [])
+
+    def test_legal_move(self):
+        self.check_moves(False)
+
+    def test_any_coordinates(self):
+        self.check_moves(True)
+
+    def test_play_random(self):
+        games = copies(self.games)
+        batch = SeegaBatch.from_games(games)
+        nrng = np.random.default_rng(SEED)
+        for ply in range(PLIES):
+            seed = nrng.bit_generator.state
+            x1, y1, x2, y2, has = batch.random_moves(nrng)
+            placing = batch.placement_phase.copy()
+            nrng.bit_generator.state = seed           # play_random sorteia as mesmas
+            np.testing.assert_array_equal(batch.play_random(nrng), has)
+            boards = batch.board_strings()
+            for i, game in enumerate(games):
+                if has[i]:
+                    move = ((int(x1[i]), int(y1[i])) if placing[i]
+                            else (int(x1[i]), int(y1[i]), int(x2[i]), int(y2[i])))
+                    self.assertIn(move, game.legal_moves(), (ply, i))
+                    game.play(move)
+                self.assertEqual(batch_state(batch, boards, i), state(game), (ply, i))
+
+
+if __name__ == "__main__":
+    unittest.main()
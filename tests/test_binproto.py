@@ -0,0 +1,35 @@
+import unittest
+
+import binproto
+
+
+"""
+encode_line com coordenadas fora do tabuleiro: a linha vai como TEXT em vez
+de virar outra célula (PLACE 5 0 não pode chegar como PLACE 0 1).
+
+    python -m pytest tests
+"""
+
+
+def round_trip(line):
+    frames = binproto.BinaryFramer().feed(binproto.encode_line(line))
+    return [binproto.frame_to_line(frame) for frame in frames]
+
+
+class EncodeLineTest(unittest.TestCase):
+    def test_cells_on_the_board(self):
+        self.assertEqual(round_trip("PLACE 4 4 B"), ["PLACE 4 4 B"])
+        self.assertEqual(round_trip("MOVE 0 1 0 2 A"), ["MOVE 0 1 0 2 A"])
+
+    def test_cells_off_the_board_go_as_text(self):
+        for line in ("PLACE 5 0", "PLACE -1 2", "MOVE 4 4 5 4", "REMOVE 0 5"):
+            self.assertEqual(binproto.encode_line(line)[0], binproto.OP_TEXT, line)
+            self.assertEqual(round_trip(line), [line])
+
+    def test_encode_place_rejects_off_board(self):
+        with self.assertRaises(ValueError):
+            binproto.encode_place(5, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import tempfile
+import unittest
+
+from game import SeegaGame
+from journal import Journal
+
+
+"""
+Journal.recover: um diário com registro recusado não impede a volta das
+outras salas.
+
+    python -m pytest tests
+"""
+
+
+class RecoverTest(unittest.TestCase):
+    def setUp(self):
+        self.journal = Journal(tempfile.mkdtemp(prefix="seega-journal-"))
+
+    def play(self, room_id, x, y, move=False):
+        game = SeegaGame()
+        room = self.journal.open_room(room_id)
+        if move:
+            # MOVE na colocação: replay() recusa o registro
+            room.move(x, y, x, y + 1, 0, [], game)
+        else:
+            game.place_piece(x, y)
+            room.place(x, y, 0, game)
+        room.flush()
+        room.file.close()
+
+    def test_refused_record_skips_only_that_room(self):
+        self.play(0, 0, 0)
+        self.play(1, 1, 0, move=True)
+        self.play(2, 2, 0)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            games = self.journal.recover()
+        self.assertEqual(sorted(games), [0, 2])
+        self.assertEqual(games[2].board[0][2], 'A')
+        self.assertIn("sala 1 não recuperada", stderr.getvalue())
+        self.assertEqual(self.journal.next_id(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
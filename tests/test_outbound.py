@@ -0,0 +1,37 @@
+import unittest
+
+from outbound import SNAPSHOT, _Pending
+from room import Room
+
+
+"""
+Fila de um cliente lento com a política snapshot: o que sobra depois do
+estouro basta para o cliente seguir a partida (FULL, STATE e SEQ).
+
+    python -m pytest tests
+"""
+
+
+class SnapshotPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.room = Room(1)
+        self.pending = _Pending(2, SNAPSHOT, self.snapshot, 1024)
+
+    def snapshot(self):
+        return "".join(line + "\n" for line in self.room.catch_up()).encode()
+
+    def test_overflow_sends_state_and_seq(self):
+        for move in ("PLACE 0 0", "PLACE 1 0", "PLACE 2 0"):
+            pid = self.room.game.turn
+            _, broadcasts = self.room.dispatch(pid, move)
+            self.assertTrue(self.pending.push("".join(l + "\n" for l in broadcasts).encode()))
+        text = self.pending.take_batch().decode()
+        self.assertTrue(text.startswith("FULL\n"))
+        self.assertIn(self.room.state_line() + "\n", text)
+        self.assertTrue(text.endswith(f"SEQ {self.room.seq}\n"))
+        self.assertEqual(self.room.seq, 3)
+        self.assertEqual(self.pending.dropped, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
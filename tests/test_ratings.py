@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from async_server import Lobby
+from matchmaking import DEFAULT_RATING, RatingStore
+from room import Room
+
+
+"""
+Resultado das partidas nas salas com rating: só uma vitória de verdade
+chega ao RatingStore.
+
+    python -m pytest tests
+"""
+
+
+class RatedRoomTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp(prefix="seega-ratings-")
+        self.ratings = RatingStore(os.path.join(tmp, "ratings.db"))
+        self.lobby = Lobby(ratings=self.ratings)
+        self.room = Room(1)
+        self.lobby.identities[self.room.room_id] = ("ana", "bia")
+        self.room.on_result = self.lobby.result
+
+    def tearDown(self):
+        self.ratings.close()
+
+    def test_rejected_move_keeps_ratings(self):
+        replies, broadcasts = self.room.dispatch(0, "MOVE 0 0 0 1")
+        self.assertEqual(replies, ["Ainda na fase de colocação."])
+        self.assertNotIn("RESTART", broadcasts)
+        self.assertEqual(self.ratings.stats("ana"), (DEFAULT_RATING, 0, 0, 0))
+        self.assertEqual(self.ratings.stats("bia"), (DEFAULT_RATING, 0, 0, 0))
+
+    def test_capture_of_last_piece_credits_the_winner(self):
+        board = "AB A " + " " * 20           # A vai de (3, 0) para (2, 0) e captura (1, 0)
+        self.room.game.restore((board, 0, False, (12, 12), (11, 12)))
+        replies, broadcasts = self.room.dispatch(0, "MOVE 3 0 2 0")
+        self.assertEqual(replies, ["Peça movida."])
+        self.assertIn("RESTART", broadcasts)
+        self.assertGreater(self.ratings.get("ana"), DEFAULT_RATING)
+        self.assertLess(self.ratings.get("bia"), DEFAULT_RATING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import re
+import unittest
+
+from async_server import SeegaServer
+
+
+"""
+RESUME no servidor asyncio: quem volta recebe o tabuleiro da sala retomada,
+mesmo tendo sido posto antes em uma sala nova ao conectar.
+
+    python -m pytest tests
+"""
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.text = ""
+
+    @classmethod
+    async def connect(cls, port):
+        return cls(*await asyncio.open_connection("localhost", port))
+
+    async def send(self, line):
+        self.writer.write((line + "\n").encode())
+        await self.writer.drain()
+
+    async def wait_for(self, pattern, timeout=2.0):
+        """Lê até pattern aparecer no que chegou desde a última espera."""
+        async def read():
+            while not re.search(pattern, self.text):
+                data = await self.reader.read(4096)
+                if not data:
+                    raise ConnectionError("conexão fechada")
+                self.text += data.decode()
+        await asyncio.wait_for(read(), timeout)
+        text, self.text = self.text, ""
+        return text
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class ResumeTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = SeegaServer(port=0)
+        await self.server.start()
+        self.port = self.server.port
+
+    async def asyncTearDown(self):
+        self.server.server.close()
+        await self.server.server.wait_closed()
+
+    async def start_game(self):
+        a = await Client.connect(self.port)
+        b = await Client.connect(self.port)
+        welcome = await a.wait_for(r"SESSION \S+")
+        await b.wait_for(r"SESSION \S+")
+        token = re.search(r"SESSION (\S+)", welcome).group(1)
+        await a.send("PLACE 0 0")
+        seq = int(re.findall(r"SEQ (\d+)", await a.wait_for(r"PLACE 0 0 A\n.*\nSEQ \d+"))[-1])
+        return a, b, token, seq
+
+    async def test_resume_without_new_room_sends_missed_events(self):
+        a, b, token, seq = await self.start_game()
+        await a.close()
+        await b.send("PLACE 1 0")
+        await b.wait_for(r"PLACE 1 0 B")
+        back = await Client.connect(self.port)
+        await back.wait_for("Aguardando oponente")
+        await back.send(f"RESUME {token} {seq}")
+        reply = await back.wait_for(f"SESSION {token}")
+        self.assertIn("PLACE 1 0 B", reply)
+        self.assertNotIn("PLACE 0 0 A", reply)
+        await b.close()
+        await back.close()
+
+    async def test_resume_after_temporary_room_sends_full_board(self):
+        a, b, token, seq = await self.start_game()
+        await a.close()
+        waiting = await Client.connect(self.port)
+        await waiting.wait_for("Aguardando oponente")
+        back = await Client.connect(self.port)
+        # pareado na hora com quem esperava: recebe o tabuleiro vazio da sala nova
+        await back.wait_for(r"SEQ 0")
+        await back.send(f"RESUME {token} {seq}")
+        reply = await back.wait_for(f"SESSION {token}")
+        board = reply.split("FULL\n", 1)[1].split("\n")[:5]
+        self.assertEqual(board[0][0], "A")
+        self.assertIn(f"SEQ {seq}", reply)
+        for c in (b, waiting, back):
+            await c.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+
+import spectators
+from room import Room
+from spectators import Audience
+
+
+"""
+Audience: a distribuição anda em fatias de no máximo CHUNK espectadores por
+volta do event loop, e só depois dos escritores dos jogadores.
+
+    python -m pytest tests
+"""
+
+
+class Transport:
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def is_closing(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def write(self, data):
+        self.log.append(self.name)
+
+
+class Queue:
+    items = ()
+
+
+class Watcher:
+    binary = False
+    watching = None
+    out = Queue()
+
+    def __init__(self, log, name):
+        self.writer = type("Writer", (), {"transport": Transport(log, name)})()
+
+    def encode(self, lines):
+        return "".join(line + "\n" for line in lines).encode()
+
+    def send_many(self, lines):
+        pass
+
+
+class FanOutTest(unittest.IsolatedAsyncioTestCase):
+    async def test_chunks_after_players(self):
+        log = []
+        audience = Audience(Room(1))
+        count = spectators.CHUNK * 2 + 1
+        for i in range(count):
+            audience.add(Watcher(log, i))
+        loop = asyncio.get_running_loop()
+        loop.call_soon(log.append, "jogador")        # escritor já acordado
+        audience.publish(["PLACE 0 0 A"])
+        await asyncio.sleep(0)
+        self.assertEqual(log, ["jogador"] + list(range(spectators.CHUNK)))
+        while audience.handle is not None:
+            await asyncio.sleep(0)
+        self.assertEqual(log[1:], list(range(count)))
+
+
+if __name__ == "__main__":
+    unittest.main()